@@ -0,0 +1,52 @@
+import os
+from decimal import Decimal
+from typing import Any, Dict, Optional
+
+from botocore.exceptions import ClientError
+
+import aws_clients
+from constants import ENV_ACTIVITY_TABLE
+
+
+def activity_table_init(table_name: Optional[str] = None):
+    """Return the DynamoDB table holding each user's last_active_ts."""
+    return aws_clients.get_table(table_name or os.getenv(ENV_ACTIVITY_TABLE))
+
+
+def record_user_activity(user_id: str, ts: str, table_name: Optional[str] = None) -> bool:
+    """Upsert a user's last_active_ts, ignoring events older than the stored value.
+
+    Returns True when the stored timestamp moved forward.
+    """
+    table = activity_table_init(table_name)
+    last_active_ts = Decimal(str(ts))
+    try:
+        table.update_item(
+            Key={"user_id": user_id},
+            UpdateExpression="SET last_active_ts = :ts",
+            ConditionExpression="attribute_not_exists(last_active_ts) OR last_active_ts < :ts",
+            ExpressionAttributeValues={":ts": last_active_ts},
+        )
+        return True
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") == "ConditionalCheckFailedException":
+            return False
+        raise
+
+
+def load_last_active(cutoff: float, table_name: Optional[str] = None) -> Dict[str, float]:
+    """Scan the activity table once and map user_id -> last_active_ts for users active since cutoff."""
+    table = activity_table_init(table_name)
+    scan_kwargs: Dict[str, Any] = {
+        "ProjectionExpression": "user_id, last_active_ts",
+        "FilterExpression": "last_active_ts >= :cutoff",
+        "ExpressionAttributeValues": {":cutoff": Decimal(str(cutoff))},
+    }
+    last_active: Dict[str, float] = {}
+    while True:
+        response = table.scan(**scan_kwargs)
+        for item in response.get("Items", []):
+            last_active[item["user_id"]] = float(item["last_active_ts"])
+        if "LastEvaluatedKey" not in response:
+            return last_active
+        scan_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
@@ -1,201 +1,484 @@
 import os
 import json
 import base64
+import binascii
+import time
 import urllib.parse
-import requests
-import boto3
 from datetime import datetime
-from typing import Any, Dict, Literal, Optional, Union
+from typing import TYPE_CHECKING, Any, Dict, Literal, Optional, Union
 import logging
 
-from mypy_boto3_secretsmanager.client import SecretsManagerClient
-from mypy_boto3_dynamodb.service_resource import DynamoDBServiceResource, Table
+from home_view import render_home_view
+from metrics import METRICS
+from structured_logging import configure_json_logging, should_log_payload
+from constants import (
+    ACTIVITY_EVENT_TYPES,
+    DEFAULT_RESPONSE_CACHE_NEGATIVE_TTL_SECONDS,
+    DEFAULT_RESPONSE_CACHE_SIZE,
+    DEFAULT_RESPONSE_CACHE_TTL_SECONDS,
+    ENV_FAST_ACK,
+    ENV_LAMBDA_FUNCTION_NAME,
+    ENV_RESPONSE_CACHE_NEGATIVE_TTL,
+    ENV_RESPONSE_CACHE_SIZE,
+    ENV_RESPONSE_CACHE_TTL,
+    ENV_TASK_QUEUE_URL,
+    METRIC_DUPLICATE_EVENTS_DROPPED,
+    SAVE_STALE,
+    SAVE_UNCHANGED,
+    SAVE_WRITTEN,
+    SLACK_AUTH_ERRORS,
+    TASK_PUBLISH_HOME,
+    TASK_SUBMIT_PROFILE,
+)
+from ttl_cache import MISSING, LRUTTLCache
+
+# boto3, requests and the AWS clients that wrap them are imported where they are first needed,
+# so paths such as url_verification do not pay for them on a cold start
+if TYPE_CHECKING:
+    from mypy_boto3_dynamodb.service_resource import Table
 
-# Setup logging
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
 
-if not logger.handlers:
-    handler = logging.StreamHandler()
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
-    handler.setFormatter(formatter)
-    logger.addHandler(handler)
 
-def dynamo_init():
-    dynamodb: DynamoDBServiceResource = boto3.resource('dynamodb')
-    table_name = os.getenv("SLACK_USER_RESPONSE")
-    print("table_name", table_name)
-    table = dynamodb.Table(table_name)
-    return table
+def configure_logging() -> None:
+    """Attach the JSON log handler on first use instead of at import time."""
+    configure_json_logging(logger)
+
+# Read-through cache of user_id -> stored item ({} when the user has not answered yet)
+RESPONSE_CACHE = LRUTTLCache(
+    maxsize=int(os.getenv(ENV_RESPONSE_CACHE_SIZE, DEFAULT_RESPONSE_CACHE_SIZE)),
+    ttl_seconds=float(os.getenv(ENV_RESPONSE_CACHE_TTL, DEFAULT_RESPONSE_CACHE_TTL_SECONDS)),
+)
+RESPONSE_CACHE_NEGATIVE_TTL = float(
+    os.getenv(ENV_RESPONSE_CACHE_NEGATIVE_TTL, DEFAULT_RESPONSE_CACHE_NEGATIVE_TTL_SECONDS)
+)
+
+# Queue for work deferred by fast-ack mode, created on first use
+_task_queue = None
+# Claimed Slack deliveries (event_id / trigger_id), created on first use
+_event_deduplicator = None
+
+def dynamo_init() -> "Table":
+    """Return the responses table handle, shared across warm invocations."""
+    import aws_clients
+    return aws_clients.get_table(os.getenv("SLACK_USER_RESPONSE"))
+
 
 
+def get_secret(secret_name: str, force_refresh: bool = False) -> Dict[str, str]:
+    """Retrieve Slack bot token from AWS Secrets Manager, cached for the warm container."""
+    import aws_clients
+    return aws_clients.get_secret(secret_name, force_refresh=force_refresh)
 
-def get_secret(secret_name: str) -> Dict[str, str]:
-    """Retrieve Slack bot token from AWS Secrets Manager."""
-    secrets_client: SecretsManagerClient = boto3.client('secretsmanager')
-    response = secrets_client.get_secret_value(SecretId=secret_name)
-    return json.loads(response['SecretString'])
+
+def get_response_cache_stats() -> Dict[str, int]:
+    """Hit/miss counters and size of the profile response cache."""
+    return RESPONSE_CACHE.stats()
+
+
+def reset_response_cache() -> None:
+    """Empty the profile response cache and its counters, e.g. between tests."""
+    RESPONSE_CACHE.clear()
 
 
 def get_user_response_from_db(user_id: str) -> Optional[Dict[str, Any]]:
+    """Fetch user response from DynamoDB, reading through the in-process cache."""
+    cached = RESPONSE_CACHE.get(user_id)
+    if cached is not MISSING:
+        return dict(cached)
+
     table = dynamo_init()
-    """Fetch user response from DynamoDB."""
     try:
         response = table.get_item(Key={"user_id": user_id})
-        return response.get("Item", {})
+        item = response.get("Item", {})
     except Exception as e:
-        logger.error(f"Error fetching user response: {e}")
+        logger.error("Error fetching user response: %s", e, extra={"fields": {"user_id": user_id}})
         return None
+    RESPONSE_CACHE.set(user_id, item, ttl_seconds=None if item else RESPONSE_CACHE_NEGATIVE_TTL)
+    return dict(item)
 
 
-def save_user_response_to_db(user_id: str, response: str) -> None:
-    table = dynamo_init()
+def save_user_response_to_db(
+    user_id: str, response: str, only_if_changed: bool = False, submitted_at: Optional[float] = None
+) -> str:
+    """Save user response to DynamoDB and write it through to the cache.
 
-    """Save user response to DynamoDB."""
+    With only_if_changed, the table's condition refuses an answer equal to the stored one
+    (SAVE_UNCHANGED) or submitted before it (SAVE_STALE), so a delayed retry cannot overwrite a
+    newer submission. Returns SAVE_WRITTEN otherwise; any other failure is raised.
+    """
+    timestamp = int(submitted_at if submitted_at is not None else datetime.now().timestamp())
+    item = {
+        "user_id": user_id,
+        "response": response,
+        "timestamp": timestamp,
+    }
+    condition: Dict[str, Any] = {}
+    if only_if_changed:
+        # Decided by the table alone: another container may have stored a different answer since
+        # this one cached or wrote its copy
+        condition = {
+            "ConditionExpression": "attribute_not_exists(user_id) OR (#response <> :response AND #timestamp <= :timestamp)",
+            "ExpressionAttributeNames": {"#response": "response", "#timestamp": "timestamp"},
+            "ExpressionAttributeValues": {":response": response, ":timestamp": timestamp},
+            "ReturnValuesOnConditionCheckFailure": "ALL_OLD",
+        }
+    table = dynamo_init()
+    from botocore.exceptions import ClientError
     try:
-        table.put_item(
-            Item={
-                "user_id": user_id,
-                "response": response,
-                "timestamp": int(datetime.now().timestamp()),
-            }
-        )
+        table.put_item(Item=item, **condition)
     except Exception as e:
-        logger.error(f"Error saving user response: {e}")
+        if isinstance(e, ClientError) and e.response.get("Error", {}).get("Code") == "ConditionalCheckFailedException":
+            return refused_write(user_id, response, e.response.get("Item"))
+        # The stored item is unknown after a failed write, so the next read goes to the table
+        RESPONSE_CACHE.invalidate(user_id)
+        logger.error("Error saving user response: %s", e, extra={"fields": {"user_id": user_id}})
+        raise
+    RESPONSE_CACHE.set(user_id, item)
+    return SAVE_WRITTEN
+
+
+def refused_write(user_id: str, response: str, stored: Optional[Dict[str, Any]]) -> str:
+    """Classify a write the table's condition refused, caching the stored item it returned."""
+    if not stored:
+        RESPONSE_CACHE.invalidate(user_id)
+        return SAVE_STALE
+    from boto3.dynamodb.types import TypeDeserializer
+    deserializer = TypeDeserializer()
+    item = {key: deserializer.deserialize(value) for key, value in stored.items()}
+    RESPONSE_CACHE.set(user_id, item)
+    outcome = SAVE_UNCHANGED if item.get("response") == response else SAVE_STALE
+    logger.info("Skipped saving %s response", outcome, extra={"fields": {"user_id": user_id}})
+    return outcome
 
 
 def publish_home_view(
     user_id: str, slack_token: str, existing_response: Optional[str] = None
 ) -> Dict[str, Any]:
     """Publish a view to the Slack Home tab with or without a profile question."""
-    blocks = [
-        {
-            "type": "section",
-            "text": {"type": "mrkdwn",
-                     "text": "👋 Welcome to the Frum Finance App! \n\n 📝 Profile Question: How did you first find frum.finance?"}
-        },
-        {"type": "divider"}
-    ]
-
-    # If a response exists, show the response and no input field
-    if existing_response:
-        blocks.append({
-            "type": "section",
-            "text": {"type": "mrkdwn", "text": f"\n Your response: {existing_response}"}
-        })
-    else:
-        # Show the input question if no response is found
-        blocks.append({
-            "type": "input",
-            "block_id": "question_block",
-            "element": {
-                "type": "plain_text_input",
-                "action_id": "user_response",
-                "placeholder": {"type": "plain_text", "text": "Please enter your response"}
-            },
-            "label": {"type": "plain_text", "text": "Answer:"}
-        })
-        blocks.append({
-            "type": "actions",
-            "block_id": "submit_button",
-            "elements": [
-                {
-                    "type": "button",
-                    "text": {"type": "plain_text", "text": "Submit"},
-                    "action_id": "submit_profile"
-                }
-            ]
-        })
-
-    # Call the Slack API to publish the Home tab view
-    view_payload = {
-        "user_id": user_id,
-        "view": {"type": "home", "blocks": blocks}
-    }
+    # The view is pre-serialized once per container; only the user id and response are spliced in
+    view_body = render_home_view(user_id, existing_response)
+    import slack_client
 
-    response = requests.post(
-        'https://slack.com/api/views.publish',
-        headers={'Authorization': f'Bearer {slack_token}', 'Content-Type': 'application/json'},
-        json=view_payload
-    )
+    # No 429 retries or limiter waits on the interactive path: Slack expects an answer within 3 seconds
+    try:
+        response = slack_client.slack_api_call(
+            'views.publish',
+            'POST',
+            'https://slack.com/api/views.publish',
+            max_retries=0,
+            rate_limited=False,
+            timeout=slack_client.get_interactive_timeout(),
+            headers={'Authorization': f'Bearer {slack_token}', 'Content-Type': 'application/json'},
+            data=view_body
+        )
+    except slack_client.SlackRateLimited:
+        # Reported like Slack's own 429 body, so callers see a failed call rather than an exception
+        return {'ok': False, 'error': 'ratelimited'}
     return response.json()
 
 
 def send_message(user_id: str, text: str, slack_token: str) -> Dict[str, Any]:
     """Send a direct message to the user."""
-    response = requests.post(
-        'https://slack.com/api/chat.postMessage',
-        headers={'Authorization': f'Bearer {slack_token}', 'Content-Type': 'application/json'},
-        json={'channel': user_id, 'text': text}
-    )
+    import slack_client
+    try:
+        response = slack_client.slack_api_call(
+            'chat.postMessage',
+            'POST',
+            'https://slack.com/api/chat.postMessage',
+            max_retries=0,
+            rate_limited=False,
+            timeout=slack_client.get_interactive_timeout(),
+            headers={'Authorization': f'Bearer {slack_token}', 'Content-Type': 'application/json'},
+            json={'channel': user_id, 'text': text}
+        )
+    except slack_client.SlackRateLimited:
+        return {'ok': False, 'error': 'ratelimited'}
     return response.json()
 
 
-def decode_payload(payload: str, is_base64_encoded: bool) -> Dict[str, Any]:
+def unquote_plus_bytes(value: bytes) -> bytes:
+    """Percent-decode a form value with + as space, matching urllib.parse.unquote_to_bytes.
+
+    Quoted-printable's =XX escapes decode in C, so swapping % for = avoids unquote_to_bytes'
+    per-escape Python loop. Each valid escape shrinks the output by two bytes; any other length
+    means a malformed escape, and the value goes through the stdlib instead.
+    """
+    value = value.replace(b"+", b" ")
+    if b"=" not in value and b"\n" not in value and b"\r" not in value:
+        decoded = binascii.a2b_qp(value.replace(b"%", b"="))
+        if len(decoded) == len(value) - 2 * value.count(b"%"):
+            return decoded
+    return urllib.parse.unquote_to_bytes(value)
+
+
+def decode_request_body(body: Union[str, bytes], is_base64_encoded: bool) -> Dict[str, Any]:
+    """Decode a Slack request body: JSON from the Events API, or `payload=<json>` form data from interactions."""
+    raw = base64.b64decode(body) if is_base64_encoded else body
+    if isinstance(raw, str):
+        raw = raw.encode("utf-8")
+    if not raw:
+        raise ValueError("Decoded payload is empty.")
+
+    # json.loads reads bytes directly, so JSON bodies are parsed without any decode or copy
+    if raw[:1] == b"{":
+        return json.loads(raw)
+
+    # Form fields are split on bytes and only the payload value is unquoted, once, with + as space
+    for field in raw.split(b"&"):
+        name, _, value = field.partition(b"=")
+        if name == b"payload":
+            if not value:
+                raise ValueError("Decoded payload is empty.")
+            return json.loads(unquote_plus_bytes(value))
+    raise ValueError("Form body has no payload field.")
+
+
+def decode_payload(payload: Union[str, bytes], is_base64_encoded: bool) -> Dict[str, Any]:
     """Decode the payload from the event body."""
-    if is_base64_encoded:
-        decoded_base64 = base64.b64decode(payload).decode("utf-8")
-        decoded_url = urllib.parse.unquote(decoded_base64)
+    return decode_request_body(payload, is_base64_encoded)
+
+
+def fast_ack_enabled() -> bool:
+    """Whether slow work should be deferred to the task queue instead of done before replying.
+
+    Inside Lambda this needs TASK_QUEUE_URL: the in-process queue would be frozen with the container
+    once the handler returns, so without SQS the work is done inline and a warning is logged.
+    """
+    if os.getenv(ENV_FAST_ACK, "").lower() not in ("1", "true", "yes"):
+        return False
+    if os.getenv(ENV_LAMBDA_FUNCTION_NAME) and not os.getenv(ENV_TASK_QUEUE_URL):
+        logger.warning("FAST_ACK is set without TASK_QUEUE_URL; processing inline")
+        return False
+    return True
+
+
+def get_task_queue():
+    """Return the task queue for deferred work, created once per container."""
+    global _task_queue
+    if _task_queue is None:
+        from task_queue import get_task_queue as build_task_queue
+        _task_queue = build_task_queue(process_task)
+    return _task_queue
+
+
+def handle_app_home_opened(user_id: str) -> Dict[str, Union[int, str]]:
+    """Publish the profile question, or the stored answer, to the user's Home tab."""
+    secret_name = os.getenv("SECRET_NAME")
+    slack_token = get_secret(secret_name)["SLACK_BOT_TOKEN"]
+
+    # Check if the user has already submitted a response
+    existing_response = get_user_response_from_db(user_id).get('response')
+
+    # Publish the profile question or show the existing response
+    publish_response = publish_home_view(user_id, slack_token, existing_response)
+    if publish_response.get('error') in SLACK_AUTH_ERRORS:
+        # The token was rotated; re-read it once and retry
+        slack_token = get_secret(secret_name, force_refresh=True)["SLACK_BOT_TOKEN"]
+        publish_response = publish_home_view(user_id, slack_token, existing_response)
+    if not publish_response.get('ok'):
+        logger.error(
+            "Error publishing home view: %s", publish_response.get('error'),
+            extra={"fields": {"user_id": user_id}, "payload": publish_response},
+        )
+        return {"statusCode": 500, "body": "Failed to publish view"}
+
+    return {'statusCode': 200, 'body': 'Home view published'}
+
+
+def handle_profile_submission(
+    user_id: str, user_input: str, submitted_at: Optional[float] = None
+) -> Dict[str, Union[int, str]]:
+    """Save the user's answer and send them a confirmation DM if it changed anything."""
+    # Save the response to DynamoDB; a repeated submit of the same answer writes nothing
+    try:
+        outcome = save_user_response_to_db(user_id, user_input, only_if_changed=True, submitted_at=submitted_at)
+    except Exception:
+        # Already logged by the save; a 500 releases the delivery inline and fails the record on the queue
+        return {'statusCode': 500, 'body': 'Failed to save response'}
+    if outcome == SAVE_UNCHANGED:
+        return {'statusCode': 200, 'body': 'Response unchanged'}
+    if outcome == SAVE_STALE:
+        return {'statusCode': 200, 'body': 'Newer response kept'}
+
+    secret_name = os.getenv("SECRET_NAME")
+    slack_token = get_secret(secret_name)["SLACK_BOT_TOKEN"]
+    # Send a confirmation message
+    response_text = f"Thank you for submitting your response!\n 📝 Profile Question: How did you first find frum.finance? : {user_input}"
+    message_response = send_message(user_id, response_text, slack_token)
+    if message_response.get('error') in SLACK_AUTH_ERRORS:
+        slack_token = get_secret(secret_name, force_refresh=True)["SLACK_BOT_TOKEN"]
+        send_message(user_id, response_text, slack_token)
+
+    return {'statusCode': 200, 'body': 'Action processed'}
+
+
+def process_task(task: Dict[str, Any]) -> Dict[str, Union[int, str]]:
+    """Run one unit of slow work, whether inline, from the in-process queue or from SQS."""
+    started = time.perf_counter()
+    kind = task.get("kind")
+    if kind == TASK_PUBLISH_HOME:
+        result = handle_app_home_opened(task["user_id"])
+    elif kind == TASK_SUBMIT_PROFILE:
+        result = handle_profile_submission(task["user_id"], task["user_input"], task.get("submitted_at"))
     else:
-        decoded_url = urllib.parse.unquote(payload)
+        raise ValueError(f"Unknown task kind: {kind}")
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    logger.info("Processed %s in %.1f ms", kind, elapsed_ms, extra={"fields": {"task": kind, "elapsed_ms": elapsed_ms}})
+    return result
 
-    if decoded_url.startswith("payload="):
-        decoded_url = decoded_url[len("payload="):]
 
-    if not decoded_url:
-        raise ValueError("Decoded payload is empty.")
+def process_queue_records(event: Dict[str, Any]) -> Dict[str, Any]:
+    """Consume an SQS batch, reporting failed records so only they are redelivered."""
+    failures = []
+    for record in event["Records"]:
+        try:
+            result = process_task(json.loads(record["body"]))
+            if result.get("statusCode") != 200:
+                raise RuntimeError(result.get("body"))
+        except Exception as e:
+            logger.error(
+                "Error processing queued task %s: %s", record.get('messageId'), e,
+                extra={"fields": {"message_id": record.get('messageId')}},
+            )
+            failures.append({"itemIdentifier": record.get("messageId")})
+    return {"batchItemFailures": failures}
+
+
+def dispatch(task: Dict[str, Any], started: float, ack_body: str) -> Dict[str, Union[int, str]]:
+    """Run the task inline, or queue it and acknowledge Slack straight away in fast-ack mode."""
+    if not fast_ack_enabled():
+        return process_task(task)
+    get_task_queue().submit(task)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    logger.info(
+        "Acknowledged %s in %.1f ms", task['kind'], elapsed_ms,
+        extra={"fields": {"task": task['kind'], "elapsed_ms": elapsed_ms}},
+    )
+    return {'statusCode': 200, 'body': ack_body}
+
 
-    return json.loads(decoded_url)
+def get_event_deduplicator():
+    """Return the deduplicator for Slack redeliveries, created once per container."""
+    global _event_deduplicator
+    if _event_deduplicator is None:
+        from event_dedup import get_event_deduplicator as build_event_deduplicator
+        _event_deduplicator = build_event_deduplicator()
+    return _event_deduplicator
+
+
+def reset_event_deduplicator() -> None:
+    """Forget every claimed delivery, e.g. between tests."""
+    global _event_deduplicator
+    _event_deduplicator = None
+
+
+def is_duplicate_delivery(dedup_key: str, event: Dict[str, Any]) -> bool:
+    """Claim a delivery; True when it was already claimed, in which case it is logged and counted."""
+    try:
+        first = get_event_deduplicator().claim(dedup_key)
+    except Exception as e:
+        # Fail open: an unavailable store must not drop events
+        logger.error("Error claiming delivery %s: %s", dedup_key, e, extra={"fields": {"dedup_key": dedup_key}})
+        return False
+    if first:
+        return False
+    METRICS.increment(METRIC_DUPLICATE_EVENTS_DROPPED)
+    headers = {name.lower(): value for name, value in (event.get("headers") or {}).items()}
+    logger.info("Dropped duplicate delivery %s", dedup_key, extra={"fields": {
+        "dedup_key": dedup_key,
+        "retry_num": headers.get("x-slack-retry-num"),
+        "retry_reason": headers.get("x-slack-retry-reason"),
+    }})
+    return True
+
+
+def release_delivery(dedup_key: Optional[str]) -> None:
+    """Give a failed delivery back, so Slack's next retry is processed rather than dropped."""
+    if dedup_key is None:
+        return
+    try:
+        get_event_deduplicator().release(dedup_key)
+    except Exception as e:
+        logger.error("Error releasing delivery %s: %s", dedup_key, e, extra={"fields": {"dedup_key": dedup_key}})
 
 
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Union[int, str]]:
-    """Main Lambda handler."""
-    secret_name = os.getenv("SECRET_NAME")
-    secrets = get_secret(secret_name)
-    slack_token = secrets["SLACK_BOT_TOKEN"]
-    logger.info(f"Received event: {event}")
+    """Main Lambda handler; outbound call metrics are flushed once per invocation."""
+    started = time.perf_counter()
+    try:
+        return handle_event(event, started)
+    finally:
+        # Work still running on the in-process task queue is flushed with the next invocation
+        METRICS.flush("add_user_profile")
+
+
+def handle_event(event: Dict[str, Any], started: float) -> Dict[str, Union[int, str]]:
+    """Route one API Gateway or SQS event."""
+    configure_logging()
+
+    # Deferred work sent through the SQS task queue
+    if "Records" in event:
+        return process_queue_records(event)
 
     body = event.get('body', '')
     is_base64_encoded = event.get("isBase64Encoded", False)
 
-    # try:
-    #     body = decode_payload(body, is_base64_encoded)
-    # except Exception as e:
-    #     logger.error(f"Error decoding payload: {e}")
-    #     return {"statusCode": 400, "body": "Invalid payload"}
-    if isinstance(body, str):
+    if isinstance(body, (str, bytes)):
         try:
-            body = json.loads(body)
+            body = decode_request_body(body, is_base64_encoded)
         except Exception as e:
-            logger.error(f"Error parsing JSON from body: {e}")
+            logger.error("Error decoding payload: %s", e, extra={"fields": {"body_bytes": len(body)}})
             return {"statusCode": 400, "body": "Invalid payload"}
 
     event_type = body.get("type")
     slack_event = body.get("event", {})
-    logger.info(f"slack_event event: {event_type}")
+    # Payloads are only redacted and serialized for the sampled share of each event type
+    log_type = slack_event.get("type") or event_type
+    if logger.isEnabledFor(logging.INFO) and should_log_payload(log_type):
+        logger.info("Received %s event", log_type, extra={"fields": {"event_type": log_type}, "payload": body})
 
     # Handle Slack URL verification (needed during Slack setup)
     if event_type == 'url_verification':
         return {'statusCode': 200, 'body': body['challenge']}
 
+    # Slack redelivers slow or failed events; repeats are answered before any DynamoDB or Slack call
+    from event_dedup import get_dedup_key
+    dedup_key = get_dedup_key(body)
+    if dedup_key is not None and is_duplicate_delivery(dedup_key, event):
+        return {'statusCode': 200, 'body': 'Duplicate delivery ignored'}
+    try:
+        response = route_slack_body(body, started)
+    except Exception:
+        release_delivery(dedup_key)
+        raise
+    if response.get('statusCode') != 200:
+        release_delivery(dedup_key)
+    return response
+
+
+def route_slack_body(body: Dict[str, Any], started: float) -> Dict[str, Union[int, str]]:
+    """Handle a decoded Events API callback or interaction payload."""
+    slack_event = body.get("event", {})
+
+    # Record activity events so the notify job can find inactive users without crawling history
+    if slack_event.get('type') in ACTIVITY_EVENT_TYPES:
+        user_id = slack_event.get('user')
+        event_ts = slack_event.get('event_ts') or slack_event.get('ts')
+        if user_id and event_ts and not slack_event.get('bot_id'):
+            import activity_table
+            try:
+                activity_table.record_user_activity(user_id, event_ts)
+            except Exception as e:
+                logger.error("Error recording user activity: %s", e, extra={"fields": {"user_id": user_id}})
+        return {'statusCode': 200, 'body': 'Activity recorded'}
+
     # Handle app_home_opened event
     if slack_event.get('type') == 'app_home_opened':
         user_id = slack_event.get('user')
         if not user_id:
             return {'statusCode': 400, 'body': 'Missing user_id'}
-
-        # Check if the user has already submitted a response
-        existing_response = get_user_response_from_db(user_id).get('response')
-
-        # Publish the profile question or show the existing response
-        publish_response = publish_home_view(user_id, slack_token, existing_response)
-        if not publish_response.get('ok'):
-            logger.error(f"Error publishing home view: {publish_response}")
-            return {"statusCode": 500, "body": "Failed to publish view"}
-
-        return {'statusCode': 200, 'body': 'Home view published'}
+        return dispatch({"kind": TASK_PUBLISH_HOME, "user_id": user_id}, started, 'Home view queued')
 
     # Handle block_actions (button click)
     if body.get('type') == 'block_actions':
@@ -203,15 +486,15 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Union[int,
         action_id: Literal["submit_profile"] = body["actions"][0]["action_id"]
 
         if action_id == 'submit_profile':
-            # Get the user's input response from the payload
-            raw_response = body['view']['state']['values']['question_block']['user_response']['value']
-            user_input = urllib.parse.unquote(raw_response).replace('+', ' ')
-            # Save the response to DynamoDB
-            save_user_response_to_db(user_id, user_input)
-            # Send a confirmation message
-            response_text = f"Thank you for submitting your response!\n 📝 Profile Question: How did you first find frum.finance? : {user_input}"
-            send_message(user_id, response_text, slack_token)
+            # Get the user's input response from the payload; the form decoder has already unquoted it
+            user_input = body['view']['state']['values']['question_block']['user_response']['value']
+            task = {"kind": TASK_SUBMIT_PROFILE, "user_id": user_id, "user_input": user_input}
+            # When the user clicked, so a late retry of an older answer cannot overwrite a newer one
+            action_ts = body["actions"][0].get("action_ts")
+            if action_ts:
+                task["submitted_at"] = float(action_ts)
+            return dispatch(task, started, 'Action queued')
 
         return {'statusCode': 200, 'body': 'Action processed'}
 
-    return {'statusCode': 200, 'body': 'Success, event not handled'}
\ No newline at end of file
+    return {'statusCode': 200, 'body': 'Success, event not handled'}
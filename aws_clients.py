@@ -0,0 +1,142 @@
+import json
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+import boto3
+from botocore.config import Config
+
+from constants import (
+    DEFAULT_DYNAMODB_CONNECT_TIMEOUT,
+    DEFAULT_DYNAMODB_MAX_POOL_CONNECTIONS,
+    DEFAULT_DYNAMODB_READ_TIMEOUT,
+    DEFAULT_SECRET_CACHE_TTL_SECONDS,
+    LAMBDA_INVOKE_READ_TIMEOUT,
+    ENV_DYNAMODB_CONNECT_TIMEOUT,
+    ENV_DYNAMODB_ENDPOINT_URL,
+    ENV_DYNAMODB_MAX_POOL_CONNECTIONS,
+    ENV_DYNAMODB_READ_TIMEOUT,
+    ENV_SECRET_CACHE_TTL,
+)
+from metrics import instrument_boto_client
+
+if TYPE_CHECKING:
+    from mypy_boto3_dynamodb.service_resource import DynamoDBServiceResource, Table
+    from mypy_boto3_lambda.client import LambdaClient
+    from mypy_boto3_secretsmanager.client import SecretsManagerClient
+    from mypy_boto3_sqs.client import SQSClient
+
+# Read once per container; Lambda environment variables cannot change while it is warm
+SECRET_CACHE_TTL_SECONDS = float(os.environ.get(ENV_SECRET_CACHE_TTL, DEFAULT_SECRET_CACHE_TTL_SECONDS))
+
+_lock = threading.Lock()
+_secrets_client: Optional["SecretsManagerClient"] = None
+_secret_cache: Dict[str, Tuple[float, Dict[str, str]]] = {}
+_dynamodb_resource: Optional["DynamoDBServiceResource"] = None
+_tables: Dict[str, "Table"] = {}
+_sqs_client: Optional["SQSClient"] = None
+_lambda_client: Optional["LambdaClient"] = None
+
+
+def get_secrets_client() -> "SecretsManagerClient":
+    """Return the Secrets Manager client, creating it once per container."""
+    global _secrets_client
+    with _lock:
+        if _secrets_client is None:
+            _secrets_client = instrument_boto_client(boto3.client('secretsmanager'))
+        return _secrets_client
+
+
+def get_secret(
+    secret_name: str, force_refresh: bool = False, ttl_seconds: Optional[float] = None
+) -> Dict[str, str]:
+    """Return the decoded secret, reusing the cached copy until its TTL expires."""
+    ttl = SECRET_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+    now = time.monotonic()
+    with _lock:
+        cached = _secret_cache.get(secret_name)
+    if cached and not force_refresh and now - cached[0] < ttl:
+        return dict(cached[1])
+
+    response = get_secrets_client().get_secret_value(SecretId=secret_name)
+    secret = json.loads(response['SecretString'])
+    with _lock:
+        _secret_cache[secret_name] = (now, secret)
+    return dict(secret)
+
+
+def invalidate_secret(secret_name: Optional[str] = None) -> None:
+    """Forget one cached secret, or all of them."""
+    with _lock:
+        if secret_name is None:
+            _secret_cache.clear()
+        else:
+            _secret_cache.pop(secret_name, None)
+
+
+def get_dynamodb_resource() -> "DynamoDBServiceResource":
+    """Return the DynamoDB resource, creating it once per container with the configured pool and timeouts."""
+    global _dynamodb_resource
+    with _lock:
+        if _dynamodb_resource is None:
+            config = Config(
+                max_pool_connections=int(
+                    os.environ.get(ENV_DYNAMODB_MAX_POOL_CONNECTIONS, DEFAULT_DYNAMODB_MAX_POOL_CONNECTIONS)
+                ),
+                connect_timeout=float(os.environ.get(ENV_DYNAMODB_CONNECT_TIMEOUT, DEFAULT_DYNAMODB_CONNECT_TIMEOUT)),
+                read_timeout=float(os.environ.get(ENV_DYNAMODB_READ_TIMEOUT, DEFAULT_DYNAMODB_READ_TIMEOUT)),
+            )
+            # DYNAMODB_ENDPOINT_URL points at a local stand-in such as DynamoDB Local
+            endpoint_url = os.environ.get(ENV_DYNAMODB_ENDPOINT_URL)
+            if endpoint_url:
+                _dynamodb_resource = boto3.resource('dynamodb', config=config, endpoint_url=endpoint_url)
+            else:
+                _dynamodb_resource = boto3.resource('dynamodb', config=config)
+            instrument_boto_client(_dynamodb_resource.meta.client)
+        return _dynamodb_resource
+
+
+def get_table(table_name: str) -> "Table":
+    """Return a Table handle, reused across warm invocations."""
+    table = _tables.get(table_name)
+    if table is None:
+        table = get_dynamodb_resource().Table(table_name)
+        with _lock:
+            table = _tables.setdefault(table_name, table)
+    return table
+
+
+def get_sqs_client() -> "SQSClient":
+    """Return the SQS client, creating it once per container."""
+    global _sqs_client
+    with _lock:
+        if _sqs_client is None:
+            _sqs_client = instrument_boto_client(boto3.client('sqs'))
+        return _sqs_client
+
+
+def get_lambda_client() -> "LambdaClient":
+    """Return the Lambda client, creating it once per container.
+
+    Synchronous invocations may run for the full 15 minutes, and a retried invoke would run the
+    function twice, so the read timeout is raised and botocore retries are turned off.
+    """
+    global _lambda_client
+    with _lock:
+        if _lambda_client is None:
+            config = Config(read_timeout=LAMBDA_INVOKE_READ_TIMEOUT, retries={'total_max_attempts': 1})
+            _lambda_client = instrument_boto_client(boto3.client('lambda', config=config))
+        return _lambda_client
+
+
+def reset() -> None:
+    """Drop every cached client, resource, table and secret, e.g. between tests."""
+    global _secrets_client, _dynamodb_resource, _sqs_client, _lambda_client
+    with _lock:
+        _secrets_client = None
+        _sqs_client = None
+        _lambda_client = None
+        _secret_cache.clear()
+        _dynamodb_resource = None
+        _tables.clear()
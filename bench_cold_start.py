@@ -0,0 +1,125 @@
+"""Measure cold-start cost of both Lambda handlers.
+
+Each run spawns a fresh interpreter, times the handler module import and its first invocation,
+and records which heavy dependencies ended up loaded. The notify handler is pointed at a local
+stub of the Slack Web API and a canned secret, so no network or AWS access is needed.
+
+    python bench_cold_start.py --runs 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+HEAVY_MODULES = ("boto3", "botocore", "requests", "mypy_boto3_dynamodb")
+
+PROFILE_CHILD = """
+import json, sys, time
+start = time.perf_counter()
+import add_user_profile
+imported = time.perf_counter()
+event = {"body": json.dumps({"type": "url_verification", "challenge": "bench"})}
+response = add_user_profile.lambda_handler(event, None)
+done = time.perf_counter()
+assert response["statusCode"] == 200, response
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "first_call_ms": (done - imported) * 1000,
+    "loaded": [m for m in %(heavy)r if m in sys.modules],
+}))
+"""
+
+NOTIFY_CHILD = """
+import json, sys, time
+start = time.perf_counter()
+import notify_inactive_users
+imported = time.perf_counter()
+import aws_clients
+aws_clients.get_secret = lambda *args, **kwargs: {"SLACK_BOT_TOKEN": "xoxb-bench"}
+response = notify_inactive_users.lambda_handler({"run_date": "bench"}, None)
+done = time.perf_counter()
+assert response["statusCode"] == 200, response
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "first_call_ms": (done - imported) * 1000,
+    "loaded": [m for m in %(heavy)r if m in sys.modules],
+}))
+"""
+
+
+class StubSlackHandler(BaseHTTPRequestHandler):
+    """Answers the handful of Web API methods the notify handler calls with one-page results."""
+
+    RESPONSES = {
+        "/users.list": {"ok": True, "members": [{"id": "U1", "name": "bench"}]},
+        "/conversations.list": {"ok": True, "channels": [{"id": "C1"}]},
+        "/conversations.members": {"ok": True, "members": ["U1"]},
+        "/conversations.history": {"ok": True, "messages": []},
+        "/chat.postMessage": {"ok": True},
+    }
+
+    def _reply(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        body = json.dumps(self.RESPONSES.get(self.path.split("?")[0], {"ok": False})).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = _reply
+    do_POST = _reply
+
+    def log_message(self, format, *args):
+        pass
+
+
+def run_child(code, env):
+    """Run one cold start in a fresh interpreter and return its measurements."""
+    result = subprocess.run(
+        [sys.executable, "-c", code % {"heavy": HEAVY_MODULES}],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def summarize(name, samples):
+    imports = [s["import_ms"] for s in samples]
+    calls = [s["first_call_ms"] for s in samples]
+    print(f"{name}:")
+    print(f"  import        median {statistics.median(imports):8.1f} ms   min {min(imports):8.1f} ms")
+    print(f"  first call    median {statistics.median(calls):8.1f} ms   min {min(calls):8.1f} ms")
+    print(f"  heavy modules loaded: {', '.join(samples[-1]['loaded']) or 'none'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="cold starts per handler")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubSlackHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        env = dict(os.environ, AWS_DEFAULT_REGION=os.environ.get("AWS_DEFAULT_REGION", "us-east-1"))
+        env.pop("WATERMARK_TABLE", None)
+        env.pop("SEND_LEDGER_TABLE", None)
+        notify_env = dict(env, SLACK_API_BASE_URL=f"http://127.0.0.1:{server.server_port}")
+
+        summarize("add_user_profile (url_verification)", [run_child(PROFILE_CHILD, env) for _ in range(args.runs)])
+        summarize("notify_inactive_users", [run_child(NOTIFY_CHILD, notify_env) for _ in range(args.runs)])
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Compare the single-pass request body decoder with the original decode_payload.
+
+Bodies are realistic block_actions interactions (form-encoded `payload=<json>` carrying the full
+Home tab view and its state), sent both plain and base64-encoded as API Gateway delivers them.
+
+    python bench_decode_payload.py --blocks 40 --number 2000
+"""
+import argparse
+import base64
+import json
+import timeit
+import tracemalloc
+import urllib.parse
+
+from add_user_profile import decode_request_body
+from home_view import build_home_blocks
+
+
+def legacy_decode_payload(payload, is_base64_encoded):
+    """decode_payload as it was before the single-pass decoder, kept for comparison."""
+    if is_base64_encoded:
+        decoded_base64 = base64.b64decode(payload).decode("utf-8")
+        decoded_url = urllib.parse.unquote(decoded_base64)
+    else:
+        decoded_url = urllib.parse.unquote(payload)
+
+    if decoded_url.startswith("payload="):
+        decoded_url = decoded_url[len("payload="):]
+
+    if not decoded_url:
+        raise ValueError("Decoded payload is empty.")
+
+    return json.loads(decoded_url)
+
+
+def build_block_actions_body(blocks, separators=(",", ":")):
+    """Form-encode a block_actions payload whose view carries `blocks` copies of the Home tab blocks."""
+    answer = "Heard about it on a podcast + a friend's tweet (100% recommend) — ça marche ✓ " * 8
+    view_blocks = []
+    for i in range(blocks):
+        for block in build_home_blocks():
+            view_blocks.append(dict(block, block_id=f"{block.get('block_id', 'block')}_{i}"))
+    payload = {
+        "type": "block_actions",
+        "user": {"id": "U0123ABCD", "username": "jane", "name": "jane", "team_id": "T0123ABCD"},
+        "api_app_id": "A0123ABCD",
+        "token": "verification-token",
+        "container": {"type": "view", "view_id": "V0123ABCD"},
+        "trigger_id": "1234567890.1234567890.abcdef0123456789",
+        "team": {"id": "T0123ABCD", "domain": "frum-finance"},
+        "view": {
+            "id": "V0123ABCD",
+            "type": "home",
+            "blocks": view_blocks,
+            "state": {"values": {"question_block": {"user_response": {"type": "plain_text_input", "value": answer}}}},
+            "hash": "1700000000.abcdef",
+        },
+        "actions": [{"action_id": "submit_profile", "block_id": "submit_button", "type": "button",
+                     "action_ts": "1700000000.000100"}],
+    }
+    # Slack sends every value form-encoded, spaces as +
+    return urllib.parse.urlencode({"payload": json.dumps(payload, ensure_ascii=False, separators=separators)}), answer
+
+
+def peak_allocation(func, *args):
+    tracemalloc.start()
+    func(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--blocks", type=int, default=40, help="copies of the Home tab blocks in the view")
+    parser.add_argument("--number", type=int, default=2000, help="decodes per timing run")
+    parser.add_argument("--repeat", type=int, default=5, help="timing runs; the fastest is reported")
+    args = parser.parse_args()
+
+    body, answer = build_block_actions_body(args.blocks)
+    # JSON whitespace arrives as +, which the legacy decoder never turned back into spaces
+    spaced_body, _ = build_block_actions_body(args.blocks, separators=(", ", ": "))
+    try:
+        legacy_decode_payload(spaced_body, False)
+        print("legacy decoder parses bodies with JSON whitespace: yes")
+    except ValueError:
+        print("legacy decoder parses bodies with JSON whitespace: no")
+    print(f"single-pass decoder parses them: {decode_request_body(spaced_body, False)['type'] == 'block_actions'}")
+    encoded = base64.b64encode(body.encode("utf-8")).decode("ascii")
+    print(f"body: {len(body)} bytes form-encoded, {len(encoded)} bytes base64")
+
+    for label, data, is_base64 in (("plain", body, False), ("base64", encoded, True)):
+        new_value = decode_request_body(data, is_base64)["view"]["state"]["values"]["question_block"]["user_response"]["value"]
+        # The legacy path left + in place, so the handler had to unquote and replace it again
+        legacy_raw = legacy_decode_payload(data, is_base64)["view"]["state"]["values"]["question_block"]["user_response"]["value"]
+        legacy_value = urllib.parse.unquote(legacy_raw).replace("+", " ")
+        print(f"\n{label}: new decoder correct={new_value == answer}, legacy+handler correct={legacy_value == answer}")
+
+        for name, func in (("legacy", legacy_decode_payload), ("single-pass", decode_request_body)):
+            best = min(timeit.repeat(lambda: func(data, is_base64), number=args.number, repeat=args.repeat))
+            per_call_us = best / args.number * 1e6
+            print(f"  {name:12s} {per_call_us:9.1f} us/decode   peak alloc {peak_allocation(func, data, is_base64) / 1024:8.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
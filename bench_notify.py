@@ -0,0 +1,112 @@
+"""Benchmark notify_inactive_users.lambda_handler end to end against the local Slack stand-in.
+
+A synthetic workspace is served by fake_slack in a child process, with Slack's tier limits
+compressed by --time-scale (the default 600 turns a minute of rate budget into 0.1 s). The client
+rate limiter is sped up by the same factor. Each configuration reports Web API calls per method,
+wall time, peak traced memory, and 429s seen by the server and by the client limiter, and checks
+the inactive users against the workspace's ground truth.
+
+    python bench_notify.py --users 10000 --channels 2000
+    python bench_notify.py --users 500 --channels 100 --configs baseline concurrency-8
+"""
+import argparse
+import json
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import requests
+
+import aws_clients
+import notify_inactive_users
+import slack_client
+from constants import DEFAULT_DAYS_INACTIVE
+from fake_slack import FAKE_TOKEN, RESET_PATH, STATS_PATH, SyntheticWorkspace, scale_rate_limiter, start_server_process
+
+# name -> (config overrides stored in the secret, client rate budget relative to the server's)
+CONFIGURATIONS = {
+    "baseline": ({"HISTORY_CONCURRENCY": 1, "MEMBERSHIP_FILTER": False}, 1.0),
+    "membership-filter": ({"HISTORY_CONCURRENCY": 1}, 1.0),
+    "concurrency-8": ({"HISTORY_CONCURRENCY": 8, "DELIVERY_CONCURRENCY": 8}, 1.0),
+    "page-size-1000": ({"HISTORY_CONCURRENCY": 8, "DELIVERY_CONCURRENCY": 8, "PAGE_SIZE": 1000}, 1.0),
+    # The client believes it has twice the budget the server grants, so it has to back off on 429s
+    "over-budget": ({"HISTORY_CONCURRENCY": 8, "DELIVERY_CONCURRENCY": 8}, 2.0),
+}
+
+
+def run_handler(base_url, overrides, time_scale, budget, trace_memory):
+    """Run the handler once from a clean client state; returns (response, seconds, peak bytes, client 429s)."""
+    secret = {"SLACK_BOT_TOKEN": FAKE_TOKEN, **overrides}
+    requests.post(f"{base_url}{RESET_PATH}").raise_for_status()
+    aws_clients.reset()
+    slack_client.reset_session()
+    scale_rate_limiter(slack_client.RATE_LIMITER, time_scale, budget)
+
+    with patch.dict("os.environ", {"SLACK_API_BASE_URL": base_url}), \
+            patch("aws_clients.get_secret", lambda *args, **kwargs: dict(secret)):
+        if trace_memory:
+            tracemalloc.start()
+        started = time.perf_counter()
+        response = notify_inactive_users.lambda_handler({"run_date": f"bench-{time.time()}"}, None)
+        elapsed = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1] if trace_memory else 0
+        if trace_memory:
+            tracemalloc.stop()
+    return response, elapsed, peak, slack_client.RATE_LIMITER.throttle_events
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--channels", type=int, default=2000)
+    parser.add_argument("--messages-per-channel", type=int, default=50)
+    parser.add_argument("--inactive-fraction", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--time-scale", type=float, default=600.0, help="rate windows last 60 / time-scale seconds")
+    parser.add_argument("--configs", nargs="+", choices=list(CONFIGURATIONS), default=list(CONFIGURATIONS))
+    parser.add_argument("--no-memory", action="store_true", help="skip the second, tracemalloc-instrumented run")
+    args = parser.parse_args()
+
+    workspace_options = {
+        "users": args.users,
+        "channels": args.channels,
+        "messages_per_channel": args.messages_per_channel,
+        "inactive_fraction": args.inactive_fraction,
+        "seed": args.seed,
+        "now": time.time(),
+    }
+    # The child process builds the same workspace from the same seed and clock; this copy is the ground truth
+    expected = set(SyntheticWorkspace(**workspace_options).expected_inactive(
+        (datetime.now() - timedelta(days=DEFAULT_DAYS_INACTIVE)).timestamp()
+    ))
+    process, base_url = start_server_process(workspace_options, time_scale=args.time_scale)
+    print(f"workspace: {args.users} users, {args.channels} channels, {len(expected)} expected inactive; "
+          f"time scale {args.time_scale:g}")
+
+    try:
+        for name in args.configs:
+            overrides, budget = CONFIGURATIONS[name]
+            response, elapsed, _, client_429s = run_handler(base_url, overrides, args.time_scale, budget, False)
+            stats = requests.get(f"{base_url}{STATS_PATH}").json()
+            peak = 0
+            if not args.no_memory:
+                peak = run_handler(base_url, overrides, args.time_scale, budget, True)[2]
+
+            body = json.loads(response["body"])
+            inactive = {user["user_id"] for user in body["inactive_users"]}
+            print(f"\n{name}: {json.dumps(overrides)} client budget x{budget:g}")
+            print(f"  wall time      {elapsed:8.2f} s (~{elapsed * args.time_scale / 60:.0f} min at real Slack limits)")
+            if peak:
+                print(f"  peak memory    {peak / 2 ** 20:8.1f} MiB")
+            print(f"  api calls      {stats['total_calls']:8d}   "
+                  + ", ".join(f"{method} {count}" for method, count in sorted(stats["calls"].items())))
+            print(f"  429s           {stats['total_throttled']:8d} at the server, {client_429s} seen by the client")
+            print(f"  nudges         {body['delivery']['sent']:8d} sent, {len(body['delivery']['failed'])} failed")
+            print(f"  correct        {inactive == expected}")
+    finally:
+        process.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""Compare the memory held by raw Slack user/channel objects with the projected slotted records.
+
+users.list and conversations.list pages are generated with the fields real Slack objects carry
+(profile, avatar URLs, topic, purpose, ...) and served through a mocked session, so the numbers
+come from the actual iter_users/iter_channels path. Both the memory retained by the final lists and
+the peak while paging are measured with tracemalloc.
+
+    python bench_user_records.py --users 100000 --channels 5000
+"""
+import argparse
+import gc
+import json
+import tracemalloc
+from unittest.mock import MagicMock, patch
+
+import notify_inactive_users
+from fake_slack import scale_rate_limiter
+from slack_client import RATE_LIMITER
+
+AVATAR_SIZES = (24, 32, 48, 72, 192, 512, 1024)
+
+
+def build_member(n):
+    """A users.list member shaped like Slack's, with a full profile."""
+    avatar_hash = f"{n * 2654435761 % 16 ** 12:012x}"
+    profile = {
+        "title": "Engineer" if n % 3 else "",
+        "phone": "",
+        "skype": "",
+        "real_name": f"Member {n}",
+        "real_name_normalized": f"Member {n}",
+        "display_name": f"member{n}",
+        "display_name_normalized": f"member{n}",
+        "fields": None,
+        "status_text": "In a meeting" if n % 5 == 0 else "",
+        "status_emoji": ":calendar:" if n % 5 == 0 else "",
+        "status_expiration": 0,
+        "avatar_hash": avatar_hash,
+        "first_name": "Member",
+        "last_name": str(n),
+        "email": f"member{n}@example.com",
+        "team": "T0000001",
+    }
+    for size in AVATAR_SIZES:
+        profile[f"image_{size}"] = f"https://avatars.slack-edge.com/2024-01-01/{n}_{avatar_hash}_{size}.png"
+    return {
+        "id": f"U{n:09d}",
+        "team_id": "T0000001",
+        "name": f"member{n}",
+        "deleted": n % 50 == 0,
+        "color": "9f69e7",
+        "real_name": f"Member {n}",
+        "tz": "America/New_York",
+        "tz_label": "Eastern Daylight Time",
+        "tz_offset": -14400,
+        "profile": profile,
+        "is_admin": False,
+        "is_owner": False,
+        "is_primary_owner": False,
+        "is_restricted": False,
+        "is_ultra_restricted": False,
+        "is_bot": n % 40 == 1,
+        "is_app_user": False,
+        "updated": 1700000000 + n,
+        "is_email_confirmed": True,
+        "who_can_share_contact_card": "EVERYONE",
+    }
+
+
+def build_channel(n):
+    """A conversations.list channel shaped like Slack's."""
+    return {
+        "id": f"C{n:09d}",
+        "name": f"channel-{n}",
+        "is_channel": True,
+        "is_group": False,
+        "is_im": False,
+        "created": 1600000000 + n,
+        "is_archived": False,
+        "is_general": n == 0,
+        "unlinked": 0,
+        "name_normalized": f"channel-{n}",
+        "is_shared": False,
+        "is_org_shared": False,
+        "is_member": True,
+        "is_private": False,
+        "is_mpim": False,
+        "topic": {"value": f"Topic of channel {n}", "creator": "U000000001", "last_set": 1650000000},
+        "purpose": {"value": f"Discussion for channel {n}", "creator": "U000000001", "last_set": 1650000000},
+        "previous_names": [],
+        "num_members": 10 + n % 300,
+    }
+
+
+def page_bodies(items, key, page_size):
+    """Serialized API pages, so each is parsed afresh the way response.json() does."""
+    pages = []
+    for start in range(0, len(items), page_size):
+        cursor = str(start + page_size) if start + page_size < len(items) else ""
+        pages.append(json.dumps({"ok": True, key: items[start:start + page_size], "response_metadata": {"next_cursor": cursor}}))
+    return pages
+
+
+def fake_session(pages):
+    """Session whose GETs return the pages in order, parsed on each .json() call."""
+    bodies = iter(pages)
+
+    def get(url, **kwargs):
+        response = MagicMock(status_code=200)
+        body = next(bodies)
+        response.json.side_effect = lambda: json.loads(body)
+        return response
+
+    session = MagicMock()
+    session.get.side_effect = get
+    return session
+
+
+def measure(func):
+    """Return (result, bytes still held by the result, peak bytes while producing it)."""
+    gc.collect()
+    tracemalloc.start()
+    result = func()
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, retained, peak
+
+
+def run(label, pages, collect):
+    with patch("slack_client.get_session", return_value=fake_session(pages)):
+        result, retained, peak = measure(lambda: list(collect()))
+    print(f"  {label:10s} retained {retained / 2 ** 20:8.1f} MiB   peak {peak / 2 ** 20:8.1f} MiB   "
+          f"{retained / max(len(result), 1):7.0f} bytes/object")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=100000)
+    parser.add_argument("--channels", type=int, default=5000)
+    parser.add_argument("--page-size", type=int, default=200)
+    args = parser.parse_args()
+
+    config = {
+        "SLACK_BOT_TOKEN": "xoxb-bench",
+        "USERS_LIST_URL": "https://slack.test/api/users.list",
+        "CONVERSATIONS_LIST_URL": "https://slack.test/api/conversations.list",
+        "PAGE_SIZE": args.page_size,
+    }
+    # Pages come from memory, so Slack's tier limits would only add sleeps
+    scale_rate_limiter(RATE_LIMITER, time_scale=1e6)
+    user_pages = page_bodies([build_member(n) for n in range(args.users)], "members", args.page_size)
+    channel_pages = page_bodies([build_channel(n) for n in range(args.channels)], "channels", args.page_size)
+
+    def raw_users():
+        # What get_all_users kept before: every filtered member object as parsed
+        return [
+            user
+            for page in notify_inactive_users.paginate("users.list", config["USERS_LIST_URL"], config)
+            for user in page.get("members", [])
+            if not user.get("is_bot") and not user.get("deleted")
+        ]
+
+    def raw_channels():
+        return [
+            channel
+            for page in notify_inactive_users.paginate(
+                "conversations.list", config["CONVERSATIONS_LIST_URL"], config, {"exclude_archived": "true"}
+            )
+            for channel in page.get("channels", [])
+            if not channel.get("is_archived")
+        ]
+
+    print(f"users.list: {args.users} members in {len(user_pages)} pages "
+          f"({sum(map(len, user_pages)) / 2 ** 20:.1f} MiB of JSON)")
+    legacy = run("raw dicts", user_pages, raw_users)
+    records = run("records", user_pages, lambda: notify_inactive_users.iter_users(config))
+    print(f"  same users: {[u['id'] for u in legacy] == [u.id for u in records]}")
+
+    print(f"conversations.list: {args.channels} channels in {len(channel_pages)} pages")
+    legacy = run("raw dicts", channel_pages, raw_channels)
+    records = run("records", channel_pages, lambda: notify_inactive_users.iter_channels(config))
+    print(f"  same channels: {[c['id'] for c in legacy] == [c.id for c in records]}")
+
+
+if __name__ == "__main__":
+    main()
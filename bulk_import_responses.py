@@ -0,0 +1,219 @@
+"""Backfill profile responses into the responses table with DynamoDB batch writes.
+
+Records stream from a CSV (header with user_id, response and an optional timestamp column) or a
+JSON Lines file, are grouped into batches of up to 25 puts and written by a pool of threads.
+Items DynamoDB leaves unprocessed are retried with exponential backoff. Malformed JSON lines, lines
+that are not objects, and records without a user_id or with a malformed timestamp are counted as
+invalid and skipped.
+
+A user repeated within one batch keeps their last record. Batches are written in parallel, so when
+a user repeats in different batches either record may end up stored; deduplicate such files first
+or import them with --parallelism 1, which writes batches in file order.
+
+    python bulk_import_responses.py survey.csv --table SlackUserResponse --parallelism 8
+    python bulk_import_responses.py answers.jsonl --endpoint-url http://localhost:8000
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+import aws_clients
+from constants import (
+    BATCH_WRITE_MAX_RETRIES,
+    BATCH_WRITE_RETRY_BASE_SECONDS,
+    DEFAULT_BULK_IMPORT_PARALLELISM,
+    DYNAMODB_BATCH_WRITE_LIMIT,
+    ENV_DYNAMODB_ENDPOINT_URL,
+)
+
+Item = Dict[str, Any]
+# A CSV row, or a JSON Lines line still to be parsed
+Record = Union[str, Dict[str, Any]]
+
+
+def parse_record(record: Record) -> Dict[str, Any]:
+    """Parse a JSON Lines line, rejecting anything that is not a JSON object."""
+    if isinstance(record, str):
+        record = json.loads(record)
+    if not isinstance(record, dict):
+        raise ValueError(f"Record is not an object: {record!r}")
+    return record
+
+
+def to_item(record: Dict[str, Any], default_timestamp: int) -> Item:
+    """Shape one source record like the items save_user_response_to_db writes."""
+    user_id = (record.get("user_id") or "").strip()
+    if not user_id:
+        raise ValueError(f"Record has no user_id: {record}")
+    timestamp = record.get("timestamp")
+    return {
+        "user_id": user_id,
+        "response": record.get("response") or "",
+        "timestamp": int(float(timestamp)) if timestamp not in (None, "") else default_timestamp,
+    }
+
+
+def iter_records(path: str) -> Iterator[Record]:
+    """Stream raw records from a .csv or .jsonl/.ndjson file without reading it all into memory.
+
+    JSON Lines are yielded unparsed, so a malformed line is skipped by bulk_import like any other bad record.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.endswith((".jsonl", ".ndjson")):
+            for line in f:
+                if line.strip():
+                    yield line
+        else:
+            yield from csv.DictReader(f)
+
+
+def iter_batches(items: Iterable[Item], batch_size: int = DYNAMODB_BATCH_WRITE_LIMIT) -> Iterator[List[Item]]:
+    """Group items into batches, keeping the last record when a user repeats within one batch.
+
+    BatchWriteItem rejects a request that names the same key twice. Repeats in different batches are
+    not collapsed, since that would need every key in memory.
+    """
+    batch: Dict[str, Item] = {}
+    for item in items:
+        batch[item["user_id"]] = item
+        if len(batch) == batch_size:
+            yield list(batch.values())
+            batch = {}
+    if batch:
+        yield list(batch.values())
+
+
+class BulkImportStats:
+    """Counters shared by the writer threads."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.written = 0
+        self.failed = 0
+        self.invalid = 0
+        self.batches = 0
+        self.retries = 0
+        self.started = time.monotonic()
+        self.elapsed = 0.0
+
+    def add(self, written: int, failed: int, retries: int) -> None:
+        with self._lock:
+            self.written += written
+            self.failed += failed
+            self.retries += retries
+            self.batches += 1
+
+    def add_invalid(self) -> None:
+        with self._lock:
+            self.invalid += 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "written": self.written,
+                "failed": self.failed,
+                "invalid": self.invalid,
+                "batches": self.batches,
+                "retries": self.retries,
+                "seconds": round(self.elapsed, 3),
+                "items_per_second": round(self.written / self.elapsed, 1) if self.elapsed else 0.0,
+            }
+
+
+def write_batch(
+    resource: Any,
+    table_name: str,
+    items: List[Item],
+    max_retries: int = BATCH_WRITE_MAX_RETRIES,
+    base_delay: float = BATCH_WRITE_RETRY_BASE_SECONDS,
+    sleep=None,
+):
+    """Write one batch, retrying unprocessed items with exponential backoff.
+
+    Returns (written, failed, retries).
+    """
+    request = [{"PutRequest": {"Item": item}} for item in items]
+    retries = 0
+    while True:
+        response = resource.batch_write_item(RequestItems={table_name: request})
+        request = response.get("UnprocessedItems", {}).get(table_name, [])
+        if not request:
+            return len(items), 0, retries
+        if retries == max_retries:
+            return len(items) - len(request), len(request), retries
+        (sleep or time.sleep)(base_delay * (2 ** retries))
+        retries += 1
+
+
+def bulk_import(
+    records: Iterable[Record],
+    table_name: str,
+    parallelism: int = DEFAULT_BULK_IMPORT_PARALLELISM,
+    batch_size: int = DYNAMODB_BATCH_WRITE_LIMIT,
+    resource: Optional[Any] = None,
+    max_retries: int = BATCH_WRITE_MAX_RETRIES,
+    sleep=None,
+) -> Dict[str, Any]:
+    """Write records to the responses table with up to `parallelism` batches in flight."""
+    resource = resource or aws_clients.get_dynamodb_resource()
+    default_timestamp = int(datetime.now().timestamp())
+    stats = BulkImportStats()
+
+    def valid_items() -> Iterator[Item]:
+        # One bad row is reported and skipped rather than stopping the backfill partway through
+        for line, record in enumerate(records, 1):
+            try:
+                yield to_item(parse_record(record), default_timestamp)
+            except (TypeError, ValueError, OverflowError) as e:
+                stats.add_invalid()
+                print(f"Skipping record {line}: {e}", file=sys.stderr)
+
+    def run(batch: List[Item]) -> None:
+        stats.add(*write_batch(resource, table_name, batch, max_retries, sleep=sleep))
+
+    with ThreadPoolExecutor(max_workers=parallelism) as executor:
+        # Only a couple of batches per worker are queued, so large files stream in bounded memory
+        in_flight = set()
+        for batch in iter_batches(valid_items(), batch_size):
+            if len(in_flight) >= parallelism * 2:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    future.result()
+            in_flight.add(executor.submit(run, batch))
+        for future in in_flight:
+            future.result()
+
+    stats.elapsed = time.monotonic() - stats.started
+    return stats.as_dict()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Backfill profile responses with DynamoDB batch writes.")
+    parser.add_argument("path", help="CSV or JSON Lines file of user_id, response[, timestamp] records")
+    parser.add_argument("--table", default=os.environ.get("SLACK_USER_RESPONSE"), help="responses table name")
+    parser.add_argument("--parallelism", type=int, default=DEFAULT_BULK_IMPORT_PARALLELISM)
+    parser.add_argument("--batch-size", type=int, default=DYNAMODB_BATCH_WRITE_LIMIT)
+    parser.add_argument("--endpoint-url", help="DynamoDB endpoint, e.g. DynamoDB Local")
+    args = parser.parse_args(argv)
+
+    if not args.table:
+        parser.error("--table or SLACK_USER_RESPONSE is required")
+    if not 1 <= args.batch_size <= DYNAMODB_BATCH_WRITE_LIMIT:
+        parser.error(f"--batch-size must be between 1 and {DYNAMODB_BATCH_WRITE_LIMIT}")
+    if args.endpoint_url:
+        os.environ[ENV_DYNAMODB_ENDPOINT_URL] = args.endpoint_url
+
+    stats = bulk_import(iter_records(args.path), args.table, args.parallelism, args.batch_size)
+    print(json.dumps(stats))
+    return 1 if stats["failed"] or stats["invalid"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -2,11 +2,160 @@ BASE_API_URL = "https://slack.com/api"
 USERS_LIST_ENDPOINT = "/users.list"
 CONVERSATIONS_LIST_ENDPOINT = "/conversations.list"
 CONVERSATIONS_HISTORY_ENDPOINT = "/conversations.history"
+CONVERSATIONS_MEMBERS_ENDPOINT = "/conversations.members"
 POST_MESSAGE_ENDPOINT = "/chat.postMessage"
 DEFAULT_DAYS_INACTIVE = 3
+DEFAULT_PAGE_SIZE = 200
+DEFAULT_HISTORY_CONCURRENCY = 1
 DEFAULT_MESSAGE_TEMPLATE = "Hi {user_name}, we noticed you haven't been active recently. Let us know if you need any assistance!"
 
 PAYLOAD_PREFIX = "payload="
 ACTION_SUBMIT_PROFILE = "submit_profile"
 ENV_SECRET_NAME = "SECRET_NAME"
-ENV_DYNAMO_TABLE = "SLACK_USER_RESPONSE "
\ No newline at end of file
+ENV_DYNAMO_TABLE = "SLACK_USER_RESPONSE "
+ENV_WATERMARK_TABLE = "WATERMARK_TABLE"
+ENV_WATERMARK_FILE = "WATERMARK_FILE"
+ENV_ACTIVITY_TABLE = "SLACK_USER_ACTIVITY"
+ENV_SEND_LEDGER_TABLE = "SEND_LEDGER_TABLE"
+ENV_SEND_LEDGER_FILE = "SEND_LEDGER_FILE"
+ENV_SECRET_CACHE_TTL = "SECRET_CACHE_TTL_SECONDS"
+ENV_HTTP_POOL_SIZE = "SLACK_HTTP_POOL_SIZE"
+ENV_HTTP_CONNECT_TIMEOUT = "SLACK_HTTP_CONNECT_TIMEOUT"
+ENV_HTTP_READ_TIMEOUT = "SLACK_HTTP_READ_TIMEOUT"
+ENV_HTTP_CONNECT_RETRIES = "SLACK_HTTP_CONNECT_RETRIES"
+ENV_INTERACTIVE_CONNECT_TIMEOUT = "SLACK_INTERACTIVE_CONNECT_TIMEOUT"
+ENV_INTERACTIVE_READ_TIMEOUT = "SLACK_INTERACTIVE_READ_TIMEOUT"
+ENV_DYNAMODB_MAX_POOL_CONNECTIONS = "DYNAMODB_MAX_POOL_CONNECTIONS"
+ENV_DYNAMODB_CONNECT_TIMEOUT = "DYNAMODB_CONNECT_TIMEOUT"
+ENV_DYNAMODB_READ_TIMEOUT = "DYNAMODB_READ_TIMEOUT"
+ENV_DYNAMODB_ENDPOINT_URL = "DYNAMODB_ENDPOINT_URL"
+ENV_RESPONSE_CACHE_SIZE = "RESPONSE_CACHE_SIZE"
+ENV_RESPONSE_CACHE_TTL = "RESPONSE_CACHE_TTL_SECONDS"
+ENV_RESPONSE_CACHE_NEGATIVE_TTL = "RESPONSE_CACHE_NEGATIVE_TTL_SECONDS"
+ENV_SLACK_API_BASE_URL = "SLACK_API_BASE_URL"
+ENV_FAST_ACK = "FAST_ACK"
+ENV_TASK_QUEUE_URL = "TASK_QUEUE_URL"
+ENV_TASK_WORKERS = "TASK_WORKERS"
+ENV_METRICS_NAMESPACE = "METRICS_NAMESPACE"
+ENV_LOG_LEVEL = "LOG_LEVEL"
+ENV_LOG_SAMPLE_RATES = "LOG_SAMPLE_RATES"
+ENV_LOG_PAYLOAD_MAX_BYTES = "LOG_PAYLOAD_MAX_BYTES"
+ENV_EVENT_DEDUP_TABLE = "EVENT_DEDUP_TABLE"
+ENV_EVENT_DEDUP_TTL = "EVENT_DEDUP_TTL_SECONDS"
+# Set by the Lambda runtime, so its presence tells a Lambda invocation from a local run
+ENV_LAMBDA_FUNCTION_NAME = "AWS_LAMBDA_FUNCTION_NAME"
+
+DEFAULT_SECRET_CACHE_TTL_SECONDS = 300
+# Slack errors that mean the cached bot token must be re-read from Secrets Manager
+SLACK_AUTH_ERRORS = ("invalid_auth", "not_authed", "token_revoked", "token_expired", "account_inactive")
+# Per-channel errors the notify job expects: the bot cannot read the channel, or it is gone
+CHANNEL_ACCESS_ERRORS = ("not_in_channel", "channel_not_found")
+
+# Events API types that count as a user being active
+ACTIVITY_EVENT_TYPES = ("message", "app_mention", "reaction_added", "file_shared")
+# Where notify_inactive_users reads activity from
+ACTIVITY_SOURCE_HISTORY = "history"
+ACTIVITY_SOURCE_TABLE = "table"
+
+# Slack Web API rate limit tiers, in requests per minute
+SLACK_TIER_RATES = {1: 1, 2: 20, 3: 50, 4: 100}
+SLACK_METHOD_TIERS = {
+    "users.list": 2,
+    "conversations.list": 2,
+    "conversations.history": 3,
+    "conversations.members": 4,
+    "chat.postMessage": 4,
+    "views.publish": 4,
+}
+DEFAULT_SLACK_TIER = 3
+RATE_LIMIT_BURST_SECONDS = 5
+RATE_LIMIT_MAX_RETRIES = 5
+DEFAULT_RETRY_AFTER_SECONDS = 1
+
+# Shared Slack HTTP session
+DEFAULT_HTTP_POOL_SIZE = 10
+DEFAULT_HTTP_CONNECT_TIMEOUT = 2
+DEFAULT_HTTP_READ_TIMEOUT = 10
+DEFAULT_HTTP_CONNECT_RETRIES = 2
+# Timeouts for the profile handler's own Slack calls, which must fit in Slack's 3-second deadline
+DEFAULT_INTERACTIVE_CONNECT_TIMEOUT = 0.5
+DEFAULT_INTERACTIVE_READ_TIMEOUT = 2.0
+
+# Shared DynamoDB resource
+DEFAULT_DYNAMODB_MAX_POOL_CONNECTIONS = 10
+DEFAULT_DYNAMODB_CONNECT_TIMEOUT = 2
+DEFAULT_DYNAMODB_READ_TIMEOUT = 5
+
+# Read-through cache of profile responses in add_user_profile
+DEFAULT_RESPONSE_CACHE_SIZE = 1024
+DEFAULT_RESPONSE_CACHE_TTL_SECONDS = 900
+# Users who have not answered are cached for less time, since another container may save their answer
+DEFAULT_RESPONSE_CACHE_NEGATIVE_TTL_SECONDS = 60
+
+# DM delivery stage
+DEFAULT_DELIVERY_CONCURRENCY = 4
+DELIVERY_MAX_RETRIES = 3
+DELIVERY_RETRY_BASE_SECONDS = 1
+SEND_LEDGER_TTL_SECONDS = 30 * 24 * 60 * 60
+TRANSIENT_DELIVERY_ERRORS = (
+    "ratelimited",
+    "internal_error",
+    "fatal_error",
+    "service_unavailable",
+    "request_timeout",
+    "connection_error",
+)
+
+# Fast-ack mode: work deferred past Slack's 3-second deadline
+TASK_PUBLISH_HOME = "publish_home"
+TASK_SUBMIT_PROFILE = "submit_profile"
+# Outcomes of save_user_response_to_db: the answer was stored, already stored, or older than the stored one
+SAVE_WRITTEN = "written"
+SAVE_UNCHANGED = "unchanged"
+SAVE_STALE = "stale"
+DEFAULT_TASK_WORKERS = 2
+
+# Bulk import of profile responses
+DYNAMODB_BATCH_WRITE_LIMIT = 25
+DEFAULT_BULK_IMPORT_PARALLELISM = 4
+BATCH_WRITE_MAX_RETRIES = 8
+BATCH_WRITE_RETRY_BASE_SECONDS = 0.05
+
+# Sharded activity scan: channels are split across worker processes or Lambda invocations
+DEFAULT_SHARD_COUNT = 1
+SHARD_BACKEND_PROCESS = "process"
+SHARD_BACKEND_LAMBDA = "lambda"
+SHARD_WORKER_ACTION = "scan_shard"
+# Lambda invocations can run for up to 15 minutes
+LAMBDA_INVOKE_READ_TIMEOUT = 900
+
+# Outbound call metrics, flushed once per invocation as CloudWatch Embedded Metric Format
+DEFAULT_METRICS_NAMESPACE = "SlackUserBot"
+# Upper bounds of the latency histogram buckets, in milliseconds
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+# Structured event logging: payloads are sampled per event type, redacted and capped
+DEFAULT_LOG_PAYLOAD_MAX_BYTES = 2048
+LOG_MAX_STRING_CHARS = 256
+LOG_MAX_LIST_ITEMS = 10
+# Fraction of payloads logged per Slack event type; LOG_SAMPLE_RATES="message=0.001,default=0.5" overrides
+DEFAULT_LOG_SAMPLE_RATES = {
+    "default": 0.1,
+    "url_verification": 1.0,
+    "block_actions": 0.1,
+    "app_home_opened": 0.1,
+    "message": 0.01,
+    "reaction_added": 0.01,
+    "app_mention": 0.01,
+    "file_shared": 0.01,
+}
+# Payload keys whose values never reach the logs: credentials and the text users typed
+REDACTED_LOG_KEYS = (
+    "token", "access_token", "bot_token", "SLACK_BOT_TOKEN", "authorization", "x-slack-signature",
+    "secret", "password", "text", "value", "response", "user_input",
+)
+
+# Deduplication of Slack redeliveries; Slack retries up to three times within about 30 minutes
+DEFAULT_EVENT_DEDUP_TTL_SECONDS = 3600
+DEFAULT_EVENT_DEDUP_CACHE_SIZE = 4096
+METRIC_DUPLICATE_EVENTS_DROPPED = "DuplicateEventsDropped"
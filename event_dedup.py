@@ -0,0 +1,111 @@
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from botocore.exceptions import ClientError
+
+import aws_clients
+from constants import (
+    DEFAULT_EVENT_DEDUP_CACHE_SIZE,
+    DEFAULT_EVENT_DEDUP_TTL_SECONDS,
+    ENV_EVENT_DEDUP_TABLE,
+    ENV_EVENT_DEDUP_TTL,
+)
+from ttl_cache import LRUTTLCache
+
+
+def get_dedup_key(body: Dict[str, Any]) -> Optional[str]:
+    """Identify a Slack delivery: event_id for Events API callbacks, trigger_id for interactions.
+
+    Slack resends both with the same id when the first attempt is slow or fails.
+    """
+    if body.get("event_id"):
+        return f"event#{body['event_id']}"
+    if body.get("trigger_id"):
+        return f"trigger#{body['trigger_id']}"
+    return None
+
+
+class DynamoEventStore:
+    """Claims in a DynamoDB table keyed on event_key, expired by the table's TTL on expires_at."""
+
+    def __init__(self, table_name: str) -> None:
+        self.table = aws_clients.get_table(table_name)
+
+    def claim(self, key: str, ttl_seconds: float) -> bool:
+        """Record key unless a live claim exists. Returns False when another delivery got there first."""
+        now = int(time.time())
+        try:
+            # DynamoDB deletes expired items lazily, so an expired claim counts as absent
+            self.table.put_item(
+                Item={"event_key": key, "expires_at": now + int(ttl_seconds)},
+                ConditionExpression="attribute_not_exists(event_key) OR expires_at < :now",
+                ExpressionAttributeValues={":now": now},
+            )
+            return True
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") == "ConditionalCheckFailedException":
+                return False
+            raise
+
+    def release(self, key: str) -> None:
+        self.table.delete_item(Key={"event_key": key})
+
+
+class EventDeduplicator:
+    """In-process TTL set of recently seen deliveries, optionally backed by a shared store.
+
+    The local set answers repeats that land on the same warm container without any I/O; the store's
+    conditional write catches repeats that land on another container.
+    """
+
+    def __init__(
+        self,
+        store: Optional[DynamoEventStore] = None,
+        ttl_seconds: float = DEFAULT_EVENT_DEDUP_TTL_SECONDS,
+        maxsize: int = DEFAULT_EVENT_DEDUP_CACHE_SIZE,
+    ) -> None:
+        self.store = store
+        self.ttl_seconds = ttl_seconds
+        self._seen = LRUTTLCache(maxsize=maxsize, ttl_seconds=ttl_seconds)
+        self._lock = threading.Lock()
+        self.claimed = 0
+        self.dropped = 0
+
+    def claim(self, key: str) -> bool:
+        """Return True for the first delivery of key, False for a duplicate (which is counted)."""
+        with self._lock:
+            if key in self._seen:
+                self.dropped += 1
+                return False
+            # Reserved before the store call, so a concurrent repeat in this process is dropped too
+            self._seen.set(key, True)
+        try:
+            first = self.store is None or self.store.claim(key, self.ttl_seconds)
+        except Exception:
+            self._seen.invalidate(key)
+            raise
+        with self._lock:
+            if first:
+                self.claimed += 1
+            else:
+                self.dropped += 1
+        return first
+
+    def release(self, key: str) -> None:
+        """Forget a claim whose processing failed, so Slack's retry is handled instead of dropped."""
+        self._seen.invalidate(key)
+        if self.store is not None:
+            self.store.release(key)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"claimed": self.claimed, "dropped": self.dropped}
+
+
+def get_event_deduplicator() -> EventDeduplicator:
+    """Build the deduplicator for this container; EVENT_DEDUP_TABLE adds the shared DynamoDB store."""
+    table_name = os.environ.get(ENV_EVENT_DEDUP_TABLE)
+    ttl_seconds = float(os.environ.get(ENV_EVENT_DEDUP_TTL, DEFAULT_EVENT_DEDUP_TTL_SECONDS))
+    return EventDeduplicator(DynamoEventStore(table_name) if table_name else None, ttl_seconds)
@@ -0,0 +1,100 @@
+import json
+import re
+from json.encoder import encode_basestring_ascii
+from typing import Any, Dict, List, Optional, Union
+
+WELCOME_TEXT = "👋 Welcome to the Frum Finance App! \n\n 📝 Profile Question: How did you first find frum.finance?"
+
+# Stand-ins for the per-request values while the static parts are serialized
+USER_ID_SLOT = "\x00user_id\x00"
+RESPONSE_SLOT = "\x00response\x00"
+
+
+def build_home_blocks(existing_response: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Build the Home tab blocks with or without the profile question."""
+    blocks: List[Dict[str, Any]] = [
+        {
+            "type": "section",
+            "text": {"type": "mrkdwn", "text": WELCOME_TEXT}
+        },
+        {"type": "divider"}
+    ]
+
+    # If a response exists, show the response and no input field
+    if existing_response:
+        blocks.append({
+            "type": "section",
+            "text": {"type": "mrkdwn", "text": f"\n Your response: {existing_response}"}
+        })
+    else:
+        # Show the input question if no response is found
+        blocks.append({
+            "type": "input",
+            "block_id": "question_block",
+            "element": {
+                "type": "plain_text_input",
+                "action_id": "user_response",
+                "placeholder": {"type": "plain_text", "text": "Please enter your response"}
+            },
+            "label": {"type": "plain_text", "text": "Answer:"}
+        })
+        blocks.append({
+            "type": "actions",
+            "block_id": "submit_button",
+            "elements": [
+                {
+                    "type": "button",
+                    "text": {"type": "plain_text", "text": "Submit"},
+                    "action_id": "submit_profile"
+                }
+            ]
+        })
+    return blocks
+
+
+def build_view_payload(user_id: str, existing_response: Optional[str] = None) -> Dict[str, Any]:
+    """Build the views.publish payload as plain dicts."""
+    return {
+        "user_id": user_id,
+        "view": {"type": "home", "blocks": build_home_blocks(existing_response)}
+    }
+
+
+class ViewTemplate:
+    """A views.publish payload serialized once, with slots for the values that vary per request.
+
+    JSON string escaping works character by character, so splicing escaped values between the
+    pre-serialized fragments gives exactly the bytes json.dumps would produce for the whole payload.
+    """
+
+    def __init__(self, payload: Dict[str, Any], slots: List[str]) -> None:
+        markers = {encode_basestring_ascii(slot)[1:-1]: slot for slot in slots}
+        pattern = re.compile("|".join(re.escape(marker) for marker in markers))
+        serialized = json.dumps(payload)
+        # bytes for the static fragments, slot names where a value goes
+        self._parts: List[Union[bytes, str]] = []
+        position = 0
+        for match in pattern.finditer(serialized):
+            self._parts.append(serialized[position:match.start()].encode("utf-8"))
+            self._parts.append(markers[match.group()])
+            position = match.end()
+        self._parts.append(serialized[position:].encode("utf-8"))
+
+    def render(self, values: Dict[str, str]) -> bytes:
+        """Return the payload bytes with each slot replaced by its JSON-escaped value."""
+        return b"".join(
+            part if isinstance(part, bytes) else encode_basestring_ascii(values[part])[1:-1].encode("ascii")
+            for part in self._parts
+        )
+
+
+# Built and serialized once per container
+QUESTION_VIEW = ViewTemplate(build_view_payload(USER_ID_SLOT), [USER_ID_SLOT])
+RESPONSE_VIEW = ViewTemplate(build_view_payload(USER_ID_SLOT, RESPONSE_SLOT), [USER_ID_SLOT, RESPONSE_SLOT])
+
+
+def render_home_view(user_id: str, existing_response: Optional[str] = None) -> bytes:
+    """Return the serialized views.publish body for a user's Home tab."""
+    if existing_response:
+        return RESPONSE_VIEW.render({USER_ID_SLOT: user_id, RESPONSE_SLOT: existing_response})
+    return QUESTION_VIEW.render({USER_ID_SLOT: user_id})
@@ -0,0 +1,178 @@
+"""Per-call latency and call counts for outbound Slack and AWS requests.
+
+Every Slack Web API call (slack_client.slack_api_call) and every boto3 call made through the
+clients in aws_clients is recorded into METRICS under a (method, status) key. The handlers flush
+them once per invocation as CloudWatch Embedded Metric Format lines on stdout, which CloudWatch
+Logs turns into metrics without any API calls from the function.
+
+Recording takes a lock and bumps a fixed-size histogram bucket, so it costs about a microsecond.
+"""
+import json
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from constants import DEFAULT_METRICS_NAMESPACE, ENV_METRICS_NAMESPACE, LATENCY_BUCKETS_MS
+
+# Key in botocore's per-request context holding the call's start time
+_STARTED_KEY = "metrics_started"
+
+
+class LatencyHistogram:
+    """Latency samples bucketed on LATENCY_BUCKETS_MS, with exact count, sum, min and max."""
+
+    __slots__ = ("counts", "count", "total", "minimum", "maximum")
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.minimum = float("inf")
+        self.maximum = 0.0
+
+    def add(self, milliseconds: float) -> None:
+        self.counts[bisect_left(LATENCY_BUCKETS_MS, milliseconds)] += 1
+        self.count += 1
+        self.total += milliseconds
+        self.minimum = min(self.minimum, milliseconds)
+        self.maximum = max(self.maximum, milliseconds)
+
+    def to_emf(self) -> Dict[str, Any]:
+        """EMF statistic set; each bucket is reported at its upper bound, overflow at the maximum."""
+        bounds = list(LATENCY_BUCKETS_MS) + [self.maximum]
+        values = [bound for bound, count in zip(bounds, self.counts) if count]
+        return {
+            "Values": values,
+            "Counts": [count for count in self.counts if count],
+            "Min": round(self.minimum, 3),
+            "Max": round(self.maximum, 3),
+            "Sum": round(self.total, 3),
+            "Count": self.count,
+        }
+
+
+class MetricsRecorder:
+    """Thread-safe counters and latency histograms per (method, status)."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._histograms: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self._counters: Dict[str, int] = {}
+
+    def increment(self, name: str, value: int = 1) -> None:
+        """Add to a plain count metric, e.g. DuplicateEventsDropped."""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def record(self, method: str, status: Any, seconds: float) -> None:
+        """Record one outbound call that took `seconds` and ended with `status`."""
+        key = (method, str(status))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = LatencyHistogram()
+            histogram.add(seconds * 1000)
+
+    def snapshot(self) -> Dict[Tuple[str, str], Dict[str, Any]]:
+        """Return the EMF statistics recorded so far, keyed by (method, status)."""
+        with self._lock:
+            return {key: histogram.to_emf() for key, histogram in self._histograms.items()}
+
+    def counters(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counters)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def flush(
+        self,
+        handler: str,
+        namespace: Optional[str] = None,
+        emit: Optional[Callable[[str], None]] = None,
+    ) -> List[str]:
+        """Write one EMF line per (method, status), plus one for the counters, then start over."""
+        with self._lock:
+            histograms, self._histograms = self._histograms, {}
+            counters, self._counters = self._counters, {}
+        if not histograms and not counters:
+            return []
+        namespace = namespace or os.environ.get(ENV_METRICS_NAMESPACE, DEFAULT_METRICS_NAMESPACE)
+        timestamp = int(time.time() * 1000)
+        lines = []
+        for (method, status), histogram in sorted(histograms.items()):
+            lines.append(json.dumps({
+                "_aws": {
+                    "Timestamp": timestamp,
+                    "CloudWatchMetrics": [{
+                        "Namespace": namespace,
+                        "Dimensions": [["Handler", "Method", "Status"], ["Handler", "Method"]],
+                        "Metrics": [{"Name": "Latency", "Unit": "Milliseconds"}, {"Name": "Calls", "Unit": "Count"}],
+                    }],
+                },
+                "Handler": handler,
+                "Method": method,
+                "Status": status,
+                "Latency": histogram.to_emf(),
+                "Calls": histogram.count,
+            }, separators=(",", ":")))
+        if counters:
+            lines.append(json.dumps({
+                "_aws": {
+                    "Timestamp": timestamp,
+                    "CloudWatchMetrics": [{
+                        "Namespace": namespace,
+                        "Dimensions": [["Handler"]],
+                        "Metrics": [{"Name": name, "Unit": "Count"} for name in sorted(counters)],
+                    }],
+                },
+                "Handler": handler,
+                **counters,
+            }, separators=(",", ":")))
+        # EMF lines must reach the log stream as bare JSON, so they bypass the logging formatter
+        write = emit or (lambda line: print(line, file=sys.stdout, flush=True))
+        for line in lines:
+            write(line)
+        return lines
+
+
+# Shared by every outbound call in the process; flushed by the handlers
+METRICS = MetricsRecorder()
+
+
+def _before_call(context: Dict[str, Any], **kwargs: Any) -> None:
+    context[_STARTED_KEY] = time.perf_counter()
+
+
+def _after_call(
+    event_name: str, context: Dict[str, Any], http_response: Any = None, parsed: Any = None, **kwargs: Any
+) -> None:
+    started = context.pop(_STARTED_KEY, None)
+    if started is None:
+        return
+    # Service errors report their code (e.g. ConditionalCheckFailedException) instead of a bare 400
+    error_code = parsed.get("Error", {}).get("Code") if isinstance(parsed, dict) else None
+    status = error_code or getattr(http_response, "status_code", "unknown")
+    # Event names are after-call.<service>.<Operation>
+    METRICS.record(event_name.split(".", 1)[1], status, time.perf_counter() - started)
+
+
+def _after_call_error(event_name: str, context: Dict[str, Any], exception: Exception, **kwargs: Any) -> None:
+    started = context.pop(_STARTED_KEY, None)
+    if started is not None:
+        METRICS.record(event_name.split(".", 1)[1], type(exception).__name__, time.perf_counter() - started)
+
+
+def instrument_boto_client(client: Any) -> Any:
+    """Time every API call the boto3 client makes, retries included, under service.Operation."""
+    events = client.meta.events
+    # First, so the clock starts even when another before-call handler short-circuits the request
+    events.register_first("before-call.*.*", _before_call)
+    events.register("after-call.*.*", _after_call)
+    events.register("after-call-error.*.*", _after_call_error)
+    return client
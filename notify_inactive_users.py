@@ -1,31 +1,91 @@
 import os
 import json
 import time
+import zlib
+import threading
+import multiprocessing
 import requests
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
-import boto3
-from mypy_boto3_secretsmanager.client import SecretsManagerClient
+import aws_clients
+from activity_table import load_last_active
+from metrics import METRICS
+from send_ledger import get_send_ledger
+from slack_records import ChannelRecord, UserRecord
+from slack_client import RATE_LIMITER, SlackRateLimited, slack_api_call
+from watermark_store import get_watermark_store
 from constants import (
     USERS_LIST_ENDPOINT,
     CONVERSATIONS_LIST_ENDPOINT,
     CONVERSATIONS_HISTORY_ENDPOINT,
+    CONVERSATIONS_MEMBERS_ENDPOINT,
     POST_MESSAGE_ENDPOINT,
     DEFAULT_DAYS_INACTIVE,
     DEFAULT_MESSAGE_TEMPLATE,
-    BASE_API_URL
+    DEFAULT_PAGE_SIZE,
+    DEFAULT_HISTORY_CONCURRENCY,
+    BASE_API_URL,
+    ENV_SLACK_API_BASE_URL,
+    ENV_LAMBDA_FUNCTION_NAME,
+    ACTIVITY_SOURCE_HISTORY,
+    ACTIVITY_SOURCE_TABLE,
+    DEFAULT_DELIVERY_CONCURRENCY,
+    DELIVERY_MAX_RETRIES,
+    DELIVERY_RETRY_BASE_SECONDS,
+    SEND_LEDGER_TTL_SECONDS,
+    SLACK_AUTH_ERRORS,
+    CHANNEL_ACCESS_ERRORS,
+    TRANSIENT_DELIVERY_ERRORS,
+    DEFAULT_SHARD_COUNT,
+    SHARD_BACKEND_PROCESS,
+    SHARD_BACKEND_LAMBDA,
+    SHARD_WORKER_ACTION
 )
 
-# Function to retrieve all configurations from Secrets Manager
-def get_config():
-    client : SecretsManagerClient = boto3.client('secretsmanager')
+# Raised when Slack rejects the bot token, so the caller can refresh it from Secrets Manager
+class SlackAuthError(Exception):
+    pass
+
+# Raised when a Web API page comes back with ok: false, so a failed read is never taken for a short one
+class SlackApiError(Exception):
+    def __init__(self, api_method, error):
+        super().__init__(api_method, error)
+        self.api_method = api_method
+        self.error = error
+
+    def __str__(self):
+        return f"{self.api_method} failed: {self.error}"
+
+# Users not yet seen active, shared by concurrent channel scans so each can stop once it has nothing left to find
+class PendingUsers:
+    def __init__(self, user_ids):
+        self._lock = threading.Lock()
+        self._pending = set(user_ids)
+
+    def resolve(self, user_id):
+        with self._lock:
+            self._pending.discard(user_id)
+
+    # Pending users among user_ids (all of them when user_ids is None), as a new set
+    def remaining(self, user_ids=None):
+        with self._lock:
+            return set(self._pending) if user_ids is None else self._pending & set(user_ids)
+
+    def __bool__(self):
+        with self._lock:
+            return bool(self._pending)
+
+# Function to retrieve all configurations from Secrets Manager (cached for the warm container)
+def get_config(force_refresh=False):
     try:
-        response = client.get_secret_value(SecretId=os.environ.get('SECRET_NAME'))
-        config = json.loads(response['SecretString'])
-        # Format URLs using BASE_API_URL for consistency
-        config['USERS_LIST_URL'] = f"{BASE_API_URL}{USERS_LIST_ENDPOINT}"
-        config['CONVERSATIONS_LIST_URL'] = f"{BASE_API_URL}{CONVERSATIONS_LIST_ENDPOINT}"
-        config['CONVERSATIONS_HISTORY_URL'] = f"{BASE_API_URL}{CONVERSATIONS_HISTORY_ENDPOINT}"
-        config['POST_MESSAGE_URL'] = f"{BASE_API_URL}{POST_MESSAGE_ENDPOINT}"
+        config = aws_clients.get_secret(os.environ.get('SECRET_NAME'), force_refresh=force_refresh)
+        # Format URLs using BASE_API_URL for consistency; the env override points runs at a local stub
+        base_url = os.environ.get(ENV_SLACK_API_BASE_URL, BASE_API_URL)
+        config['USERS_LIST_URL'] = f"{base_url}{USERS_LIST_ENDPOINT}"
+        config['CONVERSATIONS_LIST_URL'] = f"{base_url}{CONVERSATIONS_LIST_ENDPOINT}"
+        config['CONVERSATIONS_HISTORY_URL'] = f"{base_url}{CONVERSATIONS_HISTORY_ENDPOINT}"
+        config['CONVERSATIONS_MEMBERS_URL'] = f"{base_url}{CONVERSATIONS_MEMBERS_ENDPOINT}"
+        config['POST_MESSAGE_URL'] = f"{base_url}{POST_MESSAGE_ENDPOINT}"
         config['DEFAULT_DAYS_INACTIVE'] = DEFAULT_DAYS_INACTIVE
         config['DEFAULT_MESSAGE_TEMPLATE'] = DEFAULT_MESSAGE_TEMPLATE
         return config
@@ -33,41 +93,203 @@ def get_config():
         print(f"Error retrieving secret: {e}")
         return None
 
+# Generator that follows response_metadata.next_cursor and yields one page of results at a time
+# A page with ok: false raises SlackApiError instead of ending the iteration early
+def paginate(api_method, url, config, params=None):
+    page_params = dict(params or {})
+    page_params['limit'] = int(config.get('PAGE_SIZE', DEFAULT_PAGE_SIZE))
+    while True:
+        response = slack_api_call(
+            api_method,
+            'GET',
+            url,
+            headers={'Authorization': f"Bearer {config['SLACK_BOT_TOKEN']}"},
+            params=page_params
+        )
+        page = response.json()
+        if page.get('error') in SLACK_AUTH_ERRORS:
+            raise SlackAuthError(page['error'])
+        if page.get('ok') is False:
+            raise SlackApiError(api_method, page.get('error'))
+        yield page
+        cursor = (page.get('response_metadata') or {}).get('next_cursor')
+        if not cursor:
+            return
+        page_params = {**page_params, 'cursor': cursor}
+
+# Generator over all human, non-deleted users, projected to UserRecords so each raw page can be freed
+def iter_users(config):
+    for page in paginate('users.list', config['USERS_LIST_URL'], config):
+        for user in page.get('members', []):
+            if not user.get('is_bot') and not user.get('deleted'):
+                yield UserRecord.from_member(user)
+
+# Generator over all non-archived channels as ChannelRecords; archived channels can hold no new activity
+def iter_channels(config):
+    params = {'exclude_archived': 'true'}
+    for page in paginate('conversations.list', config['CONVERSATIONS_LIST_URL'], config, params):
+        for channel in page.get('channels', []):
+            if not channel.get('is_archived'):
+                yield ChannelRecord.from_channel(channel)
+
+# Generator over the user ids of a channel's current members
+def iter_channel_members(channel_id, config):
+    params = {'channel': channel_id}
+    for page in paginate('conversations.members', config['CONVERSATIONS_MEMBERS_URL'], config, params):
+        yield from page.get('members', [])
+
+# Generator over a channel's messages posted since oldest
+def iter_channel_messages(channel_id, config, oldest):
+    params = {'channel': channel_id, 'oldest': oldest}
+    for page in paginate('conversations.history', config['CONVERSATIONS_HISTORY_URL'], config, params):
+        yield from page.get('messages', [])
+
 # Function to retrieve all users
 def get_all_users(config):
-    response = requests.get(
-        config['USERS_LIST_URL'],
-        headers={'Authorization': f"Bearer {config['SLACK_BOT_TOKEN']}"}
-    )
-    users = response.json().get('members', [])
-    return [user for user in users if not user.get('is_bot') and not user.get('deleted')]
+    return list(iter_users(config))
 
 # Function to retrieve all channels
 def get_all_channels(config):
-    response = requests.get(
-        config['CONVERSATIONS_LIST_URL'],
-        headers={'Authorization': f"Bearer {config['SLACK_BOT_TOKEN']}"}
-    )
-    return response.json().get('channels', [])
+    return list(iter_channels(config))
+
+# Function to compute the oldest timestamp that still counts as recent activity
+def get_activity_cutoff(config):
+    days_inactive = int(config.get('DEFAULT_DAYS_INACTIVE', DEFAULT_DAYS_INACTIVE))
+    return int((datetime.now() - timedelta(days=days_inactive)).timestamp())
 
 # Function to check if a user is active in any channel in the last DEFAULT_DAYS_INACTIVE days
-def check_user_activity(user_id, channel_ids, config):
-    time_limit_last_active = int((datetime.now() - timedelta(days=int(config['DEFAULT_DAYS_INACTIVE']))).timestamp())
+# With a membership index, only the channels the user belongs to are read
+def check_user_activity(user_id, channel_ids, config, membership=None):
+    time_limit_last_active = get_activity_cutoff(config)
+    if membership is not None:
+        channel_ids = [channel_id for channel_id in channel_ids if user_id in membership.get(channel_id, ())]
     for channel_id in channel_ids:
-        response = requests.get(
-            config['CONVERSATIONS_HISTORY_URL'],
-            headers={'Authorization': f"Bearer {config['SLACK_BOT_TOKEN']}"},
-            params={'channel': channel_id, 'oldest': time_limit_last_active}
-        )
-        messages = response.json().get('messages', [])
-        for message in messages:
-            if message.get('user') == user_id:
-                return True
+        try:
+            for message in iter_channel_messages(channel_id, config, time_limit_last_active):
+                if message.get('user') == user_id:
+                    return True
+        except SlackApiError as e:
+            if e.error not in CHANNEL_ACCESS_ERRORS:
+                raise
     return False
 
+# Function to map every author in one channel to their latest message ts
+# Also returns the newest ts seen in the channel, which becomes its watermark. That is only the case
+# when the last page was read (ok: true, no next_cursor); paginate raises on any failed page
+# With pending users, the scan stops paginating once none of them who can post here (members, or
+# anyone when members is None) are left; the newest ts is then None, since older history was not read
+def scan_channel_activity(channel_id, config, oldest, pending=None, members=None):
+    last_seen = {}
+    newest_ts = 0
+    channel_pending = pending.remaining(members) if pending is not None else None
+    if channel_pending is not None and not channel_pending:
+        return last_seen, None
+    page_size = int(config.get('PAGE_SIZE', DEFAULT_PAGE_SIZE))
+    try:
+        for count, message in enumerate(iter_channel_messages(channel_id, config, oldest), 1):
+            ts = float(message.get('ts') or 0)
+            newest_ts = max(newest_ts, ts)
+            author = message.get('user')
+            if author and ts > last_seen.get(author, 0):
+                last_seen[author] = ts
+            if channel_pending is None:
+                continue
+            if author in channel_pending:
+                channel_pending.discard(author)
+                pending.resolve(author)
+            elif count % page_size == 0:
+                # Once a page, drop users other channels have resolved in the meantime
+                channel_pending = pending.remaining(channel_pending)
+            if not channel_pending:
+                return last_seen, None
+    except SlackApiError as e:
+        # A channel the bot cannot read is skipped, and keeps its watermark; any other failure aborts the run
+        if e.error not in CHANNEL_ACCESS_ERRORS:
+            raise
+        return last_seen, None
+    return last_seen, newest_ts
+
+# Function to fold one channel's activity into the index, keeping each user's latest ts
+def merge_activity(activity_index, channel_activity):
+    for user_id, ts in channel_activity.items():
+        if ts > activity_index.get(user_id, 0):
+            activity_index[user_id] = ts
+    return activity_index
+
+# Function to read each channel's history once and map every author to their latest message ts
+# HISTORY_CONCURRENCY > 1 fetches channels on a bounded thread pool; the rate limiter is shared
+# When watermarks are given, only messages newer than each channel's watermark are read and the
+# watermarks of fully read channels are advanced in place
+# When candidates are given, scanning stops as soon as every candidate has been seen; channels are
+# read biggest-first by candidate members, and channels with no pending candidate are not fetched
+def build_activity_index(channel_ids, config, oldest=None, watermarks=None, candidates=None, membership=None):
+    time_limit_last_active = get_activity_cutoff(config) if oldest is None else oldest
+    watermarks = {} if watermarks is None else watermarks
+    channel_oldest = {
+        channel_id: max(time_limit_last_active, watermarks.get(channel_id, 0))
+        for channel_id in channel_ids
+    }
+    concurrency = int(config.get('HISTORY_CONCURRENCY', DEFAULT_HISTORY_CONCURRENCY))
+    if candidates is None:
+        scan = lambda channel_id: scan_channel_activity(channel_id, config, channel_oldest[channel_id])
+    else:
+        candidates = set(candidates)
+        pending = PendingUsers(candidates)
+        members_of = lambda channel_id: membership.get(channel_id, set()) if membership is not None else None
+        if membership is not None:
+            channel_ids = sorted(channel_ids, key=lambda channel_id: len(members_of(channel_id) & candidates), reverse=True)
+        scan = lambda channel_id: scan_channel_activity(
+            channel_id, config, channel_oldest[channel_id], pending, members_of(channel_id)
+        )
+
+    executor = ThreadPoolExecutor(max_workers=concurrency) if concurrency > 1 else None
+    activity_index = {}
+    advanced = {}
+    try:
+        results = executor.map(scan, channel_ids) if executor else map(scan, channel_ids)
+        for channel_id, (channel_activity, newest_ts) in zip(channel_ids, results):
+            merge_activity(activity_index, channel_activity)
+            if newest_ts is not None:
+                advanced[channel_id] = newest_ts
+    finally:
+        if executor:
+            executor.shutdown()
+    # Applied only once every channel was scanned, so a failed read leaves all watermarks where they were
+    merge_activity(watermarks, advanced)
+    return activity_index
+
+# Function to read a channel's members; a channel the bot cannot read has none it could scan for
+def get_channel_members(channel_id, config):
+    try:
+        return set(iter_channel_members(channel_id, config))
+    except SlackApiError as e:
+        if e.error not in CHANNEL_ACCESS_ERRORS:
+            raise
+        return set()
+
+# Function to map each channel to the set of its members (channel_id -> {user_id})
+# Uses the same bounded thread pool as the history scan when HISTORY_CONCURRENCY > 1
+def build_membership_index(channel_ids, config):
+    concurrency = int(config.get('HISTORY_CONCURRENCY', DEFAULT_HISTORY_CONCURRENCY))
+    fetch = lambda channel_id: get_channel_members(channel_id, config)
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            return dict(zip(channel_ids, executor.map(fetch, channel_ids)))
+    return {channel_id: fetch(channel_id) for channel_id in channel_ids}
+
+# Function to keep only the channels with at least one candidate member; the rest are never read
+def select_candidate_channels(channel_ids, membership, candidates):
+    return [channel_id for channel_id in channel_ids if not membership.get(channel_id, set()).isdisjoint(candidates)]
+
+# Function to decide from the activity index whether a user was active since the cutoff
+def is_user_active(user_id, activity_index, cutoff):
+    return activity_index.get(user_id, 0) >= cutoff
+
 # Function to send a message to a user
 def send_message(user_id, user_name, config):
-    response = requests.post(
+    response = slack_api_call(
+        'chat.postMessage',
+        'POST',
         config['POST_MESSAGE_URL'],
         headers={'Authorization': f"Bearer {config['SLACK_BOT_TOKEN']}", 'Content-Type': 'application/json; charset=utf-8'},
         json={
@@ -77,26 +299,221 @@ def send_message(user_id, user_name, config):
     )
     return response.json()
 
-# Main Lambda function handler
+# Function to send one nudge, retrying transient Slack and connection errors with backoff
+def deliver_nudge(nudge, config):
+    for attempt in range(DELIVERY_MAX_RETRIES + 1):
+        if attempt:
+            time.sleep(DELIVERY_RETRY_BASE_SECONDS * 2 ** (attempt - 1))
+        try:
+            result = send_message(nudge['user_id'], nudge['name'], config)
+        except SlackRateLimited as e:
+            result = {'ok': False, 'error': 'ratelimited', 'detail': str(e)}
+        except requests.RequestException as e:
+            result = {'ok': False, 'error': 'connection_error', 'detail': str(e)}
+        if result.get('ok') or result.get('error') not in TRANSIENT_DELIVERY_ERRORS:
+            break
+    return result
+
+# Function to send the queued nudges concurrently, skipping users the ledger says were already messaged
+def deliver_nudges(pending, config, ledger, run_date):
+    already_sent = ledger.load_sent(run_date)
+    queue = [nudge for nudge in pending if nudge['user_id'] not in already_sent]
+    summary = {'sent': 0, 'skipped': len(pending) - len(queue), 'failed': []}
+    if not queue:
+        return summary
+
+    concurrency = int(config.get('DELIVERY_CONCURRENCY', DEFAULT_DELIVERY_CONCURRENCY))
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        futures = {executor.submit(deliver_nudge, nudge, config): nudge for nudge in queue}
+        # Recorded as each send finishes, so a slow nudge cannot hold back the ledger writes of later ones
+        for future in as_completed(futures):
+            nudge, result = futures[future], future.result()
+            if result.get('ok'):
+                ledger.record_sent(nudge['user_id'], run_date)
+                summary['sent'] += 1
+            else:
+                summary['failed'].append({'user_id': nudge['user_id'], 'error': result.get('error')})
+    return summary
+
+# Function to assign a channel to a shard; crc32 is stable across processes, unlike hash()
+def shard_for(key, shard_count):
+    return zlib.crc32(key.encode('utf-8')) % shard_count
+
+# Function to split channel ids into shard_count deterministic shards
+def split_into_shards(channel_ids, shard_count):
+    shards = [[] for _ in range(shard_count)]
+    for channel_id in channel_ids:
+        shards[shard_for(channel_id, shard_count)].append(channel_id)
+    return shards
+
+# Worker: scan one shard of channels and return its partial activity index and advanced watermarks
+# Workers split the Slack rate budget, since every process or invocation has its own limiter
+def scan_shard(shard, config):
+    RATE_LIMITER.set_share(shard.get('rate_share', 1.0))
+    watermarks = dict(shard.get('watermarks') or {})
+    candidates = set(shard['candidates']) if shard.get('candidates') is not None else None
+    membership = shard.get('membership')
+    if membership is not None:
+        membership = {channel_id: set(members) for channel_id, members in membership.items()}
+    activity_index = build_activity_index(
+        shard['channels'], config, oldest=shard['oldest'], watermarks=watermarks,
+        candidates=candidates, membership=membership
+    )
+    return {'activity': activity_index, 'watermarks': watermarks}
+
+# Function to run one shard as a separate invocation of the worker Lambda (this function by default)
+def invoke_shard_worker(shard, config):
+    function_name = config.get('SHARD_WORKER_FUNCTION') or os.environ.get(ENV_LAMBDA_FUNCTION_NAME)
+    response = aws_clients.get_lambda_client().invoke(
+        FunctionName=function_name,
+        Payload=json.dumps({'action': SHARD_WORKER_ACTION, **shard})
+    )
+    result = json.loads(response['Payload'].read())
+    if response.get('FunctionError'):
+        if result.get('errorType') == 'SlackAuthError':
+            raise SlackAuthError(result.get('errorMessage'))
+        raise RuntimeError(f"Shard worker failed: {result}")
+    return result
+
+# Worker process entry point: scan a shard, then flush the worker's own metrics to the shared log stream
+def run_shard_worker(shard, config):
+    try:
+        return scan_shard(shard, config)
+    finally:
+        METRICS.flush('notify_inactive_users')
+
+# Function to run the shards in parallel: a local process pool, or one Lambda invocation per shard
+# The process backend is for local runs only (Lambda has no /dev/shm, so a process pool cannot start
+# there); inside Lambda the backend defaults to one invocation per shard
+def run_shards(shards, config):
+    in_lambda = bool(os.environ.get(ENV_LAMBDA_FUNCTION_NAME))
+    backend = config.get('SHARD_BACKEND') or (SHARD_BACKEND_LAMBDA if in_lambda else SHARD_BACKEND_PROCESS)
+    if backend == SHARD_BACKEND_LAMBDA:
+        with ThreadPoolExecutor(max_workers=len(shards)) as executor:
+            return list(executor.map(lambda shard: invoke_shard_worker(shard, config), shards))
+    if in_lambda:
+        raise ValueError("SHARD_BACKEND=process is for local runs only; use SHARD_BACKEND=lambda inside Lambda")
+    # spawn, so workers do not inherit the parent's pooled HTTP connections
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=len(shards), mp_context=context) as executor:
+        return list(executor.map(run_shard_worker, shards, [config] * len(shards)))
+
+# Coordinator: split channels across SHARD_COUNT workers and merge their partial results
+# Merging keeps each user's and channel's latest ts, so the result matches a single-worker scan
+# Each shard shrinks its own copy of the candidate set; only candidate members are sent along
+def build_sharded_activity_index(channel_ids, config, oldest, watermarks, candidates=None, membership=None):
+    shard_count = int(config.get('SHARD_COUNT', DEFAULT_SHARD_COUNT))
+    channel_shards = [shard for shard in split_into_shards(channel_ids, shard_count) if shard]
+    shards = []
+    for channel_shard in channel_shards:
+        shard = {
+            'channels': channel_shard,
+            'oldest': oldest,
+            'watermarks': {channel_id: watermarks[channel_id] for channel_id in channel_shard if channel_id in watermarks},
+            'rate_share': 1.0 / len(channel_shards),
+        }
+        if candidates is not None:
+            shard['candidates'] = sorted(candidates)
+        if candidates is not None and membership is not None:
+            shard['membership'] = {
+                channel_id: sorted(membership.get(channel_id, set()) & candidates) for channel_id in channel_shard
+            }
+        shards.append(shard)
+    activity_index = {}
+    for result in run_shards(shards, config) if shards else []:
+        merge_activity(activity_index, result['activity'])
+        merge_activity(watermarks, result['watermarks'])
+    return activity_index
+
+# Function to build the activity index by crawling channel history
+# When candidates (the user ids still to classify) are given, only channels with a candidate who
+# has not already been seen since the cutoff are read; MEMBERSHIP_FILTER=False turns this off
+def build_activity_from_history(config, cutoff, candidates=None):
+    # Incremental runs only read history newer than the stored per-channel watermarks
+    watermark_store = get_watermark_store(config, ttl_seconds=int(datetime.now().timestamp()) - cutoff)
+    channel_watermarks, user_last_seen = watermark_store.load() if watermark_store else ({}, {})
+    unresolved = membership = None
+    if candidates is not None:
+        unresolved = {user_id for user_id in candidates if user_last_seen.get(user_id, 0) < cutoff}
+        if not unresolved:
+            # Every candidate was already seen since the cutoff; no Slack read could change the result
+            return merge_activity({}, user_last_seen)
+
+    channel_ids = [channel.id for channel in iter_channels(config)]
+    if unresolved is not None and config.get('MEMBERSHIP_FILTER', True):
+        membership = build_membership_index(channel_ids, config)
+        channel_ids = select_candidate_channels(channel_ids, membership, unresolved)
+    if int(config.get('SHARD_COUNT', DEFAULT_SHARD_COUNT)) > 1:
+        activity_index = build_sharded_activity_index(
+            channel_ids, config, cutoff, channel_watermarks, unresolved, membership
+        )
+    else:
+        activity_index = build_activity_index(
+            channel_ids, config, oldest=cutoff, watermarks=channel_watermarks,
+            candidates=unresolved, membership=membership
+        )
+    merge_activity(activity_index, user_last_seen)
+    if watermark_store:
+        recent = {user_id: ts for user_id, ts in activity_index.items() if ts >= cutoff}
+        watermark_store.save(channel_watermarks, recent)
+    return activity_index
+
+# Function to build the activity index from ACTIVITY_SOURCE: channel history or the last-active table
+def collect_activity(config, cutoff, candidates=None):
+    if config.get('ACTIVITY_SOURCE', ACTIVITY_SOURCE_HISTORY) == ACTIVITY_SOURCE_TABLE:
+        return load_last_active(cutoff, config.get('ACTIVITY_TABLE'))
+    return build_activity_from_history(config, cutoff, candidates)
+
+# Main Lambda function handler; latency and call counts of every outbound call are flushed once per invocation
 def lambda_handler(event, context):
+    try:
+        return run_invocation(event)
+    finally:
+        METRICS.flush('notify_inactive_users')
+
+# Function to load the configuration and handle the event, retrying once with a refreshed bot token
+def run_invocation(event):
     config = get_config()
     if not config:
         return {'statusCode': 500, 'body': 'Failed to retrieve configuration from Secrets Manager'}
 
-    users = get_all_users(config)
-    channels = get_all_channels(config)
-    channel_ids = [channel['id'] for channel in channels]
+    try:
+        return handle_event(event, config)
+    except SlackAuthError:
+        # The bot token was rotated; re-read it once and start over
+        config = get_config(force_refresh=True)
+        if not config:
+            return {'statusCode': 500, 'body': 'Failed to retrieve configuration from Secrets Manager'}
+        return handle_event(event, config)
+
+# Function to route an invocation: a shard scan sent by a coordinator, or a full notify run
+def handle_event(event, config):
+    if (event or {}).get('action') == SHARD_WORKER_ACTION:
+        return scan_shard(event, config)
+    # A warm container that last ran a shard must not keep that shard's reduced rate budget
+    RATE_LIMITER.set_share(1.0)
+    return notify_inactive(event, config)
+
+# Function to find inactive users and deliver their nudges
+def notify_inactive(event, config):
+    cutoff = get_activity_cutoff(config)
+    # Users are listed first so the history scan can skip channels none of them belong to
+    users = list(iter_users(config))
+    activity_index = collect_activity(config, cutoff, {user.id for user in users})
 
     inactive_users = []
     for user in users:
-        user_id = user['id']
-        user_name = user['name']
-        if not check_user_activity(user_id, channel_ids, config):
+        user_id = user.id
+        user_name = user.name
+        if not is_user_active(user_id, activity_index, cutoff):
             inactive_users.append({'user_id': user_id, 'name': user_name})
-            send_message(user_id, user_name, config)
-            time.sleep(1)  # Rate limiting
+
+    # Reruns for the same run_date only send the nudges the ledger has not recorded yet
+    run_date = (event or {}).get('run_date') or datetime.now().date().isoformat()
+    ledger = get_send_ledger(config, ttl_seconds=SEND_LEDGER_TTL_SECONDS)
+    delivery = deliver_nudges(inactive_users, config, ledger, run_date)
 
     return {
         'statusCode': 200,
-        'body': json.dumps({'inactive_users': inactive_users})
+        'body': json.dumps({'inactive_users': inactive_users, 'delivery': delivery})
     }
\ No newline at end of file
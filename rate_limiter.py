@@ -0,0 +1,135 @@
+import math
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from constants import (
+    DEFAULT_SLACK_TIER,
+    RATE_LIMIT_BURST_SECONDS,
+    SLACK_METHOD_TIERS,
+    SLACK_TIER_RATES,
+)
+
+# Lower bound for the adaptive rate, as a fraction of the nominal tier rate
+MIN_RATE_FRACTION = 0.125
+# Fraction of the nominal rate regained after each successful call
+RECOVERY_FRACTION = 0.05
+
+
+class TokenBucket:
+    """Thread-safe token bucket that adapts its refill rate to throttling."""
+
+    def __init__(
+        self,
+        rate_per_minute: float,
+        burst_seconds: float = RATE_LIMIT_BURST_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Optional[Callable[[float], None]] = None,
+    ) -> None:
+        self.nominal_rate = rate_per_minute / 60.0
+        self.rate = self.nominal_rate
+        self.capacity = max(1, math.ceil(self.nominal_rate * burst_seconds))
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._tokens = float(self.capacity)
+        self._updated_at = clock()
+        self._blocked_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        elapsed = max(0.0, now - self._updated_at)
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._updated_at = now
+
+    def acquire(self) -> float:
+        """Take one token, sleeping until it is available. Returns the seconds waited."""
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            self._tokens -= 1
+            wait = max(0.0, -self._tokens / self.rate, self._blocked_until - now)
+        if wait:
+            (self._sleep or time.sleep)(wait)
+        return wait
+
+    def throttled(self, retry_after: float) -> None:
+        """Honor a Retry-After pause and halve the refill rate."""
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            self._blocked_until = max(self._blocked_until, now + retry_after)
+            self._tokens = min(self._tokens, 0.0)
+            self.rate = max(self.nominal_rate * MIN_RATE_FRACTION, self.rate / 2)
+
+    def succeeded(self) -> None:
+        """Recover the refill rate additively towards the nominal tier rate."""
+        with self._lock:
+            if self.rate < self.nominal_rate:
+                self.rate = min(self.nominal_rate, self.rate + self.nominal_rate * RECOVERY_FRACTION)
+
+    def reset(self) -> None:
+        """Refill the bucket and forget any throttling."""
+        with self._lock:
+            self.rate = self.nominal_rate
+            self._tokens = float(self.capacity)
+            self._updated_at = self._clock()
+            self._blocked_until = 0.0
+
+
+class RateLimiter:
+    """Per-method token buckets sized from the Slack rate limit tiers."""
+
+    def __init__(
+        self,
+        method_tiers: Optional[Dict[str, int]] = None,
+        tier_rates: Optional[Dict[int, float]] = None,
+        burst_seconds: float = RATE_LIMIT_BURST_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Optional[Callable[[float], None]] = None,
+    ) -> None:
+        self.method_tiers = dict(SLACK_METHOD_TIERS if method_tiers is None else method_tiers)
+        self.tier_rates = dict(SLACK_TIER_RATES if tier_rates is None else tier_rates)
+        self.burst_seconds = burst_seconds
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, TokenBucket] = {}
+        self.throttle_events = 0
+        # Fraction of the workspace budget this process may use, e.g. 1/N for one of N shard workers
+        self.share = 1.0
+
+    def bucket(self, method: str) -> TokenBucket:
+        """Return the bucket for a Slack method, creating it on first use."""
+        with self._lock:
+            bucket = self._buckets.get(method)
+            if bucket is None:
+                tier = self.method_tiers.get(method, DEFAULT_SLACK_TIER)
+                bucket = TokenBucket(self.tier_rates[tier] * self.share, self.burst_seconds, self._clock, self._sleep)
+                self._buckets[method] = bucket
+            return bucket
+
+    def acquire(self, method: str) -> float:
+        return self.bucket(method).acquire()
+
+    def throttled(self, method: str, retry_after: float) -> None:
+        with self._lock:
+            self.throttle_events += 1
+        self.bucket(method).throttled(retry_after)
+
+    def succeeded(self, method: str) -> None:
+        self.bucket(method).succeeded()
+
+    def set_share(self, share: float) -> None:
+        """Resize every bucket to a fraction of the tier rates, for workers that split one budget."""
+        with self._lock:
+            if share == self.share:
+                return
+            self.share = share
+            self._buckets.clear()
+
+    def reset(self) -> None:
+        """Drop all buckets and counters, e.g. between tests."""
+        with self._lock:
+            self._buckets.clear()
+            self.throttle_events = 0
+            self.share = 1.0
@@ -0,0 +1,95 @@
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Set
+
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
+
+import aws_clients
+from constants import ENV_SEND_LEDGER_FILE, ENV_SEND_LEDGER_TABLE
+
+
+class InMemorySendLedger:
+    """Records which users were nudged on which run date, for the life of the process."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._sent: Dict[str, Set[str]] = {}
+
+    def load_sent(self, run_date: str) -> Set[str]:
+        """Return the user ids already messaged for run_date."""
+        with self._lock:
+            return set(self._sent.get(run_date, ()))
+
+    def record_sent(self, user_id: str, run_date: str) -> None:
+        """Mark user_id as messaged for run_date."""
+        with self._lock:
+            self._sent.setdefault(run_date, set()).add(user_id)
+
+
+class LocalFileSendLedger(InMemorySendLedger):
+    """Local stand-in that appends one JSON line per delivered nudge."""
+
+    def __init__(self, path: str) -> None:
+        super().__init__()
+        self.path = path
+
+    def load_sent(self, run_date: str) -> Set[str]:
+        sent: Set[str] = set()
+        if os.path.exists(self.path):
+            with open(self.path) as f:
+                for line in f:
+                    entry = json.loads(line)
+                    if entry["run_date"] == run_date:
+                        sent.add(entry["user_id"])
+        return sent
+
+    def record_sent(self, user_id: str, run_date: str) -> None:
+        with self._lock:
+            with open(self.path, "a") as f:
+                f.write(json.dumps({"user_id": user_id, "run_date": run_date}) + "\n")
+                f.flush()
+
+
+class DynamoSendLedger:
+    """Ledger in a DynamoDB table with partition key run_date and sort key user_id."""
+
+    def __init__(self, table_name: str, ttl_seconds: Optional[int] = None) -> None:
+        self.table = aws_clients.get_table(table_name)
+        self.ttl_seconds = ttl_seconds
+
+    def load_sent(self, run_date: str) -> Set[str]:
+        query_kwargs: Dict[str, Any] = {
+            "KeyConditionExpression": Key("run_date").eq(run_date),
+            "ProjectionExpression": "user_id",
+        }
+        sent: Set[str] = set()
+        while True:
+            response = self.table.query(**query_kwargs)
+            sent.update(item["user_id"] for item in response.get("Items", []))
+            if "LastEvaluatedKey" not in response:
+                return sent
+            query_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    def record_sent(self, user_id: str, run_date: str) -> None:
+        item: Dict[str, Any] = {"run_date": run_date, "user_id": user_id}
+        if self.ttl_seconds:
+            item["expires_at"] = int(time.time()) + self.ttl_seconds
+        try:
+            self.table.put_item(Item=item, ConditionExpression="attribute_not_exists(user_id)")
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") != "ConditionalCheckFailedException":
+                raise
+
+
+def get_send_ledger(config: Dict[str, Any], ttl_seconds: Optional[int] = None):
+    """Pick the ledger configured for this run; defaults to an in-process ledger."""
+    table_name = config.get("SEND_LEDGER_TABLE") or os.environ.get(ENV_SEND_LEDGER_TABLE)
+    if table_name:
+        return DynamoSendLedger(table_name, ttl_seconds)
+    path = config.get("SEND_LEDGER_FILE") or os.environ.get(ENV_SEND_LEDGER_FILE)
+    if path:
+        return LocalFileSendLedger(path)
+    return InMemorySendLedger()
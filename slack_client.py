@@ -0,0 +1,150 @@
+import os
+import threading
+import time
+from typing import Any, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from constants import (
+    DEFAULT_HTTP_CONNECT_RETRIES,
+    DEFAULT_HTTP_CONNECT_TIMEOUT,
+    DEFAULT_HTTP_POOL_SIZE,
+    DEFAULT_HTTP_READ_TIMEOUT,
+    DEFAULT_INTERACTIVE_CONNECT_TIMEOUT,
+    DEFAULT_INTERACTIVE_READ_TIMEOUT,
+    DEFAULT_RETRY_AFTER_SECONDS,
+    ENV_HTTP_CONNECT_RETRIES,
+    ENV_HTTP_CONNECT_TIMEOUT,
+    ENV_HTTP_POOL_SIZE,
+    ENV_HTTP_READ_TIMEOUT,
+    ENV_INTERACTIVE_CONNECT_TIMEOUT,
+    ENV_INTERACTIVE_READ_TIMEOUT,
+    RATE_LIMIT_MAX_RETRIES,
+)
+from metrics import METRICS
+from rate_limiter import RateLimiter
+
+# Shared by every Slack call in the process so each method draws from one bucket
+RATE_LIMITER = RateLimiter()
+
+_lock = threading.Lock()
+_session: Optional[requests.Session] = None
+
+
+class SlackRateLimited(Exception):
+    """A call still answered HTTP 429 after its retries; retry_after is Slack's last Retry-After."""
+
+    def __init__(self, api_method: str, retry_after: float) -> None:
+        super().__init__(api_method, retry_after)
+        self.api_method = api_method
+        self.retry_after = retry_after
+
+    def __str__(self) -> str:
+        return f"{self.api_method} rate limited; retry after {self.retry_after:g} s"
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter that applies a default (connect, read) timeout to every request."""
+
+    def __init__(self, timeout: Any, *args: Any, **kwargs: Any) -> None:
+        self.timeout = timeout
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):  # type: ignore[override]
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        return super().send(request, **kwargs)
+
+
+def build_session() -> requests.Session:
+    """Build a keep-alive session with a bounded pool and retries on connection errors."""
+    pool_size = int(os.environ.get(ENV_HTTP_POOL_SIZE, DEFAULT_HTTP_POOL_SIZE))
+    connect_retries = int(os.environ.get(ENV_HTTP_CONNECT_RETRIES, DEFAULT_HTTP_CONNECT_RETRIES))
+    timeout = (
+        float(os.environ.get(ENV_HTTP_CONNECT_TIMEOUT, DEFAULT_HTTP_CONNECT_TIMEOUT)),
+        float(os.environ.get(ENV_HTTP_READ_TIMEOUT, DEFAULT_HTTP_READ_TIMEOUT)),
+    )
+    # Only retry when the request never reached Slack, so POSTs cannot be sent twice. 429s must reach
+    # slack_api_call and the rate limiter, so urllib3 may not retry them on the Retry-After header either
+    retry = Retry(
+        total=connect_retries, connect=connect_retries, read=0, status=0, redirect=0, backoff_factor=0.1,
+        respect_retry_after_header=False,
+    )
+    adapter = TimeoutHTTPAdapter(timeout, pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    """Return the session shared for the life of the warm container."""
+    global _session
+    with _lock:
+        if _session is None:
+            _session = build_session()
+        return _session
+
+
+def reset_session() -> None:
+    """Close and forget the shared session, e.g. between tests."""
+    global _session
+    with _lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+
+
+def get_interactive_timeout() -> Tuple[float, float]:
+    """(connect, read) timeout for calls made while Slack waits on the handler's answer."""
+    return (
+        float(os.environ.get(ENV_INTERACTIVE_CONNECT_TIMEOUT, DEFAULT_INTERACTIVE_CONNECT_TIMEOUT)),
+        float(os.environ.get(ENV_INTERACTIVE_READ_TIMEOUT, DEFAULT_INTERACTIVE_READ_TIMEOUT)),
+    )
+
+
+def get_retry_after(response: requests.Response) -> float:
+    """Read the Retry-After header of a throttled response."""
+    try:
+        return float(response.headers.get("Retry-After", DEFAULT_RETRY_AFTER_SECONDS))
+    except (TypeError, ValueError):
+        return DEFAULT_RETRY_AFTER_SECONDS
+
+
+def slack_api_call(
+    api_method: str,
+    http_method: str,
+    url: str,
+    max_retries: int = RATE_LIMIT_MAX_RETRIES,
+    rate_limited: bool = True,
+    **kwargs: Any,
+) -> requests.Response:
+    """Call a Slack Web API method on the shared session under the rate limiter, retrying on HTTP 429.
+
+    Raises SlackRateLimited when the last attempt is still throttled, so a 429 body is never read as data.
+    rate_limited=False bypasses the limiter entirely: the call never waits and a 429 blocks nothing,
+    for interactive paths that must answer within Slack's deadline.
+    """
+    session = get_session()
+    send = session.post if http_method == "POST" else session.get
+    for _ in range(max_retries + 1):
+        if rate_limited:
+            RATE_LIMITER.acquire(api_method)
+        # Timed after the limiter wait, so latency is Slack's and not our own throttling
+        started = time.perf_counter()
+        try:
+            response = send(url, **kwargs)
+        except requests.RequestException as e:
+            METRICS.record(api_method, type(e).__name__, time.perf_counter() - started)
+            raise
+        METRICS.record(api_method, response.status_code, time.perf_counter() - started)
+        if response.status_code != 429:
+            if rate_limited:
+                RATE_LIMITER.succeeded(api_method)
+            return response
+        retry_after = get_retry_after(response)
+        if rate_limited:
+            RATE_LIMITER.throttled(api_method, retry_after)
+    raise SlackRateLimited(api_method, retry_after)
@@ -0,0 +1,57 @@
+"""Compact records for the Slack users and channels the notify job keeps in memory.
+
+users.list and conversations.list return a few kilobytes of JSON per object (profile, avatar URLs,
+topic, purpose, ...), while the job only needs a user's id and name and a channel's id. Each page
+is projected onto these records as it is read, so the raw objects are freed one page at a time
+instead of living for the whole run.
+"""
+from typing import Any, Dict
+
+
+class UserRecord:
+    """A human, non-deleted workspace member: only the fields the nudge needs."""
+
+    __slots__ = ("id", "name")
+
+    def __init__(self, id: str, name: str) -> None:
+        self.id = id
+        self.name = name
+
+    @classmethod
+    def from_member(cls, member: Dict[str, Any]) -> "UserRecord":
+        return cls(member["id"], member.get("name", ""))
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, UserRecord):
+            return NotImplemented
+        return self.id == other.id and self.name == other.name
+
+    def __hash__(self) -> int:
+        return hash(self.id)
+
+    def __repr__(self) -> str:
+        return f"UserRecord(id={self.id!r}, name={self.name!r})"
+
+
+class ChannelRecord:
+    """A live channel whose history may be scanned."""
+
+    __slots__ = ("id",)
+
+    def __init__(self, id: str) -> None:
+        self.id = id
+
+    @classmethod
+    def from_channel(cls, channel: Dict[str, Any]) -> "ChannelRecord":
+        return cls(channel["id"])
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, ChannelRecord):
+            return NotImplemented
+        return self.id == other.id
+
+    def __hash__(self) -> int:
+        return hash(self.id)
+
+    def __repr__(self) -> str:
+        return f"ChannelRecord(id={self.id!r})"
@@ -0,0 +1,132 @@
+"""JSON log lines for the event path, with payload redaction, a size cap and per-event-type sampling.
+
+Payloads are attached to a record as `extra={"payload": ...}` and are only redacted, trimmed and
+serialized by JsonFormatter when the record is actually emitted. Handlers call should_log_payload
+first, so unsampled events cost one random() call.
+"""
+import json
+import logging
+import os
+import random
+import re
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from constants import (
+    DEFAULT_LOG_PAYLOAD_MAX_BYTES,
+    DEFAULT_LOG_SAMPLE_RATES,
+    ENV_LOG_LEVEL,
+    ENV_LOG_PAYLOAD_MAX_BYTES,
+    ENV_LOG_SAMPLE_RATES,
+    LOG_MAX_LIST_ITEMS,
+    LOG_MAX_STRING_CHARS,
+    REDACTED_LOG_KEYS,
+)
+
+REDACTED = "[REDACTED]"
+TRUNCATED = "..."
+# Slack tokens (bot, user, app, refresh) wherever they appear in free text
+SLACK_TOKEN_PATTERN = re.compile(r"xox[a-z]-[A-Za-z0-9-]+|xapp-[A-Za-z0-9-]+")
+_REDACTED_KEYS = frozenset(key.lower() for key in REDACTED_LOG_KEYS)
+
+
+def parse_sample_rates(value: Optional[str]) -> Dict[str, float]:
+    """Parse "block_actions=1,message=0.01,default=0.1" into rates layered over the defaults."""
+    rates = dict(DEFAULT_LOG_SAMPLE_RATES)
+    for part in (value or "").split(","):
+        name, sep, rate = part.partition("=")
+        if sep and name.strip():
+            rates[name.strip()] = min(1.0, max(0.0, float(rate)))
+    return rates
+
+
+# Read once per container; Lambda environment variables cannot change while it is warm
+SAMPLE_RATES = parse_sample_rates(os.environ.get(ENV_LOG_SAMPLE_RATES))
+PAYLOAD_MAX_BYTES = int(os.environ.get(ENV_LOG_PAYLOAD_MAX_BYTES, DEFAULT_LOG_PAYLOAD_MAX_BYTES))
+
+
+def should_log_payload(event_type: Optional[str], rand: Callable[[], float] = random.random) -> bool:
+    """Decide whether this event's payload is logged, from the rate for its type (or the default)."""
+    rate = SAMPLE_RATES.get(event_type or "", SAMPLE_RATES["default"])
+    return rate >= 1.0 or (rate > 0.0 and rand() < rate)
+
+
+def redact(value: Any, budget: Optional[List[int]] = None) -> Any:
+    """Copy value with secrets and user text replaced, long strings cut and long lists shortened.
+
+    budget is a one-item list of the characters of JSON still allowed; once it runs out the walk
+    stops descending, so the cost is bounded by the output size rather than the payload size.
+    """
+    if budget is not None and budget[0] <= 0:
+        return TRUNCATED
+    if isinstance(value, bytes):
+        value = value.decode("utf-8", "replace")
+    if isinstance(value, str):
+        if len(value) > LOG_MAX_STRING_CHARS:
+            value = f"{value[:LOG_MAX_STRING_CHARS]}{TRUNCATED} ({len(value)} chars)"
+        if budget is not None:
+            budget[0] -= len(value) + 2
+        # The substring checks skip the regex for the common case of text without tokens
+        if "xox" in value or "xapp" in value:
+            value = SLACK_TOKEN_PATTERN.sub(REDACTED, value)
+        return value
+    if isinstance(value, dict):
+        copied = {}
+        for key, item in value.items():
+            name = str(key)
+            if budget is not None:
+                budget[0] -= len(name) + 4
+                if budget[0] <= 0:
+                    copied[TRUNCATED] = f"{len(value) - len(copied)} more keys"
+                    break
+            copied[key] = REDACTED if name.lower() in _REDACTED_KEYS else redact(item, budget)
+        return copied
+    if isinstance(value, (list, tuple)):
+        items = []
+        for item in value[:LOG_MAX_LIST_ITEMS]:
+            if budget is not None and budget[0] <= 0:
+                break
+            items.append(redact(item, budget))
+        if len(value) > len(items):
+            items.append(f"{TRUNCATED} {len(value) - len(items)} more")
+        return items
+    if budget is not None:
+        budget[0] -= 8
+    return value
+
+
+def bounded_json(value: Any, max_bytes: int) -> Any:
+    """Redacted copy of value whose JSON is about max_bytes at most; the walk stops at the cap."""
+    return redact(value, [max_bytes])
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, extra fields and an optional payload."""
+
+    def __init__(self, max_payload_bytes: Optional[int] = None) -> None:
+        super().__init__()
+        self.max_payload_bytes = PAYLOAD_MAX_BYTES if max_payload_bytes is None else max_payload_bytes
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", None) or {})
+        if hasattr(record, "payload"):
+            entry["payload"] = bounded_json(record.payload, self.max_payload_bytes)
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, separators=(",", ":"))
+
+
+def configure_json_logging(logger: logging.Logger) -> None:
+    """Attach a JSON handler on first use; LOG_LEVEL sets the level (INFO by default)."""
+    if logger.handlers:
+        return
+    logger.setLevel(os.environ.get(ENV_LOG_LEVEL, "INFO").upper())
+    handler = logging.StreamHandler()
+    handler.setFormatter(JsonFormatter())
+    logger.addHandler(handler)
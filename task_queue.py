@@ -0,0 +1,68 @@
+import json
+import logging
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional
+
+from constants import DEFAULT_TASK_WORKERS, ENV_TASK_QUEUE_URL, ENV_TASK_WORKERS
+
+logger = logging.getLogger(__name__)
+
+Task = Dict[str, Any]
+
+
+class InProcessTaskQueue:
+    """Local stand-in that runs tasks on a small background thread pool.
+
+    For local runs only: Lambda freezes the container once the handler returns, so a task still
+    running at that point only resumes on the next invocation. Inside Lambda, fast-ack mode needs
+    the SQS backend and the handler processes inline without it.
+    """
+
+    def __init__(self, handler: Callable[[Task], Any], max_workers: int = DEFAULT_TASK_WORKERS) -> None:
+        self.handler = handler
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="task-queue")
+        self._lock = threading.Lock()
+        self._pending: List[Future] = []
+
+    def _run(self, task: Task) -> None:
+        try:
+            self.handler(task)
+        except Exception as e:
+            logger.error("Deferred task %s failed: %s", task.get('kind'), e, extra={"fields": {"task": task.get('kind')}})
+
+    def submit(self, task: Task) -> None:
+        future = self._executor.submit(self._run, task)
+        with self._lock:
+            self._pending = [f for f in self._pending if not f.done()]
+            self._pending.append(future)
+
+    def drain(self, timeout: Optional[float] = None) -> None:
+        """Wait for every task submitted so far to finish."""
+        with self._lock:
+            pending = list(self._pending)
+        wait(pending, timeout=timeout)
+
+
+class SqsTaskQueue:
+    """Sends tasks to an SQS queue; the same Lambda consumes them through its SQS trigger."""
+
+    def __init__(self, queue_url: str) -> None:
+        import aws_clients
+        self.queue_url = queue_url
+        self.client = aws_clients.get_sqs_client()
+
+    def submit(self, task: Task) -> None:
+        self.client.send_message(QueueUrl=self.queue_url, MessageBody=json.dumps(task))
+
+    def drain(self, timeout: Optional[float] = None) -> None:
+        pass
+
+
+def get_task_queue(handler: Callable[[Task], Any]):
+    """Pick the queue backend: SQS when TASK_QUEUE_URL is set, otherwise in-process (local runs only)."""
+    queue_url = os.environ.get(ENV_TASK_QUEUE_URL)
+    if queue_url:
+        return SqsTaskQueue(queue_url)
+    return InProcessTaskQueue(handler, int(os.environ.get(ENV_TASK_WORKERS, DEFAULT_TASK_WORKERS)))
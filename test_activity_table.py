@@ -0,0 +1,62 @@
+import unittest
+from decimal import Decimal
+from unittest.mock import patch, MagicMock
+
+from botocore.exceptions import ClientError
+
+import aws_clients
+from activity_table import load_last_active, record_user_activity
+
+
+class TestActivityTable(unittest.TestCase):
+    def setUp(self):
+        aws_clients.reset()
+
+    @patch("aws_clients.boto3.resource")
+    @patch.dict("os.environ", {"SLACK_USER_ACTIVITY": "ActivityTable"})
+    def test_record_user_activity_conditional_upsert(self, mock_boto_resource):
+        """Test that activity is upserted only when newer than the stored timestamp."""
+        mock_table = MagicMock()
+        mock_boto_resource.return_value.Table.return_value = mock_table
+
+        self.assertTrue(record_user_activity("U123", "1700000000.000100"))
+
+        mock_boto_resource.return_value.Table.assert_called_once_with("ActivityTable")
+        mock_table.update_item.assert_called_once_with(
+            Key={"user_id": "U123"},
+            UpdateExpression="SET last_active_ts = :ts",
+            ConditionExpression="attribute_not_exists(last_active_ts) OR last_active_ts < :ts",
+            ExpressionAttributeValues={":ts": Decimal("1700000000.000100")},
+        )
+
+    @patch("aws_clients.boto3.resource")
+    def test_record_user_activity_ignores_older_events(self, mock_boto_resource):
+        """Test that an out-of-order event does not move last_active_ts backwards."""
+        mock_table = MagicMock()
+        mock_boto_resource.return_value.Table.return_value = mock_table
+        mock_table.update_item.side_effect = ClientError(
+            {"Error": {"Code": "ConditionalCheckFailedException"}}, "UpdateItem"
+        )
+
+        self.assertFalse(record_user_activity("U123", "1600000000.000100", "ActivityTable"))
+
+    @patch("aws_clients.boto3.resource")
+    def test_load_last_active_scans_all_pages(self, mock_boto_resource):
+        """Test that the whole table is read with a single paginated scan."""
+        mock_table = MagicMock()
+        mock_boto_resource.return_value.Table.return_value = mock_table
+        mock_table.scan.side_effect = [
+            {"Items": [{"user_id": "U123", "last_active_ts": Decimal("1700000000.5")}], "LastEvaluatedKey": {"user_id": "U123"}},
+            {"Items": [{"user_id": "U456", "last_active_ts": Decimal("1700000100")}]},
+        ]
+
+        result = load_last_active(1699990000, "ActivityTable")
+
+        self.assertEqual(result, {"U123": 1700000000.5, "U456": 1700000100.0})
+        self.assertEqual(mock_table.scan.call_count, 2)
+        self.assertEqual(mock_table.scan.call_args.kwargs["ExclusiveStartKey"], {"user_id": "U123"})
+        self.assertEqual(mock_table.scan.call_args.kwargs["ExpressionAttributeValues"], {":cutoff": Decimal("1699990000")})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,14 @@
+import base64
 import unittest
+import urllib.parse
 from unittest.mock import patch, MagicMock
 import json
+from botocore.exceptions import ClientError
+import aws_clients
+import slack_client
+import add_user_profile
+from constants import SAVE_STALE, SAVE_UNCHANGED, SAVE_WRITTEN
+from metrics import METRICS
 from add_user_profile import (
     get_user_response_from_db,
     save_user_response_to_db,
@@ -8,11 +16,24 @@ from add_user_profile import (
     send_message,
     lambda_handler,
     decode_payload,
+    decode_request_body,
+    get_response_cache_stats,
 )
 
 
+def conditional_check_failed(item):
+    """The error DynamoDB returns for a refused put with ReturnValuesOnConditionCheckFailure=ALL_OLD."""
+    return ClientError({"Error": {"Code": "ConditionalCheckFailedException"}, "Item": item}, "PutItem")
+
+
 class TestLambdaFunction(unittest.TestCase):
-    @patch("add_user_profile.boto3.resource")  # Ensure the path matches your actual module!
+    def setUp(self):
+        aws_clients.reset()
+        slack_client.RATE_LIMITER.reset()
+        add_user_profile.reset_response_cache()
+        add_user_profile.reset_event_deduplicator()
+
+    @patch("aws_clients.boto3.resource")  # Ensure the path matches your actual module!
     @patch.dict("os.environ", {"SLACK_USER_RESPONSE": "TestTable"})
     def test_get_user_response_from_db(self, mock_boto_resource):
         """Test fetching a user response from DynamoDB."""
@@ -27,11 +48,11 @@ class TestLambdaFunction(unittest.TestCase):
         result = get_user_response_from_db("U123")
 
         # Assertions
-        mock_boto_resource.assert_called_once_with("dynamodb")  # Check if boto3.resource was called
+        mock_boto_resource.assert_called_once_with("dynamodb", config=unittest.mock.ANY)  # Check if boto3.resource was called
         mock_table.get_item.assert_called_once_with(Key={"user_id": "U123"})
         self.assertEqual(result, {"user_id": "U123", "response": "Test response"})
 
-    @patch("add_user_profile.boto3.resource")
+    @patch("aws_clients.boto3.resource")
     @patch.dict("os.environ", {"SLACK_USER_RESPONSE": "TestTable"})
     def test_save_user_response_to_db(self, mock_boto_resource):
         """Test saving a user response to DynamoDB."""
@@ -43,7 +64,7 @@ class TestLambdaFunction(unittest.TestCase):
         save_user_response_to_db("U123", "Test response")
 
         # Assertions
-        mock_boto_resource.assert_called_once_with("dynamodb")
+        mock_boto_resource.assert_called_once_with("dynamodb", config=unittest.mock.ANY)
         mock_table.put_item.assert_called_once_with(
             Item={
                 "user_id": "U123",
@@ -52,31 +73,138 @@ class TestLambdaFunction(unittest.TestCase):
             }
         )
 
-    @patch("add_user_profile.requests.post")
-    def test_publish_home_view(self, mock_post):
+    @patch("aws_clients.boto3.resource")
+    @patch.dict("os.environ", {"SLACK_USER_RESPONSE": "TestTable"})
+    def test_get_user_response_from_db_is_cached(self, mock_boto_resource):
+        """Test that repeated Home tab opens are served from the cache, including users with no answer."""
+        mock_table = MagicMock()
+        mock_boto_resource.return_value.Table.return_value = mock_table
+        mock_table.get_item.side_effect = [
+            {"Item": {"user_id": "U123", "response": "Test response"}},
+            {},
+        ]
+
+        for _ in range(3):
+            self.assertEqual(get_user_response_from_db("U123"), {"user_id": "U123", "response": "Test response"})
+            self.assertEqual(get_user_response_from_db("U456"), {})
+
+        self.assertEqual(mock_table.get_item.call_count, 2)
+        self.assertEqual(get_response_cache_stats()["hits"], 4)
+        self.assertEqual(get_response_cache_stats()["misses"], 2)
+
+    @patch("aws_clients.boto3.resource")
+    @patch.dict("os.environ", {"SLACK_USER_RESPONSE": "TestTable"})
+    def test_save_user_response_to_db_writes_through_cache(self, mock_boto_resource):
+        """Test that a saved answer replaces a cached 'no answer' entry."""
+        mock_table = MagicMock()
+        mock_boto_resource.return_value.Table.return_value = mock_table
+        mock_table.get_item.return_value = {}
+
+        self.assertEqual(get_user_response_from_db("U123"), {})
+        save_user_response_to_db("U123", "Test response")
+
+        self.assertEqual(get_user_response_from_db("U123")["response"], "Test response")
+        mock_table.get_item.assert_called_once()
+
+    @patch("aws_clients.boto3.resource")
+    @patch.dict("os.environ", {"SLACK_USER_RESPONSE": "TestTable"})
+    def test_save_user_response_to_db_only_if_changed(self, mock_boto_resource):
+        """Test the conditional write, and that the table's refusal of a repeated answer reads as unchanged."""
+        mock_table = MagicMock()
+        mock_boto_resource.return_value.Table.return_value = mock_table
+        stored = {"user_id": {"S": "U123"}, "response": {"S": "A friend"}, "timestamp": {"N": "1700000000"}}
+        mock_table.put_item.side_effect = [None, conditional_check_failed(stored)]
+
+        self.assertEqual(save_user_response_to_db("U123", "A friend", only_if_changed=True, submitted_at=1700000000.5), SAVE_WRITTEN)
+        self.assertEqual(save_user_response_to_db("U123", "A friend", only_if_changed=True, submitted_at=1700000001), SAVE_UNCHANGED)
+
+        self.assertEqual(mock_table.put_item.call_count, 2)
+        self.assertEqual(mock_table.put_item.call_args_list[0], unittest.mock.call(
+            Item={"user_id": "U123", "response": "A friend", "timestamp": 1700000000},
+            ConditionExpression="attribute_not_exists(user_id) OR (#response <> :response AND #timestamp <= :timestamp)",
+            ExpressionAttributeNames={"#response": "response", "#timestamp": "timestamp"},
+            ExpressionAttributeValues={":response": "A friend", ":timestamp": 1700000000},
+            ReturnValuesOnConditionCheckFailure="ALL_OLD",
+        ))
+
+    @patch("aws_clients.boto3.resource")
+    @patch.dict("os.environ", {"SLACK_USER_RESPONSE": "TestTable"})
+    def test_save_user_response_to_db_ignores_stale_cache(self, mock_boto_resource):
+        """Test that an answer matching an out-of-date cached copy is still written when the table differs."""
+        mock_table = MagicMock()
+        mock_boto_resource.return_value.Table.return_value = mock_table
+        # This container cached "A friend"; another has since stored "A podcast"
+        mock_table.get_item.return_value = {"Item": {"user_id": "U123", "response": "A friend", "timestamp": 1700000000}}
+        self.assertEqual(get_user_response_from_db("U123")["response"], "A friend")
+
+        self.assertEqual(save_user_response_to_db("U123", "A friend", only_if_changed=True, submitted_at=1700000200), SAVE_WRITTEN)
+        mock_table.put_item.assert_called_once()
+
+    @patch("aws_clients.boto3.resource")
+    @patch.dict("os.environ", {"SLACK_USER_RESPONSE": "TestTable"})
+    def test_save_user_response_to_db_refused_as_stale(self, mock_boto_resource):
+        """Test that an answer older than the stored one is reported stale and the stored item is cached."""
+        mock_table = MagicMock()
+        mock_boto_resource.return_value.Table.return_value = mock_table
+        stored = {"user_id": {"S": "U123"}, "response": {"S": "A podcast"}, "timestamp": {"N": "1700000300"}}
+        mock_table.put_item.side_effect = conditional_check_failed(stored)
+
+        self.assertEqual(save_user_response_to_db("U123", "A friend", only_if_changed=True, submitted_at=1700000200), SAVE_STALE)
+
+        self.assertEqual(get_user_response_from_db("U123")["response"], "A podcast")
+        mock_table.get_item.assert_not_called()
+
+    @patch("aws_clients.boto3.resource")
+    @patch.dict("os.environ", {"SLACK_USER_RESPONSE": "TestTable"})
+    def test_save_user_response_to_db_raises_other_errors(self, mock_boto_resource):
+        """Test that throttling is raised, not mistaken for an unchanged answer."""
+        mock_table = MagicMock()
+        mock_boto_resource.return_value.Table.return_value = mock_table
+        mock_table.put_item.side_effect = ClientError({"Error": {"Code": "ProvisionedThroughputExceededException"}}, "PutItem")
+
+        with self.assertRaises(ClientError):
+            save_user_response_to_db("U123", "A friend", only_if_changed=True)
+
+    @patch("aws_clients.boto3.resource")
+    @patch.dict("os.environ", {"SLACK_USER_RESPONSE": "TestTable"})
+    def test_get_user_response_from_db_does_not_cache_errors(self, mock_boto_resource):
+        """Test that a failed read is retried on the next call."""
+        mock_table = MagicMock()
+        mock_boto_resource.return_value.Table.return_value = mock_table
+        mock_table.get_item.side_effect = [Exception("throttled"), {"Item": {"user_id": "U123"}}]
+
+        self.assertIsNone(get_user_response_from_db("U123"))
+        self.assertEqual(get_user_response_from_db("U123"), {"user_id": "U123"})
+
+    @patch("slack_client.get_session")
+    def test_publish_home_view(self, mock_get_session):
         """Test publishing a home view to Slack."""
+        mock_post = mock_get_session.return_value.post
         mock_post.return_value.json.return_value = {"ok": True}
         response = publish_home_view("U123", "fake_token", existing_response="Test response")
 
         self.assertTrue(response["ok"])
         mock_post.assert_called_once_with(
             "https://slack.com/api/views.publish",
+            timeout=slack_client.get_interactive_timeout(),
             headers={
                 "Authorization": "Bearer fake_token",
                 "Content-Type": "application/json",
             },
-            json=unittest.mock.ANY,
+            data=unittest.mock.ANY,
         )
 
-    @patch("add_user_profile.requests.post")
-    def test_send_message(self, mock_post):
+    @patch("slack_client.get_session")
+    def test_send_message(self, mock_get_session):
         """Test sending a message to a Slack user."""
+        mock_post = mock_get_session.return_value.post
         mock_post.return_value.json.return_value = {"ok": True}
         response = send_message("U123", "Hello!", "fake_token")
 
         self.assertTrue(response["ok"])
         mock_post.assert_called_once_with(
             "https://slack.com/api/chat.postMessage",
+            timeout=slack_client.get_interactive_timeout(),
             headers={
                 "Authorization": "Bearer fake_token",
                 "Content-Type": "application/json",
@@ -115,12 +243,288 @@ class TestLambdaFunction(unittest.TestCase):
         mock_get_user_response_from_db.assert_called_once_with("U123")
         mock_publish_home_view.assert_called_once_with("U123", "fake_token", "Test response")
 
+    @patch("add_user_profile.get_user_response_from_db")
+    @patch("add_user_profile.publish_home_view")
+    @patch("add_user_profile.get_secret")
+    @patch.dict("os.environ", {"SECRET_NAME": "fake_secret"})
+    def test_lambda_handler_drops_redelivered_events(
+        self, mock_get_secret, mock_publish_home_view, mock_get_user_response_from_db
+    ):
+        """Test that a Slack retry with the same event_id returns 200 without doing the work again."""
+        mock_get_secret.return_value = {"SLACK_BOT_TOKEN": "fake_token"}
+        mock_get_user_response_from_db.return_value = {}
+        mock_publish_home_view.return_value = {"ok": True}
+        body = json.dumps({"type": "event_callback", "event_id": "Ev1", "event": {"type": "app_home_opened", "user": "U123"}})
+        METRICS.reset()
+
+        first = lambda_handler({"body": body}, None)
+        retry = lambda_handler({"body": body, "headers": {"X-Slack-Retry-Num": "1", "X-Slack-Retry-Reason": "http_timeout"}}, None)
+
+        self.assertEqual(first["body"], "Home view published")
+        self.assertEqual(retry, {"statusCode": 200, "body": "Duplicate delivery ignored"})
+        mock_publish_home_view.assert_called_once()
+        mock_get_user_response_from_db.assert_called_once()
+        self.assertEqual(add_user_profile.get_event_deduplicator().stats(), {"claimed": 1, "dropped": 1})
+
+    @patch("add_user_profile.get_user_response_from_db")
+    @patch("add_user_profile.publish_home_view")
+    @patch("add_user_profile.get_secret")
+    @patch.dict("os.environ", {"SECRET_NAME": "fake_secret"})
+    def test_lambda_handler_processes_retry_of_failed_delivery(
+        self, mock_get_secret, mock_publish_home_view, mock_get_user_response_from_db
+    ):
+        """Test that a delivery that failed is released, so Slack's retry is handled."""
+        mock_get_secret.return_value = {"SLACK_BOT_TOKEN": "fake_token"}
+        mock_get_user_response_from_db.return_value = {}
+        mock_publish_home_view.side_effect = [{"ok": False, "error": "internal_error"}, {"ok": True}]
+        body = json.dumps({"type": "event_callback", "event_id": "Ev2", "event": {"type": "app_home_opened", "user": "U123"}})
+
+        first = lambda_handler({"body": body}, None)
+        retry = lambda_handler({"body": body, "headers": {"X-Slack-Retry-Num": "1"}}, None)
+
+        self.assertEqual((first["statusCode"], retry["statusCode"]), (500, 200))
+        self.assertEqual(retry["body"], "Home view published")
+        self.assertEqual(mock_publish_home_view.call_count, 2)
+
+    @patch("activity_table.record_user_activity")
+    @patch("add_user_profile.get_secret")
+    @patch.dict("os.environ", {"SECRET_NAME": "fake_secret"})
+    def test_lambda_handler_records_message_activity(self, mock_get_secret, mock_record_activity):
+        """Test that message events upsert the user's last_active_ts."""
+        mock_get_secret.return_value = {"SLACK_BOT_TOKEN": "fake_token"}
+        event = {
+            "body": json.dumps({
+                "type": "event_callback",
+                "event": {"type": "message", "user": "U123", "ts": "1700000000.000100", "channel": "C123"}
+            }),
+            "isBase64Encoded": False,
+        }
+
+        response = lambda_handler(event, None)
+
+        self.assertEqual(response["statusCode"], 200)
+        self.assertEqual(response["body"], "Activity recorded")
+        mock_record_activity.assert_called_once_with("U123", "1700000000.000100")
+
+    @patch("activity_table.record_user_activity")
+    @patch("add_user_profile.get_secret")
+    @patch.dict("os.environ", {"SECRET_NAME": "fake_secret"})
+    def test_lambda_handler_ignores_bot_messages(self, mock_get_secret, mock_record_activity):
+        """Test that bot messages are not counted as user activity."""
+        mock_get_secret.return_value = {"SLACK_BOT_TOKEN": "fake_token"}
+        event = {
+            "body": json.dumps({
+                "type": "event_callback",
+                "event": {"type": "message", "subtype": "bot_message", "bot_id": "B123", "ts": "1700000000.000100"}
+            }),
+        }
+
+        response = lambda_handler(event, None)
+
+        self.assertEqual(response["statusCode"], 200)
+        mock_record_activity.assert_not_called()
+
+    @patch("add_user_profile.get_secret")
+    def test_lambda_handler_url_verification_skips_secret(self, mock_get_secret):
+        """Test that the url_verification handshake answers without touching Secrets Manager."""
+        event = {"body": json.dumps({"type": "url_verification", "challenge": "abc123"})}
+
+        response = lambda_handler(event, None)
+
+        self.assertEqual(response["statusCode"], 200)
+        self.assertIn("abc123", json.dumps(response))
+        mock_get_secret.assert_not_called()
+
+    @patch("add_user_profile.get_user_response_from_db")
+    @patch("add_user_profile.publish_home_view")
+    @patch("add_user_profile.get_secret")
+    @patch.dict("os.environ", {"SECRET_NAME": "fake_secret"})
+    def test_lambda_handler_refreshes_token_on_invalid_auth(
+        self, mock_get_secret, mock_publish_home_view, mock_get_user_response_from_db
+    ):
+        """Test that an invalid_auth response forces one Secrets Manager refresh and a retry."""
+        mock_get_secret.side_effect = [{"SLACK_BOT_TOKEN": "old_token"}, {"SLACK_BOT_TOKEN": "new_token"}]
+        mock_get_user_response_from_db.return_value = {}
+        mock_publish_home_view.side_effect = [{"ok": False, "error": "invalid_auth"}, {"ok": True}]
+        event = {"body": json.dumps({"type": "event_callback", "event": {"type": "app_home_opened", "user": "U123"}})}
+
+        response = lambda_handler(event, None)
+
+        self.assertEqual(response["statusCode"], 200)
+        mock_get_secret.assert_called_with("fake_secret", force_refresh=True)
+        mock_publish_home_view.assert_called_with("U123", "new_token", None)
+
+    @patch("add_user_profile.get_task_queue")
+    @patch("add_user_profile.publish_home_view")
+    @patch("add_user_profile.get_secret")
+    @patch.dict("os.environ", {"SECRET_NAME": "fake_secret", "FAST_ACK": "true"})
+    def test_lambda_handler_fast_ack_defers_work(self, mock_get_secret, mock_publish_home_view, mock_get_task_queue):
+        """Test that fast-ack mode queues the slow work and replies without touching Slack or Secrets Manager."""
+        event = {"body": json.dumps({"type": "event_callback", "event": {"type": "app_home_opened", "user": "U123"}})}
+
+        response = lambda_handler(event, None)
+
+        self.assertEqual(response["statusCode"], 200)
+        self.assertEqual(response["body"], "Home view queued")
+        mock_get_task_queue.return_value.submit.assert_called_once_with({"kind": "publish_home", "user_id": "U123"})
+        mock_get_secret.assert_not_called()
+        mock_publish_home_view.assert_not_called()
+
+    @patch("add_user_profile.get_task_queue")
+    @patch("add_user_profile.get_user_response_from_db")
+    @patch("add_user_profile.publish_home_view")
+    @patch("add_user_profile.get_secret")
+    @patch.dict("os.environ", {"SECRET_NAME": "fake_secret", "FAST_ACK": "true", "AWS_LAMBDA_FUNCTION_NAME": "profile"})
+    def test_lambda_handler_fast_ack_in_lambda_without_queue_runs_inline(
+        self, mock_get_secret, mock_publish_home_view, mock_get_user_response_from_db, mock_get_task_queue
+    ):
+        """Test that inside Lambda, fast-ack without TASK_QUEUE_URL does the work inline rather than in a frozen thread."""
+        mock_get_secret.return_value = {"SLACK_BOT_TOKEN": "fake_token"}
+        mock_get_user_response_from_db.return_value = {}
+        mock_publish_home_view.return_value = {"ok": True}
+        event = {"body": json.dumps({"type": "event_callback", "event": {"type": "app_home_opened", "user": "U123"}})}
+
+        with self.assertLogs("add_user_profile", level="WARNING"):
+            response = lambda_handler(event, None)
+
+        self.assertEqual(response, {"statusCode": 200, "body": "Home view published"})
+        mock_publish_home_view.assert_called_once()
+        mock_get_task_queue.assert_not_called()
+
+    @patch("add_user_profile.send_message")
+    @patch("add_user_profile.save_user_response_to_db")
+    @patch("add_user_profile.get_secret")
+    @patch.dict("os.environ", {"SECRET_NAME": "fake_secret"})
+    def test_lambda_handler_processes_queued_tasks(self, mock_get_secret, mock_save, mock_send_message):
+        """Test that SQS records run the deferred work and failed records are reported for redelivery."""
+        mock_get_secret.return_value = {"SLACK_BOT_TOKEN": "fake_token"}
+        mock_send_message.return_value = {"ok": True}
+        event = {"Records": [
+            {"messageId": "m1", "body": json.dumps({"kind": "submit_profile", "user_id": "U123", "user_input": "A friend"})},
+            {"messageId": "m2", "body": json.dumps({"kind": "unknown"})},
+        ]}
+
+        response = lambda_handler(event, None)
+
+        self.assertEqual(response, {"batchItemFailures": [{"itemIdentifier": "m2"}]})
+        mock_save.assert_called_once_with("U123", "A friend", only_if_changed=True, submitted_at=None)
+        self.assertIn("A friend", mock_send_message.call_args.args[1])
+
+    @patch("add_user_profile.send_message")
+    @patch("add_user_profile.save_user_response_to_db")
+    def test_lambda_handler_redelivers_task_when_save_fails(self, mock_save, mock_send_message):
+        """Test that a failed save is reported to SQS for redelivery and no confirmation is sent."""
+        mock_save.side_effect = ClientError({"Error": {"Code": "ProvisionedThroughputExceededException"}}, "PutItem")
+        event = {"Records": [
+            {"messageId": "m1", "body": json.dumps({"kind": "submit_profile", "user_id": "U123", "user_input": "A friend"})},
+        ]}
+
+        response = lambda_handler(event, None)
+
+        self.assertEqual(response, {"batchItemFailures": [{"itemIdentifier": "m1"}]})
+        mock_send_message.assert_not_called()
+
     def test_decode_payload(self):
         """Test decoding payload from the event."""
         payload = "payload=%7B%22key%22%3A%22value%22%7D"
         result = decode_payload(payload, is_base64_encoded=False)
         self.assertEqual(result, {"key": "value"})
 
+    def test_decode_request_body_form_fields(self):
+        """Test that + is a space, %2B a literal plus, and other form fields are ignored."""
+        body = b"token=abc&payload=%7B%22value%22%3A%22a+b%2Bc%20%25d%22%7D&trigger_id=1.2"
+        self.assertEqual(decode_request_body(body, is_base64_encoded=False), {"value": "a b+c %d"})
+
+        encoded = base64.b64encode(body).decode("ascii")
+        self.assertEqual(decode_request_body(encoded, is_base64_encoded=True), {"value": "a b+c %d"})
+
+    def test_decode_request_body_json_is_not_unquoted(self):
+        """Test that Events API JSON bodies are parsed as-is, without percent or + decoding."""
+        body = json.dumps({"type": "event_callback", "text": "50%25 a+b"})
+        self.assertEqual(decode_request_body(body, is_base64_encoded=False)["text"], "50%25 a+b")
+
+    def test_unquote_plus_bytes_matches_stdlib(self):
+        """Test the quoted-printable fast path and its fallback against urllib on valid and malformed escapes."""
+        samples = [
+            b"", b"plain", b"a+b%2Bc", b"%7B%22k%22%3A%22v%22%7D", b"%e2%9c%93%E2%9C%93",
+            b"100%", b"%zz%41", b"%4", b"a=b%3D", b"line%0Abreak\n", b"%%41", b"tab\t end  ",
+        ]
+        for value in samples:
+            with self.subTest(value=value):
+                expected = urllib.parse.unquote_to_bytes(value.replace(b"+", b" "))
+                self.assertEqual(add_user_profile.unquote_plus_bytes(value), expected)
+
+    def test_decode_request_body_rejects_missing_payload(self):
+        for body in ("", "payload=", "token=abc"):
+            with self.subTest(body=body), self.assertRaises(ValueError):
+                decode_request_body(body, is_base64_encoded=False)
+
+    @patch("add_user_profile.send_message")
+    @patch("add_user_profile.save_user_response_to_db")
+    @patch("add_user_profile.get_secret")
+    @patch.dict("os.environ", {"SECRET_NAME": "fake_secret"})
+    def test_lambda_handler_skips_dm_for_unchanged_response(self, mock_get_secret, mock_save, mock_send_message):
+        """Test that resubmitting the same answer sends no DM, and that action_ts orders the write."""
+        mock_save.return_value = SAVE_UNCHANGED
+        payload = {
+            "type": "block_actions",
+            "user": {"id": "U123"},
+            "actions": [{"action_id": "submit_profile", "action_ts": "1700000000.123456"}],
+            "view": {"state": {"values": {"question_block": {"user_response": {"value": "A friend"}}}}},
+        }
+        event = {"body": urllib.parse.urlencode({"payload": json.dumps(payload)}), "isBase64Encoded": False}
+
+        response = lambda_handler(event, None)
+
+        self.assertEqual(response, {"statusCode": 200, "body": "Response unchanged"})
+        mock_save.assert_called_once_with("U123", "A friend", only_if_changed=True, submitted_at=1700000000.123456)
+        mock_get_secret.assert_not_called()
+        mock_send_message.assert_not_called()
+
+    @patch("add_user_profile.send_message")
+    @patch("add_user_profile.get_secret")
+    @patch("aws_clients.boto3.resource")
+    @patch.dict("os.environ", {"SECRET_NAME": "fake_secret", "SLACK_USER_RESPONSE": "TestTable"})
+    def test_lambda_handler_returns_500_when_save_fails(self, mock_boto_resource, mock_get_secret, mock_send_message):
+        """Test that a DynamoDB error on the inline submit path becomes a 500, not an escaped exception."""
+        mock_boto_resource.return_value.Table.return_value.put_item.side_effect = ClientError(
+            {"Error": {"Code": "ProvisionedThroughputExceededException"}}, "PutItem"
+        )
+        payload = {
+            "type": "block_actions",
+            "user": {"id": "U123"},
+            "actions": [{"action_id": "submit_profile", "action_ts": "1700000000.123456"}],
+            "view": {"state": {"values": {"question_block": {"user_response": {"value": "A friend"}}}}},
+        }
+        event = {"body": urllib.parse.urlencode({"payload": json.dumps(payload)}), "isBase64Encoded": False}
+
+        response = lambda_handler(event, None)
+
+        self.assertEqual(response, {"statusCode": 500, "body": "Failed to save response"})
+        mock_get_secret.assert_not_called()
+        mock_send_message.assert_not_called()
+
+    @patch("add_user_profile.send_message")
+    @patch("add_user_profile.save_user_response_to_db")
+    @patch("add_user_profile.get_secret")
+    @patch.dict("os.environ", {"SECRET_NAME": "fake_secret"})
+    def test_lambda_handler_block_actions_form_body(self, mock_get_secret, mock_save, mock_send_message):
+        """Test that a form-encoded submit is decoded once, so a literal %2B in the answer stays a plus."""
+        mock_get_secret.return_value = {"SLACK_BOT_TOKEN": "fake_token"}
+        mock_send_message.return_value = {"ok": True}
+        payload = {
+            "type": "block_actions",
+            "user": {"id": "U123"},
+            "actions": [{"action_id": "submit_profile"}],
+            "view": {"state": {"values": {"question_block": {"user_response": {"value": "C++ meetup 100%"}}}}},
+        }
+        event = {"body": urllib.parse.urlencode({"payload": json.dumps(payload)}), "isBase64Encoded": False}
+
+        response = lambda_handler(event, None)
+
+        self.assertEqual(response["statusCode"], 200)
+        mock_save.assert_called_once_with("U123", "C++ meetup 100%", only_if_changed=True, submitted_at=None)
+
 
 if __name__ == "__main__":
     unittest.main()
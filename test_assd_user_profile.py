@@ -2,10 +2,18 @@ import unittest
 from unittest.mock import patch, MagicMock
 import base64
 import json
+import aws_clients
+import slack_client
+import add_user_profile
 from add_user_profile import get_secret , get_user_response_from_db,save_user_response_to_db, publish_home_view, send_message, decode_payload ,lambda_handler
 
 class TestGetSecret(unittest.TestCase):
-    @patch("add_user_profile.boto3.client")  # Mock boto3 SecretsManager client
+    def setUp(self):
+        aws_clients.reset()
+        slack_client.RATE_LIMITER.reset()
+        add_user_profile.reset_response_cache()
+
+    @patch("aws_clients.boto3.client")  # Mock boto3 SecretsManager client
     @patch.dict("os.environ", {"SLACK_USER_RESPONSE": "TestTable"})
     def test_get_secret(self, mock_boto_client):
         # Mock the Secrets Manager client
@@ -27,7 +35,7 @@ class TestGetSecret(unittest.TestCase):
         self.assertEqual(result, {"SLACK_BOT_TOKEN": "fake-token"})  # Check returned secret
 
 
-    @patch("add_user_profile.boto3.resource")  # Mock boto3 DynamoDB resource
+    @patch("aws_clients.boto3.resource")  # Mock boto3 DynamoDB resource
     @patch.dict("os.environ", {"SLACK_USER_RESPONSE": "TestTable"})  # Mock environment variable
     def test_get_user_response_from_db(self, mock_dynamo_resource):
         # Mock the DynamoDB resource and the table
@@ -42,12 +50,12 @@ class TestGetSecret(unittest.TestCase):
         result = get_user_response_from_db(user_id)
 
         # Assertions
-        mock_dynamo_resource.assert_called_once_with("dynamodb")  # Ensure boto3.resource is called
+        mock_dynamo_resource.assert_called_once_with("dynamodb", config=unittest.mock.ANY)  # Ensure boto3.resource is called
         mock_table.get_item.assert_called_once_with(Key={"user_id": user_id})  # Ensure the correct key is queried
         self.assertEqual(result, {"user_id": "U123", "response": "Test response"})  # Check the returned result
 
 
-    @patch("add_user_profile.boto3.resource")  # Mock the boto3 resource method
+    @patch("aws_clients.boto3.resource")  # Mock the boto3 resource method
     def test_save_user_response_to_db_success(self, mock_boto_resource):
         """Test saving a user response to DynamoDB."""
         # Create a mock Table object
@@ -71,9 +79,10 @@ class TestGetSecret(unittest.TestCase):
             }
         )
 
-    @patch("add_user_profile.requests.post")
-    def test_publish_home_view_with_existing_response(self, mock_post):
+    @patch("slack_client.get_session")
+    def test_publish_home_view_with_existing_response(self, mock_get_session):
         """Test publishing a home view to Slack when there is an existing response."""
+        mock_post = mock_get_session.return_value.post
 
         # Mock response from Slack API
         mock_response = MagicMock()
@@ -113,22 +122,25 @@ class TestGetSecret(unittest.TestCase):
         # Check that requests.post was called with the correct URL, headers, and payload
         mock_post.assert_called_once_with(
             'https://slack.com/api/views.publish',
+            timeout=slack_client.get_interactive_timeout(),
             headers={
                 'Authorization': f'Bearer {slack_token}',
                 'Content-Type': 'application/json'
             },
-            json={
+            # Same bytes requests would send for json=..., from the pre-serialized template
+            data=json.dumps({
                 "user_id": user_id,
                 "view": {
                     "type": "home",
                     "blocks": expected_blocks
                 }
-            }
+            }).encode("utf-8")
         )
 
-    @patch('add_user_profile.requests.post')  # Patch requests.post in your module
-    def test_send_message_success(self, mock_post):
+    @patch("slack_client.get_session")  # Patch the shared Slack session
+    def test_send_message_success(self, mock_get_session):
         """Test sending a message successfully to Slack."""
+        mock_post = mock_get_session.return_value.post
 
         # Mock the response from Slack API
         mock_post.return_value.json.return_value = {"ok": True, "message": {"text": "Test message sent"}}
@@ -142,6 +154,7 @@ class TestGetSecret(unittest.TestCase):
         # Ensure that the requests.post was called with the correct arguments
         mock_post.assert_called_once_with(
             'https://slack.com/api/chat.postMessage',
+            timeout=slack_client.get_interactive_timeout(),
             headers={'Authorization': 'Bearer fake_token', 'Content-Type': 'application/json'},
             json={'channel': 'U123', 'text': 'Test message'}
         )
@@ -0,0 +1,92 @@
+import unittest
+from unittest.mock import patch
+
+import aws_clients
+
+
+class TestSecretCache(unittest.TestCase):
+    def setUp(self):
+        aws_clients.reset()
+
+    def tearDown(self):
+        aws_clients.reset()
+
+    @patch("aws_clients.time.monotonic")
+    @patch("aws_clients.boto3.client")
+    def test_secret_is_cached_until_ttl_expires(self, mock_boto_client, mock_monotonic):
+        """Test that the secret is fetched again only after the TTL."""
+        mock_boto_client.return_value.get_secret_value.return_value = {"SecretString": '{"SLACK_BOT_TOKEN": "t"}'}
+        get_secret_value = mock_boto_client.return_value.get_secret_value
+
+        mock_monotonic.return_value = 100.0
+        aws_clients.get_secret("my-secret", ttl_seconds=60)
+        mock_monotonic.return_value = 159.0
+        aws_clients.get_secret("my-secret", ttl_seconds=60)
+        self.assertEqual(get_secret_value.call_count, 1)
+
+        mock_monotonic.return_value = 161.0
+        self.assertEqual(aws_clients.get_secret("my-secret", ttl_seconds=60), {"SLACK_BOT_TOKEN": "t"})
+        self.assertEqual(get_secret_value.call_count, 2)
+        mock_boto_client.assert_called_once_with("secretsmanager")
+
+    @patch("aws_clients.boto3.client")
+    def test_invalidate_and_reset(self, mock_boto_client):
+        """Test that invalidation forces a re-read and reset drops the client."""
+        mock_boto_client.return_value.get_secret_value.return_value = {"SecretString": "{}"}
+
+        aws_clients.get_secret("my-secret")
+        aws_clients.invalidate_secret("my-secret")
+        aws_clients.get_secret("my-secret")
+        self.assertEqual(mock_boto_client.return_value.get_secret_value.call_count, 2)
+
+        aws_clients.reset()
+        aws_clients.get_secret("my-secret")
+        self.assertEqual(mock_boto_client.call_count, 2)
+
+
+class TestDynamoHandles(unittest.TestCase):
+    def setUp(self):
+        aws_clients.reset()
+
+    def tearDown(self):
+        aws_clients.reset()
+
+    @patch("aws_clients.boto3.resource")
+    @patch.dict("os.environ", {
+        "DYNAMODB_MAX_POOL_CONNECTIONS": "32",
+        "DYNAMODB_CONNECT_TIMEOUT": "1",
+        "DYNAMODB_READ_TIMEOUT": "3",
+    })
+    def test_table_handle_is_reused_with_configured_connection_settings(self, mock_boto_resource):
+        """Test that warm invocations skip resource and Table construction."""
+        first = aws_clients.get_table("Responses")
+        second = aws_clients.get_table("Responses")
+
+        self.assertIs(first, second)
+        mock_boto_resource.assert_called_once()
+        mock_boto_resource.return_value.Table.assert_called_once_with("Responses")
+        config = mock_boto_resource.call_args.kwargs["config"]
+        self.assertEqual(config.max_pool_connections, 32)
+        self.assertEqual(config.connect_timeout, 1.0)
+        self.assertEqual(config.read_timeout, 3.0)
+
+    @patch("aws_clients.boto3.resource")
+    def test_reset_drops_table_handles(self, mock_boto_resource):
+        """Test the reset hook used by tests."""
+        aws_clients.get_table("Responses")
+        aws_clients.reset()
+        aws_clients.get_table("Responses")
+
+        self.assertEqual(mock_boto_resource.call_count, 2)
+
+    @patch("aws_clients.boto3.resource")
+    @patch.dict("os.environ", {"DYNAMODB_ENDPOINT_URL": "http://localhost:8000"})
+    def test_endpoint_override_targets_local_dynamodb(self, mock_boto_resource):
+        """Test that DYNAMODB_ENDPOINT_URL points the shared resource at a local stand-in."""
+        aws_clients.get_dynamodb_resource()
+
+        self.assertEqual(mock_boto_resource.call_args.kwargs["endpoint_url"], "http://localhost:8000")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,160 @@
+import io
+import json
+import os
+import tempfile
+import threading
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from botocore.hooks import HierarchicalEmitter
+
+import aws_clients
+from bulk_import_responses import bulk_import, iter_batches, iter_records, main, write_batch
+
+
+class FakeDynamoResource:
+    """Local stand-in for the DynamoDB resource that can leave items unprocessed, like a throttled table."""
+
+    def __init__(self, unprocessed_rounds=0):
+        self.tables = {}
+        self.calls = []
+        self.unprocessed_rounds = unprocessed_rounds
+        self._lock = threading.Lock()
+        # aws_clients registers its metrics hooks on the resource's client
+        self.meta = SimpleNamespace(client=SimpleNamespace(meta=SimpleNamespace(events=HierarchicalEmitter())))
+
+    def batch_write_item(self, RequestItems):
+        with self._lock:
+            self.calls.append(RequestItems)
+            unprocessed = {}
+            for table_name, requests in RequestItems.items():
+                assert len(requests) <= 25
+                keys = [r["PutRequest"]["Item"]["user_id"] for r in requests]
+                assert len(keys) == len(set(keys)), "duplicate keys in one batch"
+                if self.unprocessed_rounds:
+                    # Write the first half, hand the rest back
+                    requests, unprocessed[table_name] = requests[: len(requests) // 2], requests[len(requests) // 2:]
+                for request in requests:
+                    item = request["PutRequest"]["Item"]
+                    self.tables.setdefault(table_name, {})[item["user_id"]] = item
+            if self.unprocessed_rounds:
+                self.unprocessed_rounds -= 1
+            return {"UnprocessedItems": unprocessed}
+
+
+class TestBulkImportResponses(unittest.TestCase):
+    def setUp(self):
+        aws_clients.reset()
+
+    def tearDown(self):
+        aws_clients.reset()
+
+    def test_iter_batches_dedupes_users_within_a_batch(self):
+        """Test that a repeated user keeps their last answer and batches stay within the limit."""
+        items = [{"user_id": f"U{i % 30}", "response": str(i)} for i in range(60)]
+        batches = list(iter_batches(items, batch_size=25))
+
+        self.assertTrue(all(len(batch) <= 25 for batch in batches))
+        for batch in batches:
+            self.assertEqual(len({item["user_id"] for item in batch}), len(batch))
+
+    def test_bulk_import_streams_csv_in_parallel(self):
+        """Test that every CSV row lands in the table, shaped like save_user_response_to_db items."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "survey.csv")
+            with open(path, "w", newline="") as f:
+                f.write("user_id,response,timestamp\n")
+                for i in range(260):
+                    f.write(f'U{i},"Heard about it, from a friend #{i}",{1700000000 + i}\n')
+            resource = FakeDynamoResource()
+
+            stats = bulk_import(iter_records(path), "Responses", parallelism=4, resource=resource)
+
+        self.assertEqual(stats["written"], 260)
+        self.assertEqual(stats["failed"], 0)
+        self.assertEqual(stats["batches"], 11)
+        self.assertEqual(len(resource.tables["Responses"]), 260)
+        self.assertEqual(
+            resource.tables["Responses"]["U7"],
+            {"user_id": "U7", "response": "Heard about it, from a friend #7", "timestamp": 1700000007},
+        )
+
+    def test_bulk_import_skips_invalid_records(self):
+        """Test that rows without a user_id or with a bad timestamp are counted and the rest still written."""
+        records = [{"user_id": f"U{i}", "response": "A friend"} for i in range(60)]
+        records[10] = {"user_id": "", "response": "No id"}
+        records[40] = {"user_id": "U40", "response": "Bad time", "timestamp": "yesterday"}
+        resource = FakeDynamoResource()
+
+        with redirect_stderr(io.StringIO()) as errors:
+            stats = bulk_import(records, "Responses", parallelism=2, resource=resource)
+
+        self.assertEqual((stats["written"], stats["invalid"], stats["failed"]), (58, 2, 0))
+        self.assertEqual(len(resource.tables["Responses"]), 58)
+        self.assertIn("Skipping record 11", errors.getvalue())
+
+    def test_bulk_import_skips_unparseable_jsonl_lines(self):
+        """Test that malformed JSON, non-object lines and an infinite timestamp are skipped, not fatal."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "answers.jsonl")
+            with open(path, "w") as f:
+                f.write(json.dumps({"user_id": "U1", "response": "A friend"}) + "\n")
+                f.write('{"user_id": "U2", "response": \n')
+                f.write('["x"]\n')
+                f.write(json.dumps({"user_id": "U4", "response": "Later", "timestamp": "inf"}) + "\n")
+                f.write(json.dumps({"user_id": "U5", "response": "A podcast"}) + "\n")
+            resource = FakeDynamoResource()
+
+            with redirect_stderr(io.StringIO()) as errors:
+                stats = bulk_import(iter_records(path), "Responses", resource=resource)
+
+        self.assertEqual((stats["written"], stats["invalid"], stats["failed"]), (2, 3, 0))
+        self.assertEqual(set(resource.tables["Responses"]), {"U1", "U5"})
+        for line in (2, 3, 4):
+            self.assertIn(f"Skipping record {line}", errors.getvalue())
+
+    def test_write_batch_retries_unprocessed_items(self):
+        """Test that unprocessed items are resent with exponential backoff until the table takes them."""
+        resource = FakeDynamoResource(unprocessed_rounds=2)
+        sleeps = []
+        items = [{"user_id": f"U{i}", "response": "x", "timestamp": 1} for i in range(20)]
+
+        written, failed, retries = write_batch(resource, "Responses", items, base_delay=0.1, sleep=sleeps.append)
+
+        self.assertEqual((written, failed, retries), (20, 0, 2))
+        self.assertEqual(sleeps, [0.1, 0.2])
+        self.assertEqual(len(resource.tables["Responses"]), 20)
+
+    def test_write_batch_reports_items_left_after_max_retries(self):
+        resource = FakeDynamoResource(unprocessed_rounds=10)
+        items = [{"user_id": f"U{i}", "response": "x", "timestamp": 1} for i in range(8)]
+
+        written, failed, retries = write_batch(resource, "Responses", items, max_retries=2, sleep=lambda _: None)
+
+        self.assertEqual((written, failed, retries), (7, 1, 2))
+
+    @patch("aws_clients.boto3.resource")
+    def test_cli_imports_jsonl_against_local_endpoint(self, mock_boto_resource):
+        """Test the CLI entry point: --endpoint-url reaches the shared resource and stats are printed."""
+        resource = FakeDynamoResource()
+        mock_boto_resource.return_value = resource
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "answers.jsonl")
+            with open(path, "w") as f:
+                for i in range(30):
+                    f.write(json.dumps({"user_id": f"U{i}", "response": "A podcast"}) + "\n")
+
+            output = io.StringIO()
+            with patch.dict("os.environ", {}), redirect_stdout(output):
+                exit_code = main([path, "--table", "Responses", "--endpoint-url", "http://localhost:8000"])
+
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(mock_boto_resource.call_args.kwargs["endpoint_url"], "http://localhost:8000")
+        self.assertEqual(json.loads(output.getvalue())["written"], 30)
+        self.assertIsInstance(resource.tables["Responses"]["U0"]["timestamp"], int)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from botocore.exceptions import ClientError
+
+import aws_clients
+from event_dedup import DynamoEventStore, EventDeduplicator, get_dedup_key, get_event_deduplicator
+
+
+def conditional_check_failed():
+    return ClientError({"Error": {"Code": "ConditionalCheckFailedException"}}, "PutItem")
+
+
+class TestEventDeduplicator(unittest.TestCase):
+    def setUp(self):
+        aws_clients.reset()
+
+    def tearDown(self):
+        aws_clients.reset()
+
+    def test_dedup_key_prefers_event_id_then_trigger_id(self):
+        self.assertEqual(get_dedup_key({"event_id": "Ev1", "trigger_id": "1.2"}), "event#Ev1")
+        self.assertEqual(get_dedup_key({"type": "block_actions", "trigger_id": "1.2"}), "trigger#1.2")
+        self.assertIsNone(get_dedup_key({"type": "url_verification"}))
+
+    def test_local_set_drops_repeats_and_counts_them(self):
+        """Test that without a store the in-process set alone answers repeats."""
+        deduplicator = EventDeduplicator()
+
+        self.assertEqual([deduplicator.claim("event#Ev1") for _ in range(3)], [True, False, False])
+        self.assertTrue(deduplicator.claim("event#Ev2"))
+        self.assertEqual(deduplicator.stats(), {"claimed": 2, "dropped": 2})
+
+        deduplicator.release("event#Ev1")
+        self.assertTrue(deduplicator.claim("event#Ev1"))
+
+    @patch("aws_clients.boto3.resource")
+    @patch.dict("os.environ", {"EVENT_DEDUP_TABLE": "Deliveries", "EVENT_DEDUP_TTL_SECONDS": "600"})
+    def test_store_catches_repeats_seen_by_another_container(self, mock_boto_resource):
+        """Test the conditional put: a claim held elsewhere makes this delivery a duplicate."""
+        table = mock_boto_resource.return_value.Table.return_value
+        table.put_item.side_effect = [None, conditional_check_failed()]
+        deduplicator = get_event_deduplicator()
+
+        self.assertTrue(deduplicator.claim("event#Ev1"))
+        self.assertFalse(deduplicator.claim("event#Ev2"))
+        # The local set answers the repeat of Ev1 without another write
+        self.assertFalse(deduplicator.claim("event#Ev1"))
+
+        self.assertEqual(table.put_item.call_count, 2)
+        kwargs = table.put_item.call_args_list[0].kwargs
+        self.assertEqual(kwargs["Item"]["event_key"], "event#Ev1")
+        self.assertEqual(kwargs["Item"]["expires_at"] - kwargs["ExpressionAttributeValues"][":now"], 600)
+        self.assertIn("expires_at < :now", kwargs["ConditionExpression"])
+        self.assertEqual(deduplicator.stats(), {"claimed": 1, "dropped": 2})
+
+    def test_store_errors_leave_no_local_claim(self):
+        """Test that a failed store write does not mark the delivery as seen."""
+        store = MagicMock(spec=DynamoEventStore)
+        store.claim.side_effect = [ClientError({"Error": {"Code": "ProvisionedThroughputExceededException"}}, "PutItem"), True]
+        deduplicator = EventDeduplicator(store)
+
+        with self.assertRaises(ClientError):
+            deduplicator.claim("event#Ev1")
+        self.assertTrue(deduplicator.claim("event#Ev1"))
+
+
+if __name__ == "__main__":
+    unittest.main()
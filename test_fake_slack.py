@@ -0,0 +1,103 @@
+import json
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import requests
+
+import aws_clients
+import notify_inactive_users
+import slack_client
+from fake_slack import FAKE_TOKEN, FakeSlackServer, SyntheticWorkspace, scale_rate_limiter
+
+AUTH = {"Authorization": f"Bearer {FAKE_TOKEN}"}
+TIME_SCALE = 600
+
+
+class TestFakeSlackServer(unittest.TestCase):
+    def setUp(self):
+        self.workspace = SyntheticWorkspace(users=40, channels=8, messages_per_channel=10, seed=1)
+
+    def test_users_list_follows_cursors_and_rejects_bad_ones(self):
+        """Test that pages chain through next_cursor and cover every user once."""
+        with FakeSlackServer(self.workspace) as server:
+            url = f"{server.base_url}/users.list"
+            ids, cursor = [], None
+            while cursor != "":
+                page = requests.get(url, headers=AUTH, params={"limit": 15, **({"cursor": cursor} if cursor else {})}).json()
+                ids.extend(user["id"] for user in page["members"])
+                cursor = page["response_metadata"]["next_cursor"]
+            bad = requests.get(url, headers=AUTH, params={"cursor": "not-a-cursor"}).json()
+            unauthorized = requests.get(url, headers={"Authorization": "Bearer xoxb-wrong"}).json()
+
+        self.assertEqual(ids, [user["id"] for user in self.workspace.users])
+        self.assertEqual(bad, {"ok": False, "error": "invalid_cursor"})
+        self.assertEqual(unauthorized, {"ok": False, "error": "invalid_auth"})
+
+    def test_tier_limit_answers_429_with_retry_after(self):
+        """Test that calls over the tier limit within one window are throttled with a scaled Retry-After."""
+        with FakeSlackServer(self.workspace, time_scale=TIME_SCALE, tier_rates={1: 1, 2: 3, 3: 50, 4: 100}) as server:
+            url = f"{server.base_url}/users.list"
+            statuses = [requests.get(url, headers=AUTH).status_code for _ in range(4)]
+            throttled = requests.get(url, headers=AUTH)
+            retry_after = float(throttled.headers["Retry-After"])
+
+            self.assertEqual(statuses, [200, 200, 200, 429])
+            self.assertGreater(retry_after, 0)
+            self.assertLessEqual(retry_after, 60 / TIME_SCALE)
+            stats = server.stats()
+
+        self.assertEqual(stats["calls"]["users.list"], 5)
+        self.assertEqual(stats["throttled"]["users.list"], 2)
+
+
+class TestNotifyAgainstFakeSlack(unittest.TestCase):
+    def setUp(self):
+        aws_clients.reset()
+        slack_client.reset_session()
+        scale_rate_limiter(notify_inactive_users.RATE_LIMITER, TIME_SCALE)
+
+    def tearDown(self):
+        scale_rate_limiter(notify_inactive_users.RATE_LIMITER, 1.0)
+        slack_client.reset_session()
+        aws_clients.reset()
+
+    def run_handler(self, server, **overrides):
+        secret = {"SLACK_BOT_TOKEN": FAKE_TOKEN, "PAGE_SIZE": 7, **overrides}
+        with patch.dict("os.environ", {"SLACK_API_BASE_URL": server.base_url}), \
+                patch("aws_clients.get_secret", return_value=secret):
+            response = notify_inactive_users.lambda_handler({"run_date": "2026-10-18"}, None)
+        self.assertEqual(response["statusCode"], 200)
+        return json.loads(response["body"])
+
+    def test_handler_nudges_exactly_the_inactive_users(self):
+        """Test a full run with pagination everywhere against the workspace's ground truth."""
+        workspace = SyntheticWorkspace(users=60, channels=12, messages_per_channel=15, seed=2)
+        expected = workspace.expected_inactive((datetime.now() - timedelta(days=3)).timestamp())
+
+        with FakeSlackServer(workspace, time_scale=TIME_SCALE) as server:
+            body = self.run_handler(server, HISTORY_CONCURRENCY=4)
+            stats = server.stats()
+
+        self.assertEqual(sorted(user["user_id"] for user in body["inactive_users"]), expected)
+        self.assertEqual(body["delivery"]["sent"], len(expected))
+        self.assertEqual({message["channel"] for message in server.posted}, set(expected))
+        self.assertGreater(stats["calls"]["users.list"], 60 // 7)
+
+    def test_handler_backs_off_when_slack_throttles(self):
+        """Test that 429s reach the rate limiter and the run still completes correctly."""
+        workspace = SyntheticWorkspace(users=30, channels=10, messages_per_channel=10, seed=3)
+        expected = workspace.expected_inactive((datetime.now() - timedelta(days=3)).timestamp())
+
+        # The server grants a twenty-fifth of the history budget the client limiter assumes
+        with FakeSlackServer(workspace, time_scale=TIME_SCALE, tier_rates={1: 1, 2: 20, 3: 2, 4: 100}) as server:
+            body = self.run_handler(server)
+            stats = server.stats()
+
+        self.assertEqual(sorted(user["user_id"] for user in body["inactive_users"]), expected)
+        self.assertGreater(stats["throttled"].get("conversations.history", 0), 0)
+        self.assertEqual(notify_inactive_users.RATE_LIMITER.throttle_events, stats["total_throttled"])
+
+
+if __name__ == "__main__":
+    unittest.main()
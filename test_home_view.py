@@ -0,0 +1,34 @@
+import json
+import unittest
+
+from home_view import build_view_payload, render_home_view
+
+
+class TestHomeViewTemplates(unittest.TestCase):
+    def test_rendered_bytes_match_serializing_the_full_payload(self):
+        """Test byte-for-byte compatibility with json.dumps of the block structure, as requests sends it."""
+        responses = [
+            None,
+            "",
+            "Test response",
+            'A friend said "try it" \\ then <Google> & Twitter',
+            "שלום 👋 ünïcödé\n\tnew line",
+            "\x00user_id\x00",
+        ]
+        for response in responses:
+            with self.subTest(response=response):
+                expected = json.dumps(build_view_payload("U123", response)).encode("utf-8")
+                self.assertEqual(render_home_view("U123", response), expected)
+
+    def test_rendered_payload_shows_question_or_response(self):
+        """Test that the question inputs are only shown to users who have not answered."""
+        question = json.loads(render_home_view("U123"))
+        answered = json.loads(render_home_view("U456", "From a friend"))
+
+        self.assertEqual(question["user_id"], "U123")
+        self.assertEqual([block["type"] for block in question["view"]["blocks"]], ["section", "divider", "input", "actions"])
+        self.assertEqual(answered["view"]["blocks"][2]["text"]["text"], "\n Your response: From a friend")
+
+
+if __name__ == "__main__":
+    unittest.main()
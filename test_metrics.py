@@ -0,0 +1,113 @@
+import io
+import json
+import unittest
+from contextlib import redirect_stdout
+from unittest.mock import MagicMock, patch
+
+import boto3
+from botocore.stub import Stubber
+
+import add_user_profile
+import slack_client
+from metrics import METRICS, MetricsRecorder, instrument_boto_client
+
+
+class TestMetricsRecorder(unittest.TestCase):
+    def test_flush_writes_one_emf_line_per_method_and_status(self):
+        """Test the EMF document shape, the histogram buckets and that flushing starts over."""
+        recorder = MetricsRecorder()
+        for seconds in (0.003, 0.004, 0.120):
+            recorder.record("conversations.history", 200, seconds)
+        recorder.record("conversations.history", 429, 0.002)
+        recorder.record("dynamodb.PutItem", 200, 45.0)
+
+        lines = []
+        recorder.flush("notify_inactive_users", namespace="Test", emit=lines.append)
+        documents = [json.loads(line) for line in lines]
+
+        self.assertEqual(
+            [(d["Method"], d["Status"], d["Calls"]) for d in documents],
+            [("conversations.history", "200", 3), ("conversations.history", "429", 1), ("dynamodb.PutItem", "200", 1)],
+        )
+        directive = documents[0]["_aws"]["CloudWatchMetrics"][0]
+        self.assertEqual(directive["Namespace"], "Test")
+        self.assertIn(["Handler", "Method", "Status"], directive["Dimensions"])
+        self.assertEqual(documents[0]["Handler"], "notify_inactive_users")
+        latency = documents[0]["Latency"]
+        self.assertEqual((latency["Values"], latency["Counts"]), ([5, 250], [2, 1]))
+        self.assertEqual((latency["Min"], latency["Max"], latency["Count"]), (3.0, 120.0, 3))
+        # Beyond the last bucket the sample is reported at the maximum
+        self.assertEqual(documents[2]["Latency"]["Values"], [45000.0])
+        self.assertEqual(recorder.flush("notify_inactive_users", emit=lines.append), [])
+
+    def test_counters_flush_as_one_count_line(self):
+        """Test that plain counters share one EMF line with only the Handler dimension."""
+        recorder = MetricsRecorder()
+        recorder.increment("DuplicateEventsDropped")
+        recorder.increment("DuplicateEventsDropped", 2)
+
+        lines = recorder.flush("add_user_profile", namespace="Test", emit=lambda line: None)
+        document = json.loads(lines[0])
+
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(document["DuplicateEventsDropped"], 3)
+        self.assertEqual(document["_aws"]["CloudWatchMetrics"][0]["Metrics"], [{"Name": "DuplicateEventsDropped", "Unit": "Count"}])
+
+
+class TestOutboundInstrumentation(unittest.TestCase):
+    def setUp(self):
+        METRICS.reset()
+        slack_client.RATE_LIMITER.reset()
+
+    def tearDown(self):
+        METRICS.reset()
+
+    def test_boto_calls_are_timed_with_status_or_error_code(self):
+        """Test the botocore hooks, including a service error reported by its code."""
+        client = instrument_boto_client(boto3.client(
+            "dynamodb", region_name="us-east-1", aws_access_key_id="x", aws_secret_access_key="x"
+        ))
+        with Stubber(client) as stubber:
+            stubber.add_response("put_item", {})
+            stubber.add_client_error("put_item", "ConditionalCheckFailedException", http_status_code=400)
+            client.put_item(TableName="Responses", Item={"user_id": {"S": "U1"}})
+            with self.assertRaises(client.exceptions.ConditionalCheckFailedException):
+                client.put_item(TableName="Responses", Item={"user_id": {"S": "U1"}})
+
+        self.assertEqual(
+            {key: stats["Count"] for key, stats in METRICS.snapshot().items()},
+            {("dynamodb.PutItem", "200"): 1, ("dynamodb.PutItem", "ConditionalCheckFailedException"): 1},
+        )
+
+    @patch("rate_limiter.time.sleep")
+    @patch("slack_client.get_session")
+    def test_slack_calls_are_timed_per_attempt(self, mock_get_session, mock_sleep):
+        """Test that a throttled attempt and its retry are recorded separately."""
+        mock_get_session.return_value.get.side_effect = [
+            MagicMock(status_code=429, headers={"Retry-After": "1"}),
+            MagicMock(status_code=200),
+        ]
+
+        slack_client.slack_api_call("users.list", "GET", "https://slack.com/api/users.list")
+
+        self.assertEqual(
+            {key: stats["Count"] for key, stats in METRICS.snapshot().items()},
+            {("users.list", "429"): 1, ("users.list", "200"): 1},
+        )
+
+    def test_handler_flushes_metrics_once_per_invocation(self):
+        """Test that the profile handler writes pending metrics to stdout and clears them."""
+        METRICS.record("views.publish", 200, 0.05)
+        output = io.StringIO()
+        event = {"body": json.dumps({"type": "url_verification", "challenge": "c"})}
+
+        with redirect_stdout(output):
+            add_user_profile.lambda_handler(event, None)
+
+        document = json.loads(output.getvalue())
+        self.assertEqual((document["Handler"], document["Method"], document["Calls"]), ("add_user_profile", "views.publish", 1))
+        self.assertEqual(METRICS.snapshot(), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
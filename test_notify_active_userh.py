@@ -3,10 +3,17 @@ from unittest.mock import patch, MagicMock
 import os
 import json
 from datetime import datetime, timedelta
+import aws_clients
+import notify_inactive_users
+from slack_records import ChannelRecord, UserRecord
 from notify_inactive_users import get_config,get_all_users,get_all_channels,check_user_activity,send_message,lambda_handler
 
 class TestGetConfig(unittest.TestCase):
 
+    def setUp(self):
+        notify_inactive_users.RATE_LIMITER.reset()
+        aws_clients.reset()
+
     @patch("boto3.client")
     @patch.dict("os.environ", {"SECRET_NAME": "my-secret-name"})
     def test_get_config_success(self, mock_boto_client):
@@ -35,9 +42,10 @@ class TestGetConfig(unittest.TestCase):
         mock_secrets_manager.get_secret_value.assert_called_once_with(SecretId='my-secret-name')
 
 
-    @patch("requests.get")
-    def test_get_all_users_success(self, mock_requests_get):
+    @patch("slack_client.get_session")
+    def test_get_all_users_success(self, mock_get_session):
         """Test success scenario for getting all users from Slack."""
+        mock_requests_get = mock_get_session.return_value.get
         
         # Prepare mock response for Slack API
         mock_response = MagicMock()
@@ -62,17 +70,19 @@ class TestGetConfig(unittest.TestCase):
         
         # Assertions
         self.assertEqual(len(users), 2)  # Should only return user1 and user2
-        self.assertEqual(users[0]['id'], 'U123')
-        self.assertEqual(users[1]['id'], 'U124')
+        self.assertEqual(users[0].id, 'U123')
+        self.assertEqual(users[1].id, 'U124')
         mock_requests_get.assert_called_once_with(
             config['USERS_LIST_URL'],
-            headers={'Authorization': f"Bearer {config['SLACK_BOT_TOKEN']}"}
+            headers={'Authorization': f"Bearer {config['SLACK_BOT_TOKEN']}"},
+            params={'limit': 200}
         )    
 
     
-    @patch("requests.get")
-    def test_get_all_channels_success(self, mock_requests_get):
+    @patch("slack_client.get_session")
+    def test_get_all_channels_success(self, mock_get_session):
         """Test success scenario for getting all channels from Slack."""
+        mock_requests_get = mock_get_session.return_value.get
         
         # Prepare mock response for Slack API
         mock_response = MagicMock()
@@ -95,16 +105,18 @@ class TestGetConfig(unittest.TestCase):
         
         # Assertions
         self.assertEqual(len(channels), 2)  # Should return two channels
-        self.assertEqual(channels[0]['id'], 'C123')
-        self.assertEqual(channels[1]['id'], 'C124')
+        self.assertEqual(channels[0].id, 'C123')
+        self.assertEqual(channels[1].id, 'C124')
         mock_requests_get.assert_called_once_with(
             config['CONVERSATIONS_LIST_URL'],
-            headers={'Authorization': f"Bearer {config['SLACK_BOT_TOKEN']}"}
+            headers={'Authorization': f"Bearer {config['SLACK_BOT_TOKEN']}"},
+            params={'exclude_archived': 'true', 'limit': 200}
         )
 
-    @patch("requests.get")
-    def test_check_user_activity_success(self, mock_requests_get):
+    @patch("slack_client.get_session")
+    def test_check_user_activity_success(self, mock_get_session):
         """Test scenario where user activity is found in a channel."""
+        mock_requests_get = mock_get_session.return_value.get
         
         # Prepare mock response for Slack API to simulate user activity
         mock_response = MagicMock()
@@ -130,12 +142,13 @@ class TestGetConfig(unittest.TestCase):
         mock_requests_get.assert_called_once_with(
             config['CONVERSATIONS_HISTORY_URL'],
             headers={'Authorization': f"Bearer {config['SLACK_BOT_TOKEN']}"},
-            params={'channel': 'C123', 'oldest': int((datetime.now() - timedelta(days=3)).timestamp())}
+            params={'channel': 'C123', 'oldest': int((datetime.now() - timedelta(days=3)).timestamp()), 'limit': 200}
         )
 
-    @patch("requests.post")
-    def test_send_message_success(self, mock_requests_post):
+    @patch("slack_client.get_session")
+    def test_send_message_success(self, mock_get_session):
         """Test success scenario for sending a message to a user."""
+        mock_requests_post = mock_get_session.return_value.post
         
         # Prepare mock response for Slack API
         mock_response = MagicMock()
@@ -164,12 +177,13 @@ class TestGetConfig(unittest.TestCase):
         )
 
     @patch("notify_inactive_users.get_config")
-    @patch("notify_inactive_users.get_all_users")
-    @patch("notify_inactive_users.get_all_channels")
-    @patch("notify_inactive_users.check_user_activity")
+    @patch("notify_inactive_users.iter_users")
+    @patch("notify_inactive_users.iter_channels")
+    @patch("notify_inactive_users.build_membership_index")
+    @patch("notify_inactive_users.build_activity_index")
     @patch("notify_inactive_users.send_message")
     @patch("time.sleep", return_value=None)  # Mock time.sleep to avoid delays during tests
-    def test_lambda_handler_success(self, mock_sleep, mock_send_message, mock_check_activity, mock_get_channels, mock_get_users, mock_get_config):
+    def test_lambda_handler_success(self, mock_sleep, mock_send_message, mock_build_index, mock_build_membership, mock_iter_channels, mock_iter_users, mock_get_config):
         # Mock the configuration
         mock_get_config.return_value = {
             'SLACK_BOT_TOKEN': 'fake_token',
@@ -180,19 +194,22 @@ class TestGetConfig(unittest.TestCase):
         }
         
         # Mock the list of users
-        mock_get_users.return_value = [
-            {'id': 'U123', 'name': 'JohnDoe'},
-            {'id': 'U456', 'name': 'JaneSmith'}
-        ]
+        mock_iter_users.return_value = iter([
+            UserRecord('U123', 'JohnDoe'),
+            UserRecord('U456', 'JaneSmith')
+        ])
         
         # Mock the list of channels
-        mock_get_channels.return_value = [
-            {'id': 'C123', 'name': 'general'},
-            {'id': 'C456', 'name': 'random'}
-        ]
+        mock_iter_channels.return_value = iter([
+            ChannelRecord('C123'),
+            ChannelRecord('C456')
+        ])
         
-        # Mock user activity check (return False for both users, meaning they're inactive)
-        mock_check_activity.return_value = False
+        # Mock the membership index (both users are in both channels)
+        mock_build_membership.return_value = {'C123': {'U123', 'U456'}, 'C456': {'U123', 'U456'}}
+
+        # Mock the activity index (no messages from either user, meaning they're inactive)
+        mock_build_index.return_value = {}
         
         # Mock the send_message function to return a successful response
         mock_send_message.return_value = {'ok': True}
@@ -0,0 +1,81 @@
+import unittest
+
+from rate_limiter import RateLimiter, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestTokenBucket(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        # 60 per minute with a 2 second burst: capacity 2, one token per second
+        self.bucket = TokenBucket(60, burst_seconds=2, clock=self.clock, sleep=self.clock.sleep)
+
+    def test_burst_then_waits_for_refill(self):
+        """Test that calls within capacity do not wait and later calls wait for the refill rate."""
+        self.assertEqual(self.bucket.acquire(), 0)
+        self.assertEqual(self.bucket.acquire(), 0)
+        self.assertAlmostEqual(self.bucket.acquire(), 1.0)
+        self.assertEqual(self.clock.sleeps, [1.0])
+
+    def test_throttled_honors_retry_after_and_backs_off(self):
+        """Test that Retry-After blocks the bucket and the rate is halved."""
+        self.bucket.throttled(30)
+
+        self.assertEqual(self.bucket.rate, 0.5)
+        self.assertAlmostEqual(self.bucket.acquire(), 30.0)
+
+    def test_succeeded_recovers_towards_nominal_rate(self):
+        """Test that the rate recovers additively and never exceeds the tier rate."""
+        self.bucket.throttled(0)
+        for _ in range(100):
+            self.bucket.succeeded()
+
+        self.assertEqual(self.bucket.rate, self.bucket.nominal_rate)
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_buckets_follow_method_tiers(self):
+        """Test that each method gets its own bucket sized from its tier."""
+        limiter = RateLimiter(method_tiers={"users.list": 2}, tier_rates={2: 20, 3: 50})
+
+        self.assertAlmostEqual(limiter.bucket("users.list").nominal_rate, 20 / 60)
+        self.assertAlmostEqual(limiter.bucket("conversations.history").nominal_rate, 50 / 60)
+        self.assertIs(limiter.bucket("users.list"), limiter.bucket("users.list"))
+
+    def test_throttle_events_are_counted_and_reset(self):
+        """Test the throttle counter used for reporting."""
+        clock = FakeClock()
+        limiter = RateLimiter(clock=clock, sleep=clock.sleep)
+        limiter.throttled("chat.postMessage", 1)
+        limiter.throttled("chat.postMessage", 1)
+
+        self.assertEqual(limiter.throttle_events, 2)
+        limiter.reset()
+        self.assertEqual(limiter.throttle_events, 0)
+
+    def test_set_share_scales_every_bucket(self):
+        """Test that a shard worker's buckets get its fraction of the tier rates until reset."""
+        limiter = RateLimiter(method_tiers={"users.list": 2}, tier_rates={2: 20, 3: 50})
+        limiter.bucket("users.list")
+        limiter.set_share(0.25)
+
+        self.assertAlmostEqual(limiter.bucket("users.list").nominal_rate, 5 / 60)
+        self.assertAlmostEqual(limiter.bucket("conversations.history").nominal_rate, 12.5 / 60)
+        limiter.reset()
+        self.assertAlmostEqual(limiter.bucket("users.list").nominal_rate, 20 / 60)
+
+
+if __name__ == "__main__":
+    unittest.main()
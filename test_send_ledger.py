@@ -0,0 +1,69 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch, MagicMock
+
+from botocore.exceptions import ClientError
+
+import aws_clients
+from send_ledger import DynamoSendLedger, InMemorySendLedger, LocalFileSendLedger, get_send_ledger
+
+
+class TestSendLedgers(unittest.TestCase):
+    def setUp(self):
+        aws_clients.reset()
+
+    def test_in_memory_ledger_is_keyed_by_run_date(self):
+        """Test that a user sent on one run date is not treated as sent on another."""
+        ledger = InMemorySendLedger()
+        ledger.record_sent("U123", "2024-01-01")
+
+        self.assertEqual(ledger.load_sent("2024-01-01"), {"U123"})
+        self.assertEqual(ledger.load_sent("2024-01-02"), set())
+
+    def test_local_file_ledger_survives_restart(self):
+        """Test that a rerun reading the same file sees earlier deliveries."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "ledger.jsonl")
+            first_run = LocalFileSendLedger(path)
+            first_run.record_sent("U123", "2024-01-01")
+            first_run.record_sent("U456", "2024-01-02")
+
+            self.assertEqual(LocalFileSendLedger(path).load_sent("2024-01-01"), {"U123"})
+
+    @patch("aws_clients.boto3.resource")
+    def test_dynamo_ledger_queries_one_partition(self, mock_boto_resource):
+        """Test that a run date's deliveries are read with a paginated query."""
+        mock_table = MagicMock()
+        mock_boto_resource.return_value.Table.return_value = mock_table
+        mock_table.query.side_effect = [
+            {"Items": [{"user_id": "U123"}], "LastEvaluatedKey": {"run_date": "2024-01-01", "user_id": "U123"}},
+            {"Items": [{"user_id": "U456"}]},
+        ]
+
+        self.assertEqual(DynamoSendLedger("Ledger").load_sent("2024-01-01"), {"U123", "U456"})
+        self.assertEqual(mock_table.query.call_count, 2)
+
+    @patch("aws_clients.boto3.resource")
+    def test_dynamo_ledger_record_is_conditional(self, mock_boto_resource):
+        """Test that recording an existing entry is not an error."""
+        mock_table = MagicMock()
+        mock_boto_resource.return_value.Table.return_value = mock_table
+        mock_table.put_item.side_effect = ClientError({"Error": {"Code": "ConditionalCheckFailedException"}}, "PutItem")
+
+        DynamoSendLedger("Ledger").record_sent("U123", "2024-01-01")
+
+        mock_table.put_item.assert_called_once_with(
+            Item={"run_date": "2024-01-01", "user_id": "U123"},
+            ConditionExpression="attribute_not_exists(user_id)",
+        )
+
+    @patch.dict("os.environ", {}, clear=True)
+    def test_get_send_ledger_defaults_to_in_memory(self):
+        """Test the ledger selection."""
+        self.assertIsInstance(get_send_ledger({}), InMemorySendLedger)
+        self.assertIsInstance(get_send_ledger({"SEND_LEDGER_FILE": "/tmp/l.jsonl"}), LocalFileSendLedger)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import unittest
+from unittest.mock import patch, MagicMock
+
+import slack_client
+
+
+class TestSlackClient(unittest.TestCase):
+    def setUp(self):
+        slack_client.reset_session()
+        slack_client.RATE_LIMITER.reset()
+
+    def tearDown(self):
+        slack_client.reset_session()
+
+    def test_session_is_shared_until_reset(self):
+        """Test that the pooled session lives for the life of the container."""
+        session = slack_client.get_session()
+
+        self.assertIs(slack_client.get_session(), session)
+        slack_client.reset_session()
+        self.assertIsNot(slack_client.get_session(), session)
+
+    @patch.dict("os.environ", {
+        "SLACK_HTTP_POOL_SIZE": "25",
+        "SLACK_HTTP_CONNECT_TIMEOUT": "1.5",
+        "SLACK_HTTP_READ_TIMEOUT": "4",
+        "SLACK_HTTP_CONNECT_RETRIES": "3",
+    })
+    def test_session_pool_timeouts_and_retries_come_from_config(self):
+        """Test the adapter mounted for slack.com."""
+        adapter = slack_client.get_session().get_adapter("https://slack.com/api/users.list")
+
+        self.assertIsInstance(adapter, slack_client.TimeoutHTTPAdapter)
+        self.assertEqual(adapter.timeout, (1.5, 4.0))
+        self.assertEqual(adapter._pool_maxsize, 25)
+        self.assertEqual(adapter.max_retries.connect, 3)
+        self.assertEqual(adapter.max_retries.read, 0)
+        self.assertFalse(adapter.max_retries.respect_retry_after_header)
+
+    @patch("requests.adapters.HTTPAdapter.send")
+    def test_adapter_applies_default_timeout(self, mock_send):
+        """Test that callers get the configured timeout unless they pass one."""
+        adapter = slack_client.TimeoutHTTPAdapter((2.0, 10.0))
+        request = MagicMock()
+
+        adapter.send(request)
+        self.assertEqual(mock_send.call_args.kwargs["timeout"], (2.0, 10.0))
+        adapter.send(request, timeout=1)
+        self.assertEqual(mock_send.call_args.kwargs["timeout"], 1)
+
+    @patch("slack_client.get_session")
+    def test_slack_api_call_without_retries_raises_when_throttled(self, mock_get_session):
+        """Test that the interactive path does not wait out a Retry-After, and a 429 is never returned as data."""
+        mock_get_session.return_value.post.return_value = MagicMock(status_code=429, headers={"Retry-After": "30"})
+
+        with self.assertRaises(slack_client.SlackRateLimited) as raised:
+            slack_client.slack_api_call("views.publish", "POST", "https://fake.url", max_retries=0, json={})
+
+        self.assertEqual((raised.exception.api_method, raised.exception.retry_after), ("views.publish", 30.0))
+        mock_get_session.return_value.post.assert_called_once_with("https://fake.url", json={})
+
+    @patch("rate_limiter.time.sleep")
+    @patch("slack_client.get_session")
+    def test_slack_api_call_raises_after_last_retry(self, mock_get_session, mock_sleep):
+        """Test that every attempt is made before giving up."""
+        mock_get_session.return_value.get.return_value = MagicMock(status_code=429, headers={"Retry-After": "2"})
+
+        with self.assertRaises(slack_client.SlackRateLimited):
+            slack_client.slack_api_call("users.list", "GET", "https://fake.url", max_retries=2)
+
+        self.assertEqual(mock_get_session.return_value.get.call_count, 3)
+
+    @patch("rate_limiter.time.sleep")
+    @patch("slack_client.get_session")
+    def test_interactive_calls_report_throttling_as_a_failed_call(self, mock_get_session, mock_sleep):
+        """Test that the profile handler's Slack calls turn a 429 into a ratelimited error result without waiting."""
+        import add_user_profile
+
+        mock_get_session.return_value.post.return_value = MagicMock(status_code=429, headers={"Retry-After": "20"})
+
+        self.assertEqual(add_user_profile.publish_home_view("U123", "xoxb"), {"ok": False, "error": "ratelimited"})
+        self.assertEqual(add_user_profile.send_message("U123", "hi", "xoxb"), {"ok": False, "error": "ratelimited"})
+        mock_sleep.assert_not_called()
+
+    @patch("rate_limiter.time.sleep")
+    @patch("slack_client.get_session")
+    def test_unlimited_call_neither_waits_nor_blocks_the_limiter(self, mock_get_session, mock_sleep):
+        """Test that rate_limited=False skips the limiter, so a 429 there does not stall later calls."""
+        post = mock_get_session.return_value.post
+        post.return_value = MagicMock(status_code=429, headers={"Retry-After": "20"})
+
+        with self.assertRaises(slack_client.SlackRateLimited):
+            slack_client.slack_api_call("views.publish", "POST", "https://fake.url", max_retries=0, rate_limited=False)
+        mock_sleep.assert_not_called()
+
+        post.return_value = MagicMock(status_code=200)
+        slack_client.slack_api_call("views.publish", "POST", "https://fake.url", rate_limited=False)
+        mock_sleep.assert_not_called()
+        slack_client.slack_api_call("views.publish", "POST", "https://fake.url")
+        self.assertLess(sum(call.args[0] for call in mock_sleep.call_args_list), 1)
+
+    @patch.dict("os.environ", {"SLACK_HTTP_READ_TIMEOUT": "10"})
+    @patch("slack_client.get_session")
+    def test_interactive_calls_use_a_timeout_inside_slacks_deadline(self, mock_get_session):
+        """Test that views.publish and chat.postMessage do not inherit the 10 s notify read timeout."""
+        import add_user_profile
+
+        post = mock_get_session.return_value.post
+        post.return_value.json.return_value = {"ok": True}
+
+        add_user_profile.publish_home_view("U123", "xoxb")
+        add_user_profile.send_message("U123", "hi", "xoxb")
+
+        for call in post.call_args_list:
+            connect, read = call.kwargs["timeout"]
+            self.assertLess(connect + read, 3)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import json
+import unittest
+from unittest.mock import patch
+
+import add_user_profile
+import structured_logging
+from structured_logging import JsonFormatter, bounded_json, parse_sample_rates, redact, should_log_payload
+
+
+class TestStructuredLogging(unittest.TestCase):
+    def test_redact_hides_tokens_and_user_text(self):
+        """Test that credentials and typed answers are replaced, wherever they are nested."""
+        payload = {
+            "token": "verification",
+            "user": {"id": "U1"},
+            "view": {"state": {"values": {"question_block": {"user_response": {"value": "my answer"}}}}},
+            "note": "token xoxb-123-abc leaked into free text",
+        }
+
+        redacted = redact(payload)
+
+        self.assertEqual(redacted["token"], "[REDACTED]")
+        self.assertEqual(redacted["user"], {"id": "U1"})
+        self.assertEqual(redacted["view"]["state"]["values"]["question_block"]["user_response"]["value"], "[REDACTED]")
+        self.assertEqual(redacted["note"], "token [REDACTED] leaked into free text")
+        self.assertEqual(payload["token"], "verification")
+
+    def test_bounded_json_caps_large_payloads(self):
+        """Test that long lists, long strings and the overall size are all bounded."""
+        payload = {"blocks": [{"block_id": f"b{i}", "type": "section"} for i in range(500)], "blob": "a" * 10000}
+
+        small = bounded_json(payload, 200)
+        large = bounded_json(payload, 100000)
+
+        self.assertLess(len(json.dumps(small)), 400)
+        self.assertEqual(len(large["blocks"]), 11)
+        self.assertEqual(large["blocks"][-1], "... 490 more")
+        self.assertTrue(large["blob"].endswith("... (10000 chars)"))
+
+    def test_sample_rates_per_event_type(self):
+        """Test the env override format and that the default rate covers unknown types."""
+        rates = parse_sample_rates("message=0, app_home_opened=1,default=0.5,bad")
+        self.assertEqual((rates["message"], rates["app_home_opened"], rates["default"]), (0.0, 1.0, 0.5))
+
+        with patch.object(structured_logging, "SAMPLE_RATES", rates):
+            self.assertFalse(should_log_payload("message", rand=lambda: 0.0))
+            self.assertTrue(should_log_payload("app_home_opened", rand=lambda: 0.99))
+            self.assertTrue(should_log_payload("team_join", rand=lambda: 0.4))
+            self.assertFalse(should_log_payload("team_join", rand=lambda: 0.6))
+
+    def test_handler_logs_sampled_event_as_redacted_json(self):
+        """Test the handler's event line: one JSON object with the event type and a redacted payload."""
+        event = {"body": json.dumps({"type": "url_verification", "token": "xoxb-secret", "challenge": "c"})}
+
+        with self.assertLogs(add_user_profile.logger, level="INFO") as captured:
+            add_user_profile.lambda_handler(event, None)
+
+        record = next(r for r in captured.records if getattr(r, "payload", None) is not None)
+        line = json.loads(JsonFormatter().format(record))
+        self.assertEqual((line["message"], line["event_type"]), ("Received url_verification event", "url_verification"))
+        self.assertEqual(line["payload"], {"type": "url_verification", "token": "[REDACTED]", "challenge": "c"})
+
+    def test_unsampled_events_are_not_serialized(self):
+        """Test that an event type sampled at 0 produces no event line at all."""
+        event = {"body": json.dumps({"type": "event_callback", "event": {"type": "team_join"}})}
+
+        with patch.dict(structured_logging.SAMPLE_RATES, {"default": 0.0}), \
+                self.assertLogs(add_user_profile.logger, level="INFO") as captured:
+            add_user_profile.logger.info("marker")
+            add_user_profile.lambda_handler(event, None)
+
+        self.assertEqual([r.getMessage() for r in captured.records], ["marker"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import json
+import threading
+import unittest
+from unittest.mock import patch, MagicMock
+
+import aws_clients
+from task_queue import InProcessTaskQueue, SqsTaskQueue, get_task_queue
+
+
+class TestTaskQueues(unittest.TestCase):
+    def setUp(self):
+        aws_clients.reset()
+
+    def test_in_process_queue_runs_tasks_off_the_caller_thread(self):
+        """Test that submit returns before the task runs and drain waits for it."""
+        release = threading.Event()
+        seen = []
+
+        def handler(task):
+            release.wait(timeout=5)
+            seen.append((task["kind"], threading.current_thread().name))
+
+        queue = InProcessTaskQueue(handler, max_workers=1)
+        queue.submit({"kind": "publish_home", "user_id": "U123"})
+        self.assertEqual(seen, [])
+
+        release.set()
+        queue.drain(timeout=5)
+
+        self.assertEqual(len(seen), 1)
+        self.assertEqual(seen[0][0], "publish_home")
+        self.assertTrue(seen[0][1].startswith("task-queue"))
+
+    def test_in_process_queue_survives_failing_tasks(self):
+        """Test that one failing task does not stop later tasks from running."""
+        seen = []
+
+        def handler(task):
+            if task["user_id"] == "U1":
+                raise RuntimeError("boom")
+            seen.append(task["user_id"])
+
+        queue = InProcessTaskQueue(handler, max_workers=1)
+        queue.submit({"kind": "publish_home", "user_id": "U1"})
+        queue.submit({"kind": "publish_home", "user_id": "U2"})
+        queue.drain(timeout=5)
+
+        self.assertEqual(seen, ["U2"])
+
+    @patch("aws_clients.boto3.client")
+    def test_sqs_queue_sends_json_message(self, mock_boto_client):
+        """Test that tasks are serialized to the configured queue."""
+        mock_sqs = MagicMock()
+        mock_boto_client.return_value = mock_sqs
+
+        SqsTaskQueue("https://sqs.example/queue").submit({"kind": "publish_home", "user_id": "U123"})
+
+        mock_boto_client.assert_called_once_with("sqs")
+        kwargs = mock_sqs.send_message.call_args.kwargs
+        self.assertEqual(kwargs["QueueUrl"], "https://sqs.example/queue")
+        self.assertEqual(json.loads(kwargs["MessageBody"]), {"kind": "publish_home", "user_id": "U123"})
+
+    @patch("aws_clients.boto3.client")
+    def test_get_task_queue_picks_backend_from_env(self, mock_boto_client):
+        """Test that TASK_QUEUE_URL selects SQS and its absence the in-process queue."""
+        with patch.dict("os.environ", {"TASK_QUEUE_URL": "https://sqs.example/queue"}):
+            self.assertIsInstance(get_task_queue(print), SqsTaskQueue)
+        with patch.dict("os.environ", {}, clear=True):
+            self.assertIsInstance(get_task_queue(print), InProcessTaskQueue)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+
+from ttl_cache import MISSING, LRUTTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestLRUTTLCache(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = LRUTTLCache(maxsize=2, ttl_seconds=10, clock=self.clock)
+
+    def test_get_counts_hits_and_misses(self):
+        """Test the counters exposed for sizing the cache."""
+        self.assertIs(self.cache.get("U123"), MISSING)
+        self.cache.set("U123", {})
+        self.assertEqual(self.cache.get("U123"), {})
+
+        self.assertEqual(self.cache.stats(), {"hits": 1, "misses": 1, "size": 1, "maxsize": 2})
+
+    def test_entries_expire_after_ttl(self):
+        """Test that default and per-entry TTLs are honoured."""
+        self.cache.set("U123", "a")
+        self.cache.set("U456", "b", ttl_seconds=1)
+        self.clock.now = 5
+
+        self.assertIs(self.cache.get("U456"), MISSING)
+        self.assertEqual(self.cache.get("U123"), "a")
+        self.clock.now = 11
+        self.assertNotIn("U123", self.cache)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """Test that reads refresh recency and the oldest entry is dropped when full."""
+        self.cache.set("U1", 1)
+        self.cache.set("U2", 2)
+        self.cache.get("U1")
+        self.cache.set("U3", 3)
+
+        self.assertIn("U1", self.cache)
+        self.assertNotIn("U2", self.cache)
+        self.assertIn("U3", self.cache)
+
+
+if __name__ == "__main__":
+    unittest.main()
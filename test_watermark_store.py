@@ -0,0 +1,74 @@
+import os
+import tempfile
+import unittest
+from decimal import Decimal
+from unittest.mock import patch, MagicMock
+
+import aws_clients
+from watermark_store import (
+    DynamoWatermarkStore,
+    InMemoryWatermarkStore,
+    LocalFileWatermarkStore,
+    get_watermark_store,
+)
+
+
+class TestWatermarkStores(unittest.TestCase):
+    def setUp(self):
+        aws_clients.reset()
+
+    def test_in_memory_store_round_trip(self):
+        """Test that saved state is returned by the next load."""
+        store = InMemoryWatermarkStore()
+        self.assertEqual(store.load(), ({}, {}))
+
+        store.save({"C123": 1700000000.5}, {"U123": 1700000000.5})
+        self.assertEqual(store.load(), ({"C123": 1700000000.5}, {"U123": 1700000000.5}))
+
+    def test_local_file_store_persists_between_instances(self):
+        """Test that the local stand-in survives a new process reading the same file."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "watermarks.json")
+            LocalFileWatermarkStore(path).save({"C123": 1700000000.5}, {"U123": 1699999999.0})
+
+            self.assertEqual(
+                LocalFileWatermarkStore(path).load(),
+                ({"C123": 1700000000.5}, {"U123": 1699999999.0})
+            )
+
+    @patch("aws_clients.boto3.resource")
+    def test_dynamo_store_load_follows_pagination(self, mock_boto_resource):
+        """Test that scans are paginated and keys are split by prefix."""
+        mock_table = MagicMock()
+        mock_boto_resource.return_value.Table.return_value = mock_table
+        mock_table.scan.side_effect = [
+            {"Items": [{"id": "channel#C123", "ts": Decimal("1700000000.5")}], "LastEvaluatedKey": {"id": "channel#C123"}},
+            {"Items": [{"id": "user#U123", "ts": Decimal("1699999999")}]},
+        ]
+
+        store = DynamoWatermarkStore("Watermarks")
+
+        self.assertEqual(store.load(), ({"C123": 1700000000.5}, {"U123": 1699999999.0}))
+        mock_table.scan.assert_called_with(ExclusiveStartKey={"id": "channel#C123"})
+
+    @patch("aws_clients.boto3.resource")
+    def test_dynamo_store_save_writes_ttl_for_users(self, mock_boto_resource):
+        """Test that saves are batched and user items carry an expiry."""
+        mock_table = MagicMock()
+        mock_boto_resource.return_value.Table.return_value = mock_table
+        batch = mock_table.batch_writer.return_value.__enter__.return_value
+
+        DynamoWatermarkStore("Watermarks", ttl_seconds=100).save({"C123": 1700000000.5}, {"U123": 1700000000.0})
+
+        batch.put_item.assert_any_call(Item={"id": "channel#C123", "ts": Decimal("1700000000.5")})
+        batch.put_item.assert_any_call(Item={"id": "user#U123", "ts": Decimal("1700000000.0"), "expires_at": 1700000100})
+
+    @patch.dict("os.environ", {}, clear=True)
+    def test_get_watermark_store_selection(self):
+        """Test that incremental mode is off unless a table or file is configured."""
+        self.assertIsNone(get_watermark_store({}))
+        self.assertIsInstance(get_watermark_store({"WATERMARK_FILE": "/tmp/w.json"}), LocalFileWatermarkStore)
+
+
+if __name__ == "__main__":
+    unittest.main()
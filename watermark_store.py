@@ -0,0 +1,97 @@
+import json
+import os
+from decimal import Decimal
+from typing import Any, Dict, Optional, Tuple
+
+import aws_clients
+from constants import ENV_WATERMARK_FILE, ENV_WATERMARK_TABLE
+
+CHANNEL_PREFIX = "channel#"
+USER_PREFIX = "user#"
+
+Watermarks = Tuple[Dict[str, float], Dict[str, float]]
+
+
+class InMemoryWatermarkStore:
+    """Keeps channel watermarks and user last-seen timestamps in process memory."""
+
+    def __init__(self) -> None:
+        self.channel_watermarks: Dict[str, float] = {}
+        self.user_last_seen: Dict[str, float] = {}
+
+    def load(self) -> Watermarks:
+        """Return copies of (channel_id -> newest ts, user_id -> last seen ts)."""
+        return dict(self.channel_watermarks), dict(self.user_last_seen)
+
+    def save(self, channel_watermarks: Dict[str, float], user_last_seen: Dict[str, float]) -> None:
+        """Replace the stored state with the given maps."""
+        self.channel_watermarks = dict(channel_watermarks)
+        self.user_last_seen = dict(user_last_seen)
+
+
+class LocalFileWatermarkStore(InMemoryWatermarkStore):
+    """Local stand-in that persists watermarks to a JSON file between runs."""
+
+    def __init__(self, path: str) -> None:
+        super().__init__()
+        self.path = path
+
+    def load(self) -> Watermarks:
+        if os.path.exists(self.path):
+            with open(self.path) as f:
+                state = json.load(f)
+            self.channel_watermarks = state.get("channels", {})
+            self.user_last_seen = state.get("users", {})
+        return super().load()
+
+    def save(self, channel_watermarks: Dict[str, float], user_last_seen: Dict[str, float]) -> None:
+        super().save(channel_watermarks, user_last_seen)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"channels": self.channel_watermarks, "users": self.user_last_seen}, f)
+        os.replace(tmp_path, self.path)
+
+
+class DynamoWatermarkStore:
+    """Persists watermarks in a DynamoDB table keyed by "channel#<id>" / "user#<id>"."""
+
+    def __init__(self, table_name: str, ttl_seconds: Optional[int] = None) -> None:
+        self.table = aws_clients.get_table(table_name)
+        self.ttl_seconds = ttl_seconds
+
+    def load(self) -> Watermarks:
+        channel_watermarks: Dict[str, float] = {}
+        user_last_seen: Dict[str, float] = {}
+        scan_kwargs: Dict[str, Any] = {}
+        while True:
+            response = self.table.scan(**scan_kwargs)
+            for item in response.get("Items", []):
+                key, ts = item["id"], float(item["ts"])
+                if key.startswith(CHANNEL_PREFIX):
+                    channel_watermarks[key[len(CHANNEL_PREFIX):]] = ts
+                elif key.startswith(USER_PREFIX):
+                    user_last_seen[key[len(USER_PREFIX):]] = ts
+            if "LastEvaluatedKey" not in response:
+                return channel_watermarks, user_last_seen
+            scan_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    def save(self, channel_watermarks: Dict[str, float], user_last_seen: Dict[str, float]) -> None:
+        with self.table.batch_writer(overwrite_by_pkeys=["id"]) as batch:
+            for channel_id, ts in channel_watermarks.items():
+                batch.put_item(Item={"id": f"{CHANNEL_PREFIX}{channel_id}", "ts": Decimal(str(ts))})
+            for user_id, ts in user_last_seen.items():
+                item: Dict[str, Any] = {"id": f"{USER_PREFIX}{user_id}", "ts": Decimal(str(ts))}
+                if self.ttl_seconds:
+                    item["expires_at"] = int(ts) + self.ttl_seconds
+                batch.put_item(Item=item)
+
+
+def get_watermark_store(config: Dict[str, Any], ttl_seconds: Optional[int] = None):
+    """Pick the watermark store configured for this run, or None to scan the full window."""
+    table_name = config.get("WATERMARK_TABLE") or os.environ.get(ENV_WATERMARK_TABLE)
+    if table_name:
+        return DynamoWatermarkStore(table_name, ttl_seconds)
+    path = config.get("WATERMARK_FILE") or os.environ.get(ENV_WATERMARK_FILE)
+    if path:
+        return LocalFileWatermarkStore(path)
+    return None